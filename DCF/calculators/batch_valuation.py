@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Dict, Tuple
+
+FORECAST_YEARS = 10
+TERMINAL_GROWTH_RATE = 0.0 # ValuationCalculator.calculate_terminal_value와 동일 (성숙기업 무성장 예상)
+
+def calculate_10year_present_value_batch(
+        fcfe: np.ndarray,
+        cost_of_equity: np.ndarray,
+        net_income_growth_rate: np.ndarray,
+        years: int = FORECAST_YEARS
+        ) -> Tuple[np.ndarray, np.ndarray]:
+    """여러 티커의 향후 10년 주주가치 현재가치를 한 번에 계산
+
+    FCFE가 순이익 성장률 g로 성장하고 자본비용 k로 할인될 때 sum_{i=1..n} FCFE * (1+g)^i / (1+k)^i 를 계산한다.
+    등비급수 닫힌 형태는 (1+g)/(1+k)가 1에 가까우면 오차가 커지므로, 티커 방향으로 벡터화하고
+    연도는 ValuationCalculator.calculate_10year_present_value와 같은 순서로 더해 같은 결과를 낸다.
+
+    Args:
+        fcfe (np.ndarray): FCFE
+        cost_of_equity (np.ndarray): 자본비용
+        net_income_growth_rate (np.ndarray): 순이익 성장률
+        years (int): 예측 기간
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 10년 현재가치 합계, 10년 후 FCFE
+    """
+    fcfe, cost_of_equity, growth_rate = np.broadcast_arrays(
+        np.asarray(fcfe, dtype=float),
+        np.asarray(cost_of_equity, dtype=float),
+        np.asarray(net_income_growth_rate, dtype=float),
+    )
+
+    total_present_value = np.zeros(fcfe.shape)
+    for i in range(1, years + 1):
+        after_fcfe = fcfe * (1 + growth_rate) ** i
+        total_present_value = total_present_value + after_fcfe / (1 + cost_of_equity) ** i
+
+    after_10year_fcfe = after_fcfe
+    return total_present_value, after_10year_fcfe
+
+def calculate_terminal_value_batch(
+        cost_of_equity: np.ndarray,
+        retention_ratio: np.ndarray,
+        after_10year_fcfe: np.ndarray,
+        years: int = FORECAST_YEARS
+        ) -> np.ndarray:
+    """여러 티커의 Terminal Value 현재가치를 한 번에 계산"""
+    cost_of_equity = np.asarray(cost_of_equity, dtype=float)
+    _11year_fcfe = np.asarray(after_10year_fcfe, dtype=float) * (1 + TERMINAL_GROWTH_RATE) * np.asarray(retention_ratio, dtype=float)
+    terminal_value = _11year_fcfe / (cost_of_equity - TERMINAL_GROWTH_RATE)
+    return terminal_value / (1 + cost_of_equity) ** years
+
+def calculate_per_share_batch(
+        fcfe: np.ndarray,
+        cost_of_equity: np.ndarray,
+        net_income_growth_rate: np.ndarray,
+        retention_ratio: np.ndarray,
+        shares_outstanding: np.ndarray,
+        years: int = FORECAST_YEARS
+        ) -> Dict[str, np.ndarray]:
+    """여러 티커의 10년 현재가치, Terminal Value, 주당가치를 한 번의 벡터 연산으로 계산
+
+    입력은 같은 길이의 배열(또는 브로드캐스트 가능한 스칼라)이며,
+    ValuationCalculator의 calculate_10year_present_value, calculate_terminal_value와 같은 결과를 낸다.
+
+    Returns:
+        Dict[str, np.ndarray]: 10year_pv, terminal_value_pv, total_value, per_share
+    """
+    _10year_pv, after_10year_fcfe = calculate_10year_present_value_batch(fcfe, cost_of_equity, net_income_growth_rate, years)
+    terminal_value_pv = calculate_terminal_value_batch(cost_of_equity, retention_ratio, after_10year_fcfe, years)
+    total_value = _10year_pv + terminal_value_pv
+
+    return {
+        '10year_pv': _10year_pv,
+        'terminal_value_pv': terminal_value_pv,
+        'total_value': total_value,
+        'per_share': total_value / np.asarray(shares_outstanding, dtype=float),
+    }
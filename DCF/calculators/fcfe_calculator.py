@@ -1,17 +1,21 @@
+import numpy as np
 from typing import Dict, Optional
 from ..collectors.financial_data_collector import FinancialDataCollector
+from ..collectors.ticker_data_context import TickerDataContext
+from ..utils.metrics import record_failure, timed_stage
 
 class FCFECalculator:
     """FCFE(Free Cash Flow to Equity)를 계산하는 클래스"""
     
-    def __init__(self, ticker_symbol: str):
+    def __init__(self, ticker_symbol: str, context: Optional[TickerDataContext] = None):
         self.ticker_symbol = ticker_symbol
-        self.financial_collector = FinancialDataCollector(ticker_symbol)
+        self.financial_collector = FinancialDataCollector(ticker_symbol, context)
 
+    @timed_stage("fcfe")
     def calculate_fcfe(self, period: str = "annual", years: int = 1) -> Dict[str, float]:
         """FCFE를 계산하는 메서드
         Args:
-            period (str): 기간 (annual, quarterly)
+            period (str): 기간 (annual, quarterly, ttm)
             years (int): 평균을 계산할 연도 수
         Returns:
             Dict[str, float]: FCFE 계산 결과
@@ -33,37 +37,25 @@ class FCFECalculator:
             # 재무 지표 수집
             metrics = self.financial_collector.extract_financial_metrics(period)
             
-            # n년 평균 FCFE 계산
-            fcfe_values = []
-            for i in range(min(years, len(metrics['operating_cash_flow']))):
-                fcfe = (metrics['operating_cash_flow'].iloc[i] 
-                        - metrics['capital_expenditure'].iloc[i] 
-                        + metrics['repayment_of_debt'].iloc[i]
-                        + metrics['issuance_of_debt'].iloc[i])
-                fcfe_values.append(fcfe)
-            
-            fcfe_average = sum(fcfe_values) / len(fcfe_values)
-            
-            ratio_capex_ocf_values = []
-            ratio_repayment_issuance_values = []
-            for i in range(min(years, len(metrics['capital_expenditure']))):
-                ratio_capex_ocf = metrics['capital_expenditure'].iloc[i] / metrics['operating_cash_flow'].iloc[i]
-                ratio_repayment_issuance = -metrics['repayment_of_debt'].iloc[i] / metrics['issuance_of_debt'].iloc[i]
-                ratio_capex_ocf_values.append(ratio_capex_ocf)
-                ratio_repayment_issuance_values.append(ratio_repayment_issuance)
-            
-            ratio_capex_ocf = sum(ratio_capex_ocf_values) / len(ratio_capex_ocf_values)
-            ratio_repayment_issuance = sum(ratio_repayment_issuance_values) / len(ratio_repayment_issuance_values)
+            # 최근 n년 지표를 한 번에 슬라이스하여 평균 계산
+            ocf, capex, repayment, issuance = metrics.window(
+                ['operating_cash_flow', 'capital_expenditure', 'repayment_of_debt', 'issuance_of_debt'], years)
+
+            fcfe_average = (ocf - capex + repayment + issuance).mean()
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio_capex_ocf = (capex / ocf).mean()
+                ratio_repayment_issuance = (-repayment / issuance).mean()
 
             # print(f"Capital Expenditure / Operating Cash Flow: {ratio_capex_ocf:.2%}")
             # print(f"부채상환 / 부채발행: {ratio_repayment_issuance:.2%}")
             
             results = {
                 'FCFE': float(fcfe_average),
-                'Operating Cash Flow': float(metrics['operating_cash_flow'].iloc[0]),
-                'Capital Expenditure': float(metrics['capital_expenditure'].iloc[0]),
-                'Repayment of Debt': float(metrics['repayment_of_debt'].iloc[0]),
-                'Issuance of Debt': float(metrics['issuance_of_debt'].iloc[0]),
+                'Operating Cash Flow': metrics.latest('operating_cash_flow'),
+                'Capital Expenditure': metrics.latest('capital_expenditure'),
+                'Repayment of Debt': metrics.latest('repayment_of_debt'),
+                'Issuance of Debt': metrics.latest('issuance_of_debt'),
                 'Ratio CapEx/OCF': float(ratio_capex_ocf),
                 'Ratio Repayment/Issuance': float(ratio_repayment_issuance)
             }
@@ -72,6 +64,7 @@ class FCFECalculator:
             
         except Exception as e:
             print(f"FCFE 계산 중 오류 발생: {str(e)}")
+            record_failure("fcfe", self.ticker_symbol)
             return None
 
 # 편의를 위한 함수형 인터페이스
@@ -1,21 +1,24 @@
 from typing import Dict, Optional
 from ..collectors.financial_data_collector import FinancialDataCollector
-import pandas as pd
 from ..collectors.info_data_collector import InfoDataCollector
+from ..collectors.ticker_data_context import TickerDataContext
+from ..utils.metrics import record_failure, timed_stage
 
 class GrowthCalculatorShareholder:
     """순이익 성장률을 계산하는 클래스"""
     
-    def __init__(self, ticker_symbol: str):
+    def __init__(self, ticker_symbol: str, context: Optional[TickerDataContext] = None):
         self.ticker_symbol = ticker_symbol
-        self.financial_collector = FinancialDataCollector(ticker_symbol)
-        self.info_collector = InfoDataCollector(ticker_symbol)
+        self.context = context or TickerDataContext(ticker_symbol)
+        self.financial_collector = FinancialDataCollector(ticker_symbol, self.context)
+        self.info_collector = InfoDataCollector(ticker_symbol, self.context)
 
+    @timed_stage("growth")
     def calculate_net_income_growth_rate(self, period: str = "annual", years: int = 1) -> Dict[str,float]:
         """순이익 성장률 계산 (순이익 성장률 = 유보율(1-배당률) * ROE(Net Income / Equity))
         
         Args:
-            period (str): 기간 (annual, quarterly)
+            period (str): 기간 (annual, quarterly, ttm)
             years (int): 평균을 계산할 연도 수
         Returns:
             Dict[str, float]: 성장률 계산 결과
@@ -32,12 +35,8 @@ class GrowthCalculatorShareholder:
             info = self.info_collector.get_info()
             
             # n년 평균 ROE 계산
-            roe_values = []
-            for i in range(min(years, len(metrics['net_income']))):
-                current_roe = metrics['net_income'].iloc[i] / metrics['total_equity'].iloc[i]
-                roe_values.append(current_roe)
-            
-            roe = sum(roe_values) / len(roe_values)
+            net_income, total_equity = metrics.window(['net_income', 'total_equity'], years)
+            roe = float((net_income / total_equity).mean())
 
             retention_ratio = 1 - info['payout_ratio']
             growth_rate = retention_ratio * roe
@@ -51,6 +50,7 @@ class GrowthCalculatorShareholder:
             
         except Exception as e:
             print(f"성장률 계산 중 오류 발생: {str(e)}")
+            record_failure("growth", self.ticker_symbol)
             return None
     
 # 편의를 위한 함수형 인터페이스
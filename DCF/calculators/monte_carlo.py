@@ -0,0 +1,92 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from .batch_valuation import TERMINAL_GROWTH_RATE, calculate_per_share_batch
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+@dataclass(frozen=True)
+class Distribution:
+    """몬테카를로 표본 추출에 사용할 분포
+
+    kind: normal(mean, std), lognormal(mean, sigma), uniform(low, high),
+          triangular(left, mode, right), fixed(value)
+    """
+    kind: str
+    params: Tuple[float, ...]
+
+    @classmethod
+    def normal(cls, mean: float, std: float) -> "Distribution":
+        return cls("normal", (mean, std))
+
+    @classmethod
+    def lognormal(cls, mean: float, sigma: float) -> "Distribution":
+        return cls("lognormal", (mean, sigma))
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "Distribution":
+        return cls("uniform", (low, high))
+
+    @classmethod
+    def triangular(cls, left: float, mode: float, right: float) -> "Distribution":
+        return cls("triangular", (left, mode, right))
+
+    @classmethod
+    def fixed(cls, value: float) -> "Distribution":
+        return cls("fixed", (value,))
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """size개의 표본을 한 번에 추출"""
+        if self.kind == "normal":
+            return rng.normal(*self.params, size)
+        if self.kind == "lognormal":
+            return rng.lognormal(*self.params, size)
+        if self.kind == "uniform":
+            return rng.uniform(*self.params, size)
+        if self.kind == "triangular":
+            return rng.triangular(*self.params, size)
+        if self.kind == "fixed":
+            return np.full(size, float(self.params[0]))
+        raise ValueError(f"지원하지 않는 분포입니다: {self.kind}")
+
+def simulate_per_share(
+        fcfe: float,
+        shares_outstanding: float,
+        distributions: Dict[str, Distribution],
+        n_draws: int = 100_000,
+        percentiles: Iterable[float] = DEFAULT_PERCENTILES,
+        seed: Optional[int] = None
+        ) -> Dict[str, object]:
+    """자본비용, 성장률, 유보율을 분포에서 추출하여 주당가치 분포를 한 번의 벡터 연산으로 계산
+
+    Args:
+        fcfe (float): FCFE
+        shares_outstanding (float): 발행주식수
+        distributions (Dict[str, Distribution]): cost_of_equity, growth_rate, retention_ratio 분포
+        n_draws (int): 표본 수
+        percentiles (Iterable[float]): 반환할 백분위수
+        seed (int): 난수 시드
+    Returns:
+        Dict[str, object]: 백분위수별 주당가치, 평균, 표준편차, 유효 표본 수
+    """
+    rng = np.random.default_rng(seed)
+    cost_of_equity = distributions['cost_of_equity'].sample(rng, n_draws)
+    growth_rate = distributions['growth_rate'].sample(rng, n_draws)
+    retention_ratio = np.clip(distributions['retention_ratio'].sample(rng, n_draws), 0, 1)
+
+    per_share = calculate_per_share_batch(fcfe, cost_of_equity, growth_rate, retention_ratio, shares_outstanding)['per_share']
+
+    # 자본비용이 Terminal Value 성장률 이하인 표본은 영구가치가 정의되지 않으므로 제외
+    valid = (cost_of_equity > TERMINAL_GROWTH_RATE) & np.isfinite(per_share)
+    per_share = per_share[valid]
+    if per_share.size == 0:
+        raise ValueError("유효한 몬테카를로 표본이 없습니다.")
+
+    percentiles = list(percentiles)
+    return {
+        'percentiles': dict(zip(percentiles, np.percentile(per_share, percentiles).tolist())),
+        'mean': float(per_share.mean()),
+        'std': float(per_share.std()),
+        'n_draws': n_draws,
+        'n_valid': int(per_share.size),
+    }
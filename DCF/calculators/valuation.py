@@ -1,23 +1,95 @@
-from typing import Dict, Tuple
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
 from ..calculators.fcfe_calculator import FCFECalculator
 from ..calculators.wacc_calculator import WACCCalculator
 from ..calculators.growth_calculator_shareholder import GrowthCalculatorShareholder
+from ..calculators.monte_carlo import DEFAULT_PERCENTILES, Distribution, simulate_per_share
+from ..calculators.valuation_graph import ValuationGraph
 from ..collectors.info_data_collector import InfoDataCollector
 from ..collectors.financial_data_collector import FinancialDataCollector
+from ..collectors.ticker_data_context import TickerDataContext
+from ..collectors.statement_store import StatementStore
+from ..collectors.market_data_collector import MarketParameterSnapshot
+from ..collectors.async_data_collector import AsyncDataCollector
+from ..collectors.providers import MarketDataProvider
+from ..utils.beta_matrix import BetaTable
+from ..utils.metrics import get_metrics, record_failure, timed_stage
 
 class ValuationCalculator:
     """회사 가치를 계산하는 클래스"""
     
-    def __init__(self, ticker_symbol: str):
+    def __init__(
+            self,
+            ticker_symbol: str,
+            context: Optional[TickerDataContext] = None,
+            statement_store: Optional[StatementStore] = None,
+            market_snapshot: Optional[MarketParameterSnapshot] = None,
+            beta_table: Optional[BetaTable] = None,
+            provider: Optional[MarketDataProvider] = None
+            ):
         self.ticker_symbol = ticker_symbol
-        self.fcfe_calculator = FCFECalculator(ticker_symbol)
-        self.wacc_calculator = WACCCalculator(ticker_symbol)
-        self.net_income_growth_calculator = GrowthCalculatorShareholder(ticker_symbol)
-        self.financial_data_collector = FinancialDataCollector(ticker_symbol)
-        self.info_collector = InfoDataCollector(ticker_symbol)
-        self.shares_outstanding = self.info_collector.get_info()['shares_outstanding']
+        # 재무제표/info는 context를 통해 티커당 한 번만 조회하여 모든 계산기가 공유
+        self.context = context or TickerDataContext(ticker_symbol, store=statement_store, provider=provider)
+        self.fcfe_calculator = FCFECalculator(ticker_symbol, self.context)
+        self.wacc_calculator = WACCCalculator(ticker_symbol, self.context, market_snapshot, beta_table)
+        self.net_income_growth_calculator = GrowthCalculatorShareholder(ticker_symbol, self.context)
+        self.financial_data_collector = FinancialDataCollector(ticker_symbol, self.context)
+        self.info_collector = InfoDataCollector(ticker_symbol, self.context)
+        info = self.info_collector.get_info()
+
+        # 재무제표 -> FCFE/ROE/자본비용 -> 현재가치/잔존가치 -> 주당가치 의존성 그래프
+        # 주가, 발행주식수, 시장 파라미터가 바뀌면 해당 입력의 하위 노드만 다시 계산
+        self.graph = ValuationGraph()
+        self.graph.add_input("period", "annual")
+        self.graph.add_input("market_snapshot", market_snapshot)
+        self.graph.add_input("shares_outstanding", info['shares_outstanding'])
+        self.graph.add_input("actual_price", info.get('regularMarketPreviousClose', 0))
+        self.graph.add_node("cost_of_equity", self.wacc_calculator.calculate_cost_of_equity, ["market_snapshot"])
         #print(f"Shares Outstanding: {self.shares_outstanding}")
+
+        # 마지막 calculate_per_share의 평균 기간(년)별 결과와 선택된 기간 (이력 저장용)
+        self.window_results: Dict[int, Optional[Dict[str, float]]] = {}
+        self.best_window: Optional[int] = None
+
+    @property
+    def shares_outstanding(self) -> float:
+        return self.graph.get("shares_outstanding")
+
+    @shares_outstanding.setter
+    def shares_outstanding(self, shares_outstanding: float) -> None:
+        self.graph.set_input("shares_outstanding", shares_outstanding)
+
+    def set_actual_price(self, actual_price: float) -> None:
+        """실제 주가 변경 (최적 결과 선택만 다시 계산)"""
+        self.graph.set_input("actual_price", actual_price)
+
+    def set_market_snapshot(self, market_snapshot: Optional[MarketParameterSnapshot]) -> None:
+        """시장 파라미터 변경 (자본비용과 그 하위 노드만 다시 계산)"""
+        self.wacc_calculator.market_snapshot = market_snapshot
+        self.graph.set_input("market_snapshot", market_snapshot)
+
+    @classmethod
+    async def acreate(
+            cls,
+            ticker_symbol: str,
+            period: str = "annual",
+            statement_store: Optional[StatementStore] = None,
+            beta_table: Optional[BetaTable] = None,
+            collector: Optional[AsyncDataCollector] = None
+            ) -> "ValuationCalculator":
+        """재무제표 3종, info, 시장 데이터를 동시에 조회한 뒤 계산기 생성
+        (생성 이후의 계산은 context에 채워진 데이터를 사용하므로 추가 조회가 거의 없음)
+        collector를 넘기지 않으면 조회용 collector를 만들고 조회 후 스레드 풀을 정리한다.
+        """
+        if collector is not None:
+            context, market_snapshot = await collector.fetch(ticker_symbol, period)
+        else:
+            with AsyncDataCollector(statement_store) as collector:
+                context, market_snapshot = await collector.fetch(ticker_symbol, period)
+        return cls(ticker_symbol, context=context, market_snapshot=market_snapshot, beta_table=beta_table)
     
+    @timed_stage("present_value")
     def calculate_10year_present_value(
             self,
             fcfe: float = None, 
@@ -67,6 +139,7 @@ class ValuationCalculator:
 
         return total_present_value, after_10year_fcfe
         
+    @timed_stage("terminal_value")
     def calculate_terminal_value(
             self,
             cost_of_equity: float = None,
@@ -114,85 +187,189 @@ class ValuationCalculator:
         # print(f"Total Value: {total_value}")
         return total_value, fcfe, cost_of_equity, net_income_growth_rate, growth_rate_tv
     
+    @timed_stage("per_share")
     def calculate_per_share(self, period: str = "annual") -> Dict[str, float]:
-        """주당가치 계산"""
-        # 실제 주가 가져오기
-        actual_price = self.info_collector.get_info().get('regularMarketPreviousClose', 0)
-        
-        results = {}
-        best_result = None
-        min_diff = float('inf')
-        
-        # 1~4년 평균으로 계산
-        for years in range(1, 5):
-            try:
-                calculated_fcfe = self._calculate_fcfe(period, years)
-                fcfe = calculated_fcfe['FCFE']
-                
-                calculated_wacc = self._calculate_wacc()
-                cost_of_equity = calculated_wacc['Cost of Equity']
-                
-                calculated_growth = self._calculate_net_income_growth_rate(period, years)
-                growth_rate = calculated_growth['Growth Rate']
-                retention_ratio = calculated_growth['Retention Ratio']
-                roe = calculated_growth['ROE']
-
-                if fcfe <= 0 or roe <= 0:
-                    results[f'result_{years}year'] = None
-                    continue
-                
-                _10year_pv, after_10year_fcfe = self.calculate_10year_present_value(
-                    fcfe=fcfe,
-                    cost_of_equity=cost_of_equity,
-                    net_income_growth_rate=growth_rate,
-                    retention_ratio=retention_ratio
-                )
-                
-                terminal_value_pv, growth_rate_tv = self.calculate_terminal_value(
-                    cost_of_equity=cost_of_equity,
-                    retention_ratio=retention_ratio,
-                    after_10year_fcfe=after_10year_fcfe
-                )
-                
-                total_value = _10year_pv + terminal_value_pv
-                per_share = total_value / self.shares_outstanding
-                
-                # 결과 저장
-                results[f'result_{years}year'] = {
-                    'per_share': per_share,
-                    'cost_of_equity': cost_of_equity,
-                    'growth_rate': growth_rate,
-                    'ratio_capex_ocf': calculated_fcfe['Ratio CapEx/OCF'],
-                    'ratio_repayment_issuance': calculated_fcfe['Ratio Repayment/Issuance']
-                }
+        """주당가치 계산 (iter_per_share의 기간별 결과를 출력하고 최적 결과만 반환)"""
+        non_positive = False
+        for event in self.iter_per_share(period):
+            if event['event'] == 'best':
+                break
+            if event['error'] is not None:
+                print(f"{event['years']}년 평균 계산 중 오류 발생: {event['error']}")
+            elif event['result'] is None:
+                non_positive = True
+            else:
                 print("="*100)
-                print(f"{years}년 평균 주당 가치 계산 결과: {results[f'result_{years}year']['per_share']}\n")
-                
-                # 실제 주가와의 차이 계산
-                diff = abs(per_share - actual_price)
-                if diff < min_diff:
-                    min_diff = diff
-                    best_result = results[f'result_{years}year']
-                
-            except Exception as e:
-                print(f"{years}년 평균 계산 중 오류 발생: {str(e)}")
-                continue
+                print(f"{event['years']}년 평균 주당 가치 계산 결과: {event['result']['per_share']}\n")
 
+        best_result = event['result']
         if best_result is None:
             print("="*100)
-            print("기업의 최근 4년간 ROE, FCFE가 0이거나 음수인 경우, 기업의 영속성을 담보할 수 없기 때문에, DCF 계산이 불가능합니다.")
+            if non_positive:
+                print("기업의 최근 4년간 ROE, FCFE가 0이거나 음수인 경우, 기업의 영속성을 담보할 수 없기 때문에, DCF 계산이 불가능합니다.")
+            else:
+                print("모든 기간의 계산이 실패하여(재무 데이터 누락 등) DCF 계산이 불가능합니다.")
             print("="*100)
             return None
         
         print("="*100)
-        print(f"actual_price: {actual_price}")
+        print(f"actual_price: {event['actual_price']}")
         print(f"Best Result: {best_result['per_share']}")
         print("="*100)
         for key, value in best_result.items():
             print(f"{key}: {value}")
             
         return best_result
-    
+
+    def iter_per_share(self, period: str = "annual") -> Iterator[Dict[str, Any]]:
+        """평균 기간(1~4년)별 주당가치를 계산되는 대로 반환하고, 마지막에 최적 결과를 반환하는 제너레이터
+
+        출력 없이 결과만 반환하므로 UI, LangGraph 노드 등에서 부분 결과를 바로 보여줄 때 사용.
+
+        Args:
+            period (str): 기간 (annual, quarterly, ttm)
+        Yields:
+            Dict[str, Any]:
+                {'event': 'window', 'years': 평균 기간, 'result': 결과 (FCFE 또는 ROE가 0 이하이면 None), 'error': 오류 메시지}
+                {'event': 'best', 'years': 선택된 기간, 'result': 실제 주가와 가장 가까운 결과 (없으면 None), 'actual_price': 실제 주가}
+        """
+        self.graph.set_input("period", period)
+        # 실제 주가 가져오기
+        actual_price = self.graph.get("actual_price")
+
+        best_result = None
+        self.window_results = {}
+        self.best_window = None
+        min_diff = float('inf')
+
+        # 1~4년 평균으로 계산 (자본비용은 기간과 무관하므로 한 번만 계산)
+        for years in range(1, 5):
+            try:
+                result = self._calculate_window(years)
+            except Exception as e:
+                record_failure("per_share", self.ticker_symbol)
+                yield {'event': 'window', 'years': years, 'result': None, 'error': str(e)}
+                continue
+
+            self.window_results[years] = result
+            if result is not None:
+                # 실제 주가와의 차이 계산
+                diff = abs(result['per_share'] - actual_price)
+                if diff < min_diff:
+                    min_diff = diff
+                    best_result = result
+                    self.best_window = years
+            yield {'event': 'window', 'years': years, 'result': result, 'error': None}
+
+        get_metrics().inc("dcf_valuations_total", result="no_result" if best_result is None else "ok")
+        yield {'event': 'best', 'years': self.best_window, 'result': best_result, 'actual_price': actual_price}
+
+    async def aiter_per_share(self, period: str = "annual") -> AsyncIterator[Dict[str, Any]]:
+        """iter_per_share의 비동기 버전 (기간별 계산은 스레드 풀에서 실행하여 이벤트 루프를 막지 않음)"""
+        loop = asyncio.get_running_loop()
+        iterator = self.iter_per_share(period)
+        done = object()
+        # 취소되어도 스레드에서 실행 중인 next가 끝난 뒤에 닫도록 잠금을 공유
+        lock = threading.Lock()
+
+        def step() -> Any:
+            with lock:
+                return next(iterator, done)
+
+        try:
+            while True:
+                event = await loop.run_in_executor(None, step)
+                if event is done:
+                    return
+                yield event
+        finally:
+            # 중간에 break/취소되어도 동기 제너레이터를 닫아 정리되도록 함
+            with lock:
+                iterator.close()
+
+    def check_sector_multiples(self, per_share: Optional[float] = None, table=None, level: str = "industry") -> Optional[Dict[str, object]]:
+        """주당가치가 내포하는 PER을 섹터/산업 PER 분포와 비교 (사전 계산 테이블 사용, 네트워크 조회 없음)
+
+        내포 PER = 주당가치 x 발행주식수 / TTM 순이익
+
+        Args:
+            per_share (float): 비교할 주당가치 (없으면 마지막 calculate_per_share의 선택 결과)
+            table (SectorMultiplesTable): 섹터 멀티플 테이블 (없으면 기본 테이블)
+            level (str): 비교 그룹 (industry, sector)
+        Returns:
+            Dict[str, object]: 내포 PER의 그룹 내 백분위와 10~90 백분위 범위 안에 있는지 여부
+                               (테이블이 없거나, 테이블에 종목이 없거나, TTM 순이익이 0 이하이면 None)
+        """
+        from ..utils.sector_multiples import get_sector_multiples
+
+        if per_share is None:
+            best = self.window_results.get(self.best_window)
+            if best is None:
+                return None
+            per_share = best['per_share']
+
+        table = table or get_sector_multiples()
+        if table is None:
+            return None
+        row = table.ticker(self.ticker_symbol)
+        if row is None or not row['ttm_earnings'] or row['ttm_earnings'] <= 0:
+            return None
+        implied_per = per_share * self.shares_outstanding / row['ttm_earnings']
+        return table.compare_per(self.ticker_symbol, implied_per, level)
+
+    def calculate_per_share_distribution(
+            self,
+            period: str = "annual",
+            years: int = 1,
+            distributions: Optional[Dict[str, Distribution]] = None,
+            n_draws: int = 100_000,
+            percentiles: Tuple[float, ...] = DEFAULT_PERCENTILES,
+            seed: Optional[int] = None
+            ) -> Optional[Dict[str, object]]:
+        """몬테카를로 주당가치 분포 계산
+
+        cost_of_equity, growth_rate, retention_ratio를 분포에서 추출하여 주당가치 백분위수를 계산.
+        분포를 지정하지 않은 변수는 years년 평균으로 계산한 값을 중심으로 한 정규분포를 사용.
+
+        Args:
+            period (str): 기간 (annual, quarterly, ttm)
+            years (int): FCFE, ROE 평균을 계산할 연도 수
+            distributions (Dict[str, Distribution]): 변수별 분포
+            n_draws (int): 표본 수
+            percentiles (Tuple[float, ...]): 반환할 백분위수
+            seed (int): 난수 시드
+        Returns:
+            Dict[str, object]: 백분위수별 주당가치와 중심값 (FCFE 또는 ROE가 0 이하이면 None)
+        """
+        self.graph.set_input("period", period)
+        self._add_window_nodes(years)
+        calculated_fcfe = self.graph.get(("fcfe", years))
+        cost_of_equity = self.graph.get("cost_of_equity")
+        calculated_growth = self.graph.get(("growth", years))
+        if calculated_fcfe is None or calculated_growth is None:
+            raise ValueError(f"{years}년 평균 FCFE 또는 ROE를 계산하지 못했습니다. (재무 데이터 누락 여부 확인)")
+
+        fcfe = calculated_fcfe['FCFE']
+        if fcfe <= 0 or calculated_growth['ROE'] <= 0:
+            print("ROE, FCFE가 0이거나 음수인 경우, 기업의 영속성을 담보할 수 없기 때문에, DCF 계산이 불가능합니다.")
+            return None
+
+        default_distributions = {
+            'cost_of_equity': Distribution.normal(cost_of_equity, 0.01),
+            'growth_rate': Distribution.normal(calculated_growth['Growth Rate'], 0.02),
+            'retention_ratio': Distribution.normal(calculated_growth['Retention Ratio'], 0.05),
+        }
+        distributions = {**default_distributions, **(distributions or {})}
+
+        result = simulate_per_share(fcfe, self.shares_outstanding, distributions, n_draws, percentiles, seed)
+        result.update({
+            'fcfe': fcfe,
+            'cost_of_equity': cost_of_equity,
+            'growth_rate': calculated_growth['Growth Rate'],
+            'retention_ratio': calculated_growth['Retention Ratio'],
+        })
+        return result
+
     def _calculate_fcfe(self, period: str = "annual", years: int = None) -> Dict[str, float]:
         """FCFE 계산"""
         return self.fcfe_calculator.calculate_fcfe(period, years)
@@ -203,4 +380,61 @@ class ValuationCalculator:
     
     def _calculate_net_income_growth_rate(self, period: str = "annual", years: int = None) -> Dict[str, float]:
         """성장률 계산"""
-        return self.net_income_growth_calculator.calculate_net_income_growth_rate(period, years)
\ No newline at end of file
+        return self.net_income_growth_calculator.calculate_net_income_growth_rate(period, years)
+
+    def _add_window_nodes(self, years: int) -> None:
+        """years년 평균 계산에 필요한 노드를 그래프에 추가 (이미 있으면 무시)"""
+        if ("result", years) in self.graph:
+            return
+
+        graph = self.graph
+        graph.add_node(("fcfe", years), lambda period: self._calculate_fcfe(period, years), ["period"])
+        graph.add_node(("growth", years), lambda period: self._calculate_net_income_growth_rate(period, years), ["period"])
+        graph.add_node(
+            ("present_value", years),
+            lambda fcfe, cost_of_equity, growth: self.calculate_10year_present_value(
+                fcfe=fcfe['FCFE'],
+                cost_of_equity=cost_of_equity,
+                net_income_growth_rate=growth['Growth Rate'],
+                retention_ratio=growth['Retention Ratio']
+            ),
+            [("fcfe", years), "cost_of_equity", ("growth", years)],
+        )
+        graph.add_node(
+            ("terminal_value", years),
+            lambda present_value, cost_of_equity, growth: self.calculate_terminal_value(
+                cost_of_equity=cost_of_equity,
+                retention_ratio=growth['Retention Ratio'],
+                after_10year_fcfe=present_value[1]
+            ),
+            [("present_value", years), "cost_of_equity", ("growth", years)],
+        )
+        graph.add_node(
+            ("per_share", years),
+            lambda present_value, terminal_value, shares_outstanding: (present_value[0] + terminal_value[0]) / shares_outstanding,
+            [("present_value", years), ("terminal_value", years), "shares_outstanding"],
+        )
+        graph.add_node(
+            ("result", years),
+            lambda fcfe, cost_of_equity, growth, per_share: {
+                'per_share': per_share,
+                'cost_of_equity': cost_of_equity,
+                'growth_rate': growth['Growth Rate'],
+                'ratio_capex_ocf': fcfe['Ratio CapEx/OCF'],
+                'ratio_repayment_issuance': fcfe['Ratio Repayment/Issuance']
+            },
+            [("fcfe", years), "cost_of_equity", ("growth", years), ("per_share", years)],
+        )
+
+    def _calculate_window(self, years: int) -> Optional[Dict[str, float]]:
+        """years년 평균 주당가치 계산 (FCFE 또는 ROE가 0 이하이면 None)"""
+        self._add_window_nodes(years)
+        calculated_fcfe = self.graph.get(("fcfe", years))
+        self.graph.get("cost_of_equity")
+        calculated_growth = self.graph.get(("growth", years))
+        if calculated_fcfe is None or calculated_growth is None:
+            raise ValueError(f"{years}년 평균 FCFE 또는 ROE를 계산하지 못했습니다. (재무 데이터 누락 여부 확인)")
+
+        if calculated_fcfe['FCFE'] <= 0 or calculated_growth['ROE'] <= 0:
+            return None
+        return dict(self.graph.get(("result", years)))
@@ -0,0 +1,82 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+class ValuationGraph:
+    """밸류에이션 입력과 중간 계산값을 노드로 표현하는 의존성 그래프
+
+    - 입력 노드(add_input)는 값을 직접 지정하고, 계산 노드(add_node)는 의존 노드 값으로 계산
+    - 계산 노드는 처음 요청될 때 계산하여(지연 평가) 무효화되기 전까지 재사용
+    - set_input으로 입력이 바뀌면 그 입력에 의존하는 하위 노드만 무효화
+      (예: 주가, 발행주식수만 바뀌면 FCFE, ROE, 자본비용은 다시 계산하지 않음)
+    - 계산 중 예외가 발생하거나 None(계산기의 실패 반환값)을 반환하면 값을 저장하지 않으므로 다음 요청 시 다시 계산
+    """
+
+    def __init__(self):
+        self._inputs: Dict[Hashable, Any] = {}
+        self._funcs: Dict[Hashable, Callable[..., Any]] = {}
+        self._deps: Dict[Hashable, Tuple[Hashable, ...]] = {}
+        self._dependents: Dict[Hashable, Set[Hashable]] = {}
+        self._values: Dict[Hashable, Any] = {}
+        # 노드별 계산 횟수 (무효화가 의도대로 동작하는지 확인용)
+        self.evaluations: Dict[Hashable, int] = {}
+
+    def __contains__(self, name: Hashable) -> bool:
+        return name in self._inputs or name in self._funcs
+
+    def add_input(self, name: Hashable, value: Any) -> None:
+        """입력 노드 추가"""
+        self._inputs[name] = value
+        self._dependents.setdefault(name, set())
+
+    def add_node(self, name: Hashable, func: Callable[..., Any], deps: Iterable[Hashable] = ()) -> None:
+        """계산 노드 추가 (func는 deps 순서대로 의존 노드 값을 인자로 받음)"""
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self:
+                raise KeyError(f"의존 노드 {dep}가 그래프에 없습니다.")
+        self._funcs[name] = func
+        self._deps[name] = deps
+        self._dependents.setdefault(name, set())
+        for dep in deps:
+            self._dependents[dep].add(name)
+
+    def set_input(self, name: Hashable, value: Any) -> None:
+        """입력값 변경 (값이 같으면 무효화하지 않음)"""
+        if name not in self._inputs:
+            raise KeyError(f"입력 노드 {name}가 그래프에 없습니다.")
+        if self._same(self._inputs[name], value):
+            return
+        self._inputs[name] = value
+        self.invalidate(name)
+
+    def get(self, name: Hashable) -> Any:
+        """노드 값 조회 (필요한 경우에만 계산)"""
+        if name in self._inputs:
+            return self._inputs[name]
+        if name in self._values:
+            return self._values[name]
+        if name not in self._funcs:
+            raise KeyError(f"노드 {name}가 그래프에 없습니다.")
+
+        value = self._funcs[name](*(self.get(dep) for dep in self._deps[name]))
+        self.evaluations[name] = self.evaluations.get(name, 0) + 1
+        # 계산기들은 실패 시 예외 대신 None을 반환하므로 None은 실패로 보고 저장하지 않음
+        if value is not None:
+            self._values[name] = value
+        return value
+
+    def invalidate(self, name: Hashable) -> None:
+        """노드의 모든 하위 노드 값 삭제 (계산 노드이면 자기 자신 포함)"""
+        stack = [name]
+        while stack:
+            node = stack.pop()
+            self._values.pop(node, None)
+            stack.extend(self._dependents.get(node, ()))
+
+    @staticmethod
+    def _same(old: Any, new: Any) -> bool:
+        if old is new:
+            return True
+        try:
+            return bool(old == new)
+        except Exception:
+            return False
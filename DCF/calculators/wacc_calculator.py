@@ -1,27 +1,37 @@
 from typing import Dict, Optional
 from ..collectors.financial_data_collector import FinancialDataCollector
-from ..collectors.market_data_collector import MarketDataCollector
+from ..collectors.financial_metrics import FinancialMetrics
+from ..collectors.market_data_collector import MarketParameterSnapshot, get_market_snapshot
+from ..collectors.ticker_data_context import TickerDataContext
 from ..utils.financial_utils import get_yfinance_beta, calculate_beta
-import pandas as pd
+from ..utils.beta_matrix import BetaTable
+from ..utils.metrics import record_failure, record_fallback, timed_stage
 
 class WACCCalculator:
     """WACC(Weighted Average Cost of Capital)를 계산하는 클래스"""
     
-    def __init__(self, ticker_symbol: str):
+    def __init__(
+            self,
+            ticker_symbol: str,
+            context: Optional[TickerDataContext] = None,
+            market_snapshot: Optional[MarketParameterSnapshot] = None,
+            beta_table: Optional[BetaTable] = None
+            ):
         self.ticker_symbol = ticker_symbol
-        self.financial_collector = FinancialDataCollector(ticker_symbol)
-        self.market_collector = MarketDataCollector()
+        self.financial_collector = FinancialDataCollector(ticker_symbol, context)
+        # 배치 실행 시 유니버스 전체를 한 번에 계산한 베타 테이블
+        self.beta_table = beta_table
+        # 지정하지 않으면 프로세스 공유 스냅샷 사용 (배치 전체에서 시장 데이터는 한 번만 조회)
+        self.market_snapshot = market_snapshot
         self.effective_tax_rate = None
     
+    @timed_stage("wacc")
     def calculate_wacc(self) -> Dict[str, float]:
         """WACC 계산"""
         try:
             # 재무 지표 수집
             metrics = self.financial_collector.extract_financial_metrics()
             
-            # Series 객체에서 값 추출
-            metrics = {key: value.iloc[0] if isinstance(value, pd.Series) else value for key, value in metrics.items()}
-            
             # 실효세율 먼저 계산
             self.effective_tax_rate = self._calculate_effective_tax_rate(metrics)
             
@@ -60,16 +70,30 @@ class WACCCalculator:
             
         except Exception as e:
             print(f"WACC 계산 중 오류 발생: {str(e)}")
+            record_failure("wacc", self.ticker_symbol)
             return None
     
-    def _calculate_cost_of_equity(self) -> float:
+    @timed_stage("wacc")
+    def calculate_cost_of_equity(self, market_snapshot: Optional[MarketParameterSnapshot] = None) -> float:
+        """자본비용만 계산 (주당가치 계산에는 부채비용, 자본구조, 실효세율이 필요 없음)
+
+        Args:
+            market_snapshot (MarketParameterSnapshot): 사용할 시장 파라미터 (없으면 생성 시 지정한 값 또는 프로세스 공유 스냅샷)
+        Returns:
+            float: 자본비용
+        """
+        return self._calculate_cost_of_equity(market_snapshot)
+
+    def _calculate_cost_of_equity(self, market_snapshot: Optional[MarketParameterSnapshot] = None) -> float:
         """자본비용 계산 (CAPM 모델 사용)"""
+        snapshot = market_snapshot or self.market_snapshot or get_market_snapshot(provider=self.financial_collector.context.provider)
+
         # 무위험수익률 조회
-        self.risk_free_rate = self.market_collector.get_risk_free_rate()
+        self.risk_free_rate = snapshot.risk_free_rate
         # print(f"무위험수익률: {self.risk_free_rate:.2%}")
         
         # 시장위험프리미엄 계산
-        self.market_risk_premium = self.market_collector.get_market_risk_premium()
+        self.market_risk_premium = snapshot.market_risk_premium
         # print(f"시장위험프리미엄: {self.market_risk_premium:.2%}")
         
         # 베타 계산
@@ -79,11 +103,11 @@ class WACCCalculator:
         # CAPM 모델로 자본비용 계산
         return self.risk_free_rate + (self.beta * self.market_risk_premium)
     
-    def _calculate_cost_of_debt(self, metrics: Dict[str, float]) -> float:
+    def _calculate_cost_of_debt(self, metrics: FinancialMetrics) -> float:
         """부채비용 계산 (세후 기준)"""
         try:
-            interest_expense = abs(metrics['interest_expense'])
-            total_debt = metrics['total_debt']
+            interest_expense = abs(metrics.latest('interest_expense'))
+            total_debt = metrics.latest('total_debt')
             
             if total_debt == 0:
                 return 0
@@ -92,13 +116,14 @@ class WACCCalculator:
             return interest_expense / total_debt
             
         except Exception:
+            record_fallback("cost_of_debt", self.ticker_symbol)
             return 0.045  # 기본값
     
-    def _calculate_capital_structure(self, metrics: Dict[str, float]) -> tuple[float, float]:
+    def _calculate_capital_structure(self, metrics: FinancialMetrics) -> tuple[float, float]:
         """자본구조 계산 (장부가 기준)"""
         try:
-            total_equity = metrics['total_equity']
-            total_debt = metrics['total_liabilities_net_minority_interest']
+            total_equity = metrics.latest('total_equity')
+            total_debt = metrics.latest('total_liabilities_net_minority_interest')
             
             total_value = total_equity + total_debt
             
@@ -109,13 +134,14 @@ class WACCCalculator:
             
         except Exception as e:
             print(f"자본구조 계산 중 오류 발생: {str(e)}")
+            record_fallback("capital_structure", self.ticker_symbol)
             return 0.5, 0.5
     
-    def _calculate_effective_tax_rate(self, metrics: Dict[str, float]) -> float:
+    def _calculate_effective_tax_rate(self, metrics: FinancialMetrics) -> float:
         """실효세율 계산"""
         try:
-            pretax_income = metrics['pretax_income']
-            income_tax = metrics['tax_provision']
+            pretax_income = metrics.latest('pretax_income')
+            income_tax = metrics.latest('tax_provision')
             
             # if pretax_income == 0:
             #     return 0.22
@@ -124,19 +150,27 @@ class WACCCalculator:
             print(f"실효세율: {effective_tax_rate:.2%}")
 
             if not (0 <= effective_tax_rate <= 1):
+                record_fallback("effective_tax_rate", self.ticker_symbol)
                 return 0.22
                 
             return effective_tax_rate
             
         except Exception:
+            record_fallback("effective_tax_rate", self.ticker_symbol)
             return 0.22
     
     def _get_beta(self) -> float:
         """베타값 조회 또는 계산"""
-        # yfinance에서 베타값 조회 시도
-        beta = get_yfinance_beta(self.ticker_symbol)
+        # yfinance에서 베타값 조회 시도 (context에 캐시된 info 재사용)
+        beta = get_yfinance_beta(self.ticker_symbol, self.financial_collector.context.get_info())
         if beta is not None:
             return beta
         
+        # 배치 실행 시 미리 계산한 베타 테이블 사용
+        if self.beta_table is not None:
+            beta = self.beta_table.get(self.ticker_symbol)
+            if beta is not None:
+                return beta
+
         # 직접 계산
-        return calculate_beta(self.ticker_symbol) 
\ No newline at end of file
+        return calculate_beta(self.ticker_symbol, provider=self.financial_collector.context.provider) 
\ No newline at end of file
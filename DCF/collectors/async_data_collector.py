@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from .market_data_collector import (
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    MarketDataCollector,
+    MarketParameterSnapshot,
+    get_cached_market_snapshot,
+    set_market_snapshot,
+)
+from .providers import MarketDataProvider
+from .statement_store import StatementStore
+from .ticker_data_context import TickerDataContext
+
+STATEMENTS = ("income_stmt", "balance_sheet", "cash_flow")
+
+class AsyncDataCollector:
+    """재무제표, info, 시장 데이터를 동시에 조회하는 asyncio 기반 collector
+
+    yfinance, fredapi는 블로킹 API이므로 스레드 풀에서 실행하고,
+    조회 결과는 TickerDataContext에 채워 두어 이후 계산기들이 네트워크 없이 사용하도록 한다.
+    executor를 넘기지 않으면 직접 만든 스레드 풀을 close() 또는 with 블록 종료 시 정리한다.
+    """
+
+    def __init__(
+            self,
+            statement_store: Optional[StatementStore] = None,
+            max_concurrency: int = 8,
+            executor: Optional[Executor] = None,
+            provider: Optional[MarketDataProvider] = None
+            ):
+        self.statement_store = statement_store
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        # 티커당 재무제표 3종 + info, 시장 데이터 2종을 동시에 실행할 수 있는 크기의 스레드 풀
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency * (len(STATEMENTS) + 1) + 2,
+            thread_name_prefix="dcf-fetch",
+        )
+
+    def close(self) -> None:
+        """직접 만든 스레드 풀 종료 (외부에서 넘긴 executor는 호출한 쪽에서 관리)"""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+    def __enter__(self) -> "AsyncDataCollector":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def _run(self, func: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def fetch_ticker(self, ticker_symbol: str, period: str = "annual", context: Optional[TickerDataContext] = None) -> TickerDataContext:
+        """한 티커의 재무제표 3종과 info를 동시에 조회하여 context에 채움"""
+        context = context or TickerDataContext(ticker_symbol, store=self.statement_store, provider=self.provider)
+        await asyncio.gather(
+            *(self._run(context.get_statement, statement, period) for statement in STATEMENTS),
+            self._run(context.get_info),
+        )
+        return context
+
+    async def fetch_market_snapshot(self, max_age: timedelta = DEFAULT_SNAPSHOT_MAX_AGE) -> MarketParameterSnapshot:
+        """DGS3와 S&P 500 가격을 동시에 조회하여 프로세스 공유 시장 스냅샷 갱신"""
+        collector = MarketDataCollector(self.provider)
+        snapshot = get_cached_market_snapshot(max_age, collector.provider)
+        if snapshot is not None:
+            return snapshot
+
+        end_date = collector.provider.now()
+        start_date = end_date - timedelta(days=365 * 3)
+        treasury_data, market_prices = await asyncio.gather(
+            self._run(collector._get_treasury_series, start_date, end_date),
+            self._run(collector._get_market_prices, start_date, end_date),
+            return_exceptions=True,
+        )
+        # 조회에 실패한 데이터는 None으로 넘겨 기존 경로(재조회, 기본값)를 따르도록 함
+        treasury_data = None if isinstance(treasury_data, Exception) else treasury_data
+        market_prices = None if isinstance(market_prices, Exception) else market_prices
+
+        snapshot = await self._run(collector.get_snapshot, treasury_data, market_prices)
+        set_market_snapshot(snapshot, collector.provider)
+        return snapshot
+
+    async def fetch(self, ticker_symbol: str, period: str = "annual") -> Tuple[TickerDataContext, MarketParameterSnapshot]:
+        """한 티커의 재무제표/info와 시장 데이터를 동시에 조회"""
+        return await asyncio.gather(self.fetch_ticker(ticker_symbol, period), self.fetch_market_snapshot())
+
+    async def fetch_many(self, tickers: Iterable[str], period: str = "annual") -> Tuple[Dict[str, TickerDataContext], Dict[str, Exception]]:
+        """여러 티커를 동시에 조회 (동시 조회 티커 수는 max_concurrency로 제한)
+
+        returns:
+            Tuple[Dict[str, TickerDataContext], Dict[str, Exception]]: 조회 성공 context, 실패 티커별 예외
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_one(ticker_symbol: str) -> TickerDataContext:
+            async with semaphore:
+                return await self.fetch_ticker(ticker_symbol, period)
+
+        tickers = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(*(fetch_one(ticker) for ticker in tickers), return_exceptions=True)
+
+        contexts, errors = {}, {}
+        for ticker, result in zip(tickers, results):
+            if isinstance(result, Exception):
+                errors[ticker] = result
+            else:
+                contexts[ticker] = result
+        return contexts, errors
@@ -1,38 +1,60 @@
-import yfinance as yf
-import pandas as pd
-from typing import Dict, Optional, Tuple
+from __future__ import annotations
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from .financial_metrics import FinancialMetrics
+from .ticker_data_context import TickerDataContext
 
-pd.set_option('future.no_silent_downcasting', True)
+if TYPE_CHECKING:
+    import pandas as pd
+
+@lru_cache(maxsize=None)
+def _pandas():
+    """pandas를 처음 사용할 때 불러오고 옵션 설정 (import 시간 단축)"""
+    import pandas as pd
+    pd.set_option('future.no_silent_downcasting', True)
+    return pd
 
 class FinancialDataCollector:
     """재무제표 데이터를 수집하는 클래스"""
+
+    # 기간 합계로 집계되는 손익계산서, 현금흐름표 지표 (TTM 모드에서 4분기 합산)
+    FLOW_METRICS = (
+        'ebit', 'ebitda', 'tax_provision', 'net_income',
+        'capital_expenditure', 'operating_cash_flow', 'repayment_of_debt', 'issuance_of_debt',
+    )
     
-    def __init__(self, ticker_symbol: str):
+    def __init__(self, ticker_symbol: str, context: Optional[TickerDataContext] = None):
         self.ticker_symbol = ticker_symbol
-        self.stock = yf.Ticker(ticker_symbol)
+        self.context = context or TickerDataContext(ticker_symbol)
     
     def get_financial_statements(self, period: str = "annual") -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """재무제표 데이터를 가져오는 메서드
         
         args:
-            period (str): 주기 (annual, quarterly)
+            period (str): 주기 (annual, quarterly, ttm은 분기 재무제표 사용)
 
         returns:
             Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: 재무제표 데이터
         """
-        if period == "annual":
-            income_stmt = self.stock.financials
-            balance_sheet = self.stock.balance_sheet
-            cash_flow = self.stock.cashflow
-        else:
-            income_stmt = self.stock.quarterly_financials
-            balance_sheet = self.stock.quarterly_balance_sheet
-            cash_flow = self.stock.quarterly_cashflow
+        income_stmt = self.context.get_statement("income_stmt", period)
+        balance_sheet = self.context.get_statement("balance_sheet", period)
+        cash_flow = self.context.get_statement("cash_flow", period)
             
         return income_stmt, balance_sheet, cash_flow
     
-    def extract_financial_metrics(self, period: str = "annual") -> Dict[str, pd.Series]:
-        """필요한 재무 지표들을 추출하는 메서드"""
+    def extract_financial_metrics(self, period: str = "annual") -> FinancialMetrics:
+        """필요한 재무 지표들을 추출하는 메서드 (context에 캐시되어 기간별로 한 번만 파싱)
+
+        period가 ttm이면 분기 지표를 최근 4분기 합계(TTM)로 변환하여,
+        연간 보고서 사이에도 최신 분기까지 반영한 FCFE, ROE를 계산할 수 있도록 한다.
+        """
+        if period == "ttm":
+            return self.context.get_or_load(("metrics", period), lambda: self.extract_financial_metrics("quarterly").to_ttm(self.FLOW_METRICS))
+        return self.context.get_or_load(("metrics", period), lambda: FinancialMetrics.from_series(self._extract_financial_metrics(period)))
+
+    def _extract_financial_metrics(self, period: str = "annual") -> Dict[str, pd.Series]:
+        """재무제표에서 재무 지표들을 지표별 Series로 파싱"""
+        _pandas()
         income_stmt, balance_sheet, cash_flow = self.get_financial_statements(period)
         metrics = {}
 
@@ -126,13 +148,13 @@ class FinancialDataCollector:
         repayment_of_debt_keys = ['Repayment Of Debt']
         metrics['repayment_of_debt'] = self._find_metric(cash_flow, repayment_of_debt_keys, "부채상환")
         if metrics['repayment_of_debt'].isna().any():
-            metrics['repayment_of_debt'] = pd.to_numeric(metrics['repayment_of_debt'].fillna(0))
+            metrics['repayment_of_debt'] = _pandas().to_numeric(metrics['repayment_of_debt'].fillna(0))
         
         # Issuance of Debt 추출
         issuance_of_debt_keys = ['Issuance Of Debt']
         metrics['issuance_of_debt'] = self._find_metric(cash_flow, issuance_of_debt_keys, "부채발행")
         if metrics['issuance_of_debt'].isna().any():
-            metrics['issuance_of_debt'] = pd.to_numeric(metrics['issuance_of_debt'].fillna(0))
+            metrics['issuance_of_debt'] = _pandas().to_numeric(metrics['issuance_of_debt'].fillna(0))
 
         return metrics
     
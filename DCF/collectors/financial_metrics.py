@@ -0,0 +1,111 @@
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+@dataclass(frozen=True, slots=True)
+class FinancialMetrics:
+    """재무 지표를 하나의 기간 인덱스와 (지표 x 기간) 2차원 배열로 보관하는 클래스
+
+    기간은 지표들의 날짜 교집합(모든 재무제표에 있는 기간)을 최근 순으로 정렬한 것이며,
+    그 기간 안에서도 값이 비어 있는 지표는 NaN으로 두고 window에서 누락으로 보고한다.
+    계산기들은 pandas 원소 단위 인덱싱 대신 배열 슬라이스로 n년 평균 등을 계산한다.
+    step은 1년에 해당하는 기간 수로, TTM 지표(분기마다 갱신되는 4분기 합계)는 4이다.
+    """
+    periods: pd.Index
+    names: Tuple[str, ...]
+    values: np.ndarray
+    index: Dict[str, int]
+    step: int = 1
+
+    @classmethod
+    def from_series(cls, series: Dict[str, pd.Series]) -> "FinancialMetrics":
+        """지표별 Series를 날짜 기준으로 정렬하여 하나의 배열로 변환
+
+        일부 재무제표에만 있는 기간은 다른 지표가 NaN이 되므로 제외한다.
+        """
+        import pandas as pd
+        periods = None
+        for values in series.values():
+            periods = values.index if periods is None else periods.intersection(values.index)
+        periods = pd.Index([]) if periods is None else periods.sort_values(ascending=False)
+
+        names = tuple(series)
+        values = np.empty((len(names), len(periods)), dtype=float)
+        for row, name in enumerate(names):
+            values[row] = pd.to_numeric(series[name].reindex(periods), errors="coerce").to_numpy(dtype=float)
+        return cls(periods, names, values, {name: row for row, name in enumerate(names)})
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def _position(self, name: str) -> int:
+        try:
+            return self.index[name]
+        except KeyError:
+            raise KeyError(f"{name} 데이터를 찾을 수 없습니다.")
+
+    def row(self, name: str) -> np.ndarray:
+        """지표 하나의 전체 기간 값 (최근 순, 없는 지표는 KeyError)"""
+        return self.values[self._position(name)]
+
+    def latest(self, name: str) -> float:
+        """지표의 가장 최근 기간 값"""
+        return float(self.row(name)[0])
+
+    def window(self, names: Sequence[str], years: int) -> np.ndarray:
+        """최근 years년의 (지표 x 기간) 배열 (기간이 없거나 값이 누락된 지표가 있으면 ValueError)
+
+        step이 4이면 1년 간격(4분기마다)의 TTM 값만 선택하여 겹치지 않는 연간 값으로 평균을 계산
+        """
+        if len(self.periods) == 0 or years <= 0:
+            raise ValueError("재무 지표 기간이 없습니다.")
+        values = self.values[[self._position(name) for name in names], :years * self.step:self.step]
+        # NaN이 평균에 섞이면 0 이하 검사를 통과하여 원인이 가려지므로 누락을 명시적으로 알림
+        missing = [names[row] for row in np.flatnonzero(np.isnan(values).any(axis=1))]
+        if missing:
+            raise ValueError(f"최근 {years}년 재무 지표 중 {', '.join(missing)} 데이터가 누락되었습니다.")
+        return values
+
+    def to_ttm(self, flow_names: Sequence[str], quarters: int = 4, max_span_days: int = 300) -> "FinancialMetrics":
+        """분기 지표를 TTM(최근 4분기) 지표로 변환
+
+        손익계산서, 현금흐름표 항목(flow_names)은 모든 기간에 대해 4분기 이동합계를 한 번에 계산하고,
+        재무상태표 항목은 각 분기말 값을 그대로 사용한다.
+        4분기가 연속되지 않은(분기 누락) 구간의 이동합계는 NaN으로 둔다.
+
+        args:
+            flow_names: 합산할 지표 이름
+            quarters (int): 합산할 분기 수
+            max_span_days (int): 첫 분기말과 마지막 분기말 사이 최대 일수 (넘으면 분기 누락으로 간주)
+        """
+        n = len(self.periods) - quarters + 1
+        if n <= 0:
+            return FinancialMetrics(self.periods[:0], self.names, self.values[:, :0], self.index, step=quarters)
+
+        values = self.values[:, :n].copy()
+        flow_rows = [self._position(name) for name in flow_names if name in self.index]
+        # 최근 순으로 정렬되어 있으므로 j번째 창은 j ~ j+quarters-1 번째 분기
+        windows = np.lib.stride_tricks.sliding_window_view(self.values[flow_rows], quarters, axis=1)
+        values[flow_rows] = windows.sum(axis=-1)
+
+        import pandas as pd
+        periods = pd.DatetimeIndex(self.periods)
+        span = (periods[:n] - periods[quarters - 1:]).days
+        values[np.ix_(flow_rows, np.flatnonzero(span > max_span_days))] = np.nan
+        return FinancialMetrics(self.periods[:n], self.names, values, self.index, step=quarters)
+
+    def window_mean(self, name: str, years: int) -> float:
+        """최근 years개 기간의 평균"""
+        return float(self.window([name], years)[0].mean())
+
+    def to_frame(self) -> pd.DataFrame:
+        """지표를 행, 기간을 열로 하는 DataFrame (디버깅, 저장용)"""
+        import pandas as pd
+        return pd.DataFrame(self.values, index=list(self.names), columns=self.periods)
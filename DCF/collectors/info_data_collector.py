@@ -1,11 +1,13 @@
-import yfinance as yf
+from typing import Optional
+from .ticker_data_context import TickerDataContext
+from ..utils.metrics import record_fallback
 
 class InfoDataCollector:
     """info 데이터를 수집하는 클래스"""
     
-    def __init__(self, ticker_symbol: str):
+    def __init__(self, ticker_symbol: str, context: Optional[TickerDataContext] = None):
         self.ticker_symbol = ticker_symbol
-        self.stock = yf.Ticker(ticker_symbol)
+        self.context = context or TickerDataContext(ticker_symbol)
     
     def get_info(self) -> dict:
         """info 데이터를 가져오는 메서드
@@ -14,8 +16,8 @@ class InfoDataCollector:
             dict: info 딕셔너리
         """
 
-        info = self.stock.info
-        info_metrics = self._get_info_metrics(info)
+        info = self.context.get_info()
+        info_metrics = self.context.get_or_load(("info_metrics",), lambda: self._get_info_metrics(info))
             
         return info_metrics
     
@@ -27,18 +29,21 @@ class InfoDataCollector:
             metrics['payout_ratio'] = info['payoutRatio']
         except KeyError:
             metrics['payout_ratio'] = 0
+            record_fallback("payout_ratio", self.ticker_symbol)
             # print("payoutRatio 데이터를 찾을 수 없습니다. 배당이 없던 것으로 간주하여, payout_ratio = 0으로 대체합니다.")
 
         try:
             metrics['regularMarketPreviousClose'] = info['regularMarketPreviousClose']
         except KeyError:
             metrics['regularMarketPreviousClose'] = 0
+            record_fallback("previous_close", self.ticker_symbol)
             print("regularMarketPreviousClose 데이터를 찾을 수 없습니다.")
 
         try:
             metrics['shares_outstanding'] = info['sharesOutstanding']
         except KeyError:
             metrics['shares_outstanding'] = 1
+            record_fallback("shares_outstanding", self.ticker_symbol)
             print("sharesOutstanding 데이터를 찾을 수 없습니다.")
         
         return metrics
\ No newline at end of file
@@ -1,78 +1,169 @@
-import yfinance as yf
-from fredapi import Fred
+from __future__ import annotations
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-import os
-from typing import Optional, Tuple
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple
+from .providers import MarketDataProvider, get_default_provider
+from .single_flight import get_single_flight
+from ..utils.metrics import record_fallback
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+@dataclass(frozen=True)
+class MarketParameterSnapshot:
+    """배치/일 단위로 한 번 계산하여 모든 WACC 계산이 공유하는 시장 파라미터"""
+    risk_free_rate: float
+    market_risk_premium: float
+    as_of: datetime
 
 class MarketDataCollector:
     """시장 데이터를 수집하는 클래스"""
-    
-    def __init__(self):
-        self.fred = Fred(api_key=os.getenv("FRED_API_KEY"))
-    
-    def get_risk_free_rate(self) -> float:
+
+    def __init__(self, provider: Optional[MarketDataProvider] = None):
+        self.provider = provider or get_default_provider()
+
+    def get_snapshot(self, treasury_data: Optional[pd.Series] = None, market_prices: Optional[pd.DataFrame] = None) -> MarketParameterSnapshot:
+        """무위험수익률과 시장위험프리미엄을 한 번에 계산
+        DGS3는 3년치를 한 번만 조회하여 현재/과거 무위험수익률에 함께 사용
+        (미리 조회한 DGS3, S&P 500 데이터가 있으면 재사용)
+        """
+        end_date = self.provider.now()
+        start_date = end_date - timedelta(days=365 * 3)
+        if treasury_data is None:
+            try:
+                treasury_data = self._get_treasury_series(start_date, end_date)
+            except Exception as e:
+                print(f"무위험수익률 조회 중 오류 발생: {str(e)}")
+
+        return MarketParameterSnapshot(
+            risk_free_rate=self.get_risk_free_rate(treasury_data),
+            market_risk_premium=self.get_market_risk_premium(treasury_data, market_prices),
+            as_of=end_date,
+        )
+
+    def get_risk_free_rate(self, treasury_data: Optional[pd.Series] = None) -> float:
         """현재 무위험수익률 조회 (미국 3년 국채)"""
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365 * 3)
-            
-            treasury_data = self.fred.get_series('DGS3', 
-                                               start_date=start_date,
-                                               end_date=end_date)
-            
+            if treasury_data is None:
+                end_date = self.provider.now()
+                start_date = end_date - timedelta(days=365 * 3)
+                treasury_data = self._get_treasury_series(start_date, end_date)
+
             return float(treasury_data.dropna().iloc[-1]) / 100
-            
+
         except Exception as e:
             print(f"무위험수익률 조회 중 오류 발생: {str(e)}")
+            record_fallback("risk_free_rate")
             return 0.035
-    
-    def get_market_risk_premium(self) -> float:
+
+    def get_market_risk_premium(self, treasury_data: Optional[pd.Series] = None, market_prices: Optional[pd.DataFrame] = None) -> float:
         """시장위험프리미엄 계산
         S&P 500 기준, 3년 기간 동안 미국 국채 3년물 대비 초과 수익률 계산
         (코스피, 한국 국채로 계산하는 경우 마이너스 값 나와서 대체사용)
         시장이 글로벌하게 연결되어 있어서 미국 시장 기준으로 계산해도 무방
         """
         try:
-            end_date = datetime.now()
+            end_date = self.provider.now()
             start_date = end_date - timedelta(days=365 * 3)
-            
-            market_return = self._calculate_market_return(start_date, end_date)
-            historical_rf = self._get_historical_risk_free_rate(start_date)
-            
+
+            market_return = self._calculate_market_return(start_date, end_date, market_prices)
+            historical_rf = self._get_historical_risk_free_rate(start_date, treasury_data)
+
             market_risk_premium = market_return - historical_rf
-            
+
             if not (0 <= market_risk_premium <= 0.2):
+                record_fallback("market_risk_premium")
                 return 0.06
-                
+
             return market_risk_premium
-            
+
         except Exception as e:
             print(f"시장위험프리미엄 계산 중 오류 발생: {str(e)}")
+            record_fallback("market_risk_premium")
             return 0.06
-    
-    def _calculate_market_return(self, start_date: datetime, end_date: datetime) -> float:
-        """특정 기간의 시장 수익률 계산"""
-        sp500_start = yf.download('^GSPC',
-                                start=start_date,
-                                end=start_date + timedelta(days=5),
-                                interval='1d',
-                                progress=False)
-        
-        sp500_end = yf.download('^GSPC',
-                              start=end_date - timedelta(days=5),
-                              end=end_date,
-                              interval='1d',
-                              progress=False)
-        
-        start_price = float(sp500_start['Adj Close'].iloc[-1].iloc[0])
-        end_price = float(sp500_end['Adj Close'].iloc[-1].iloc[0])
-        
+
+    def _calculate_market_return(self, start_date: datetime, end_date: datetime, market_prices: Optional[pd.DataFrame] = None) -> float:
+        """특정 기간의 시장 수익률 계산 (S&P 500 전체 기간을 한 번만 조회)"""
+        if market_prices is None:
+            market_prices = self._get_market_prices(start_date, end_date)
+        prices = market_prices['Adj Close']
+
+        start_price = float(prices.loc[:start_date + timedelta(days=5)].iloc[-1].iloc[0])
+        end_price = float(prices.loc[end_date - timedelta(days=5):].iloc[-1].iloc[0])
+
         return (end_price / start_price) ** (1/10) - 1
-    
-    def _get_historical_risk_free_rate(self, date: datetime) -> float:
+
+    def _get_market_prices(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """S&P 500 일별 가격 조회"""
+        return self.provider.download(['^GSPC'],
+                                      start=start_date,
+                                      end=end_date,
+                                      interval='1d')
+
+    def _get_historical_risk_free_rate(self, date: datetime, treasury_data: Optional[pd.Series] = None) -> float:
         """특정 시점의 무위험수익률 조회"""
-        treasury_data = self.fred.get_series('DGS3', 
-                                           start_date=date,
-                                           end_date=date + timedelta(days=30))
-        
-        return float(treasury_data.dropna().iloc[0]) / 100 
\ No newline at end of file
+        if treasury_data is None:
+            treasury_data = self._get_treasury_series(date, date + timedelta(days=30))
+        else:
+            treasury_data = treasury_data.loc[date:date + timedelta(days=30)]
+
+        return float(treasury_data.dropna().iloc[0]) / 100
+
+    def _get_treasury_series(self, start_date: datetime, end_date: datetime) -> pd.Series:
+        """미국 3년 국채 금리(DGS3) 시계열 조회"""
+        return self.provider.get_fred_series('DGS3', start_date, end_date)
+
+# 프로세스 전체에서 공유하는 시장 파라미터 스냅샷
+# (as_of는 provider 기준 시각이므로, 유효기간은 스냅샷을 만든 실제 시각으로 판단)
+# 스냅샷을 만든 provider도 함께 기록하여 다른 provider로 요청하면 재사용하지 않음
+# (provider 없이 지정한 스냅샷은 모든 provider에 공유)
+DEFAULT_SNAPSHOT_MAX_AGE = timedelta(days=1)
+_snapshot: Optional[MarketParameterSnapshot] = None
+_snapshot_provider: Optional[MarketDataProvider] = None
+_snapshot_created_at: Optional[datetime] = None
+_snapshot_lock = threading.Lock()
+
+def _is_fresh(max_age: timedelta, provider: Optional[MarketDataProvider] = None) -> bool:
+    if _snapshot is None or datetime.now() - _snapshot_created_at > max_age:
+        return False
+    return provider is None or _snapshot_provider is None or _snapshot_provider is provider
+
+def get_cached_market_snapshot(
+        max_age: timedelta = DEFAULT_SNAPSHOT_MAX_AGE,
+        provider: Optional[MarketDataProvider] = None
+        ) -> Optional[MarketParameterSnapshot]:
+    """프로세스 공유 스냅샷이 max_age 이내이고 provider가 같으면 반환 (없거나 오래되었거나 provider가 다르면 None)"""
+    with _snapshot_lock:
+        return _snapshot if _is_fresh(max_age, provider) else None
+
+def get_market_snapshot(
+        max_age: timedelta = DEFAULT_SNAPSHOT_MAX_AGE,
+        refresh: bool = False,
+        provider: Optional[MarketDataProvider] = None
+        ) -> MarketParameterSnapshot:
+    """프로세스 공유 시장 파라미터 스냅샷 조회 (max_age가 지났거나, provider가 다르거나, refresh=True일 때만 다시 계산)
+
+    여러 스레드가 동시에 갱신을 요청하면 한 번만 계산하고 결과를 함께 사용한다.
+    """
+    with _snapshot_lock:
+        if not refresh and _is_fresh(max_age, provider):
+            return _snapshot
+    return get_single_flight().do(("market_snapshot", provider), lambda: _refresh_market_snapshot(provider))
+
+def _refresh_market_snapshot(provider: Optional[MarketDataProvider] = None) -> MarketParameterSnapshot:
+    collector = MarketDataCollector(provider)
+    snapshot = collector.get_snapshot()
+    set_market_snapshot(snapshot, collector.provider)
+    return snapshot
+
+def set_market_snapshot(snapshot: Optional[MarketParameterSnapshot], provider: Optional[MarketDataProvider] = None) -> None:
+    """외부에서 계산한 스냅샷을 프로세스 공유 스냅샷으로 지정 (None이면 초기화)
+
+    provider를 주면 같은 provider의 요청에만 재사용한다.
+    """
+    global _snapshot, _snapshot_provider, _snapshot_created_at
+    with _snapshot_lock:
+        _snapshot = snapshot
+        _snapshot_provider = provider
+        _snapshot_created_at = datetime.now()
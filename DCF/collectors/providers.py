@@ -0,0 +1,295 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from .rate_limiter import RateLimiter, RetryableError, get_rate_limiter, get_yahoo_session
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+class MarketDataProvider(ABC):
+    """DCF collector들이 사용하는 외부 데이터 제공자 인터페이스
+
+    재무제표/info(yfinance), 가격(yf.download), 금리(FRED) 조회와
+    조회 기준 시각(now)을 제공한다. 기준 시각도 provider가 정하므로
+    기록된 데이터를 재생할 때 기간 계산이 기록 시점과 같아진다.
+    """
+
+    @abstractmethod
+    def now(self) -> datetime:
+        """조회 기준 시각"""
+
+    @abstractmethod
+    def get_statement(self, ticker_symbol: str, statement: str, period: str = "annual") -> pd.DataFrame:
+        """재무제표 조회 (statement: income_stmt, balance_sheet, cash_flow / period: annual, quarterly)"""
+
+    @abstractmethod
+    def get_info(self, ticker_symbol: str) -> dict:
+        """yfinance info 조회"""
+
+    @abstractmethod
+    def download(self, tickers: List[str], start: datetime, end: datetime, interval: str = "1d", **kwargs) -> pd.DataFrame:
+        """가격 데이터 조회 (yf.download와 같은 형식)"""
+
+    @abstractmethod
+    def get_fred_series(self, series_id: str, start: datetime, end: datetime) -> pd.Series:
+        """FRED 시계열 조회"""
+
+class YFinanceProvider(MarketDataProvider):
+    """yfinance, fredapi로 실제 데이터를 조회하는 provider
+
+    yfinance, fredapi는 import 시간이 길어 처음 조회할 때 불러온다.
+    Yahoo 요청은 공유 HTTP 세션(연결 재사용)과 프로세스 공유 RateLimiter(속도 제한, 재시도)를 거친다.
+    """
+
+    # (기간, 재무제표) -> yf.Ticker 속성명
+    STATEMENT_ATTRS = {
+        ("annual", "income_stmt"): "financials",
+        ("annual", "balance_sheet"): "balance_sheet",
+        ("annual", "cash_flow"): "cashflow",
+        ("quarterly", "income_stmt"): "quarterly_financials",
+        ("quarterly", "balance_sheet"): "quarterly_balance_sheet",
+        ("quarterly", "cash_flow"): "quarterly_cashflow",
+    }
+
+    def __init__(self, session: Optional[Any] = None, limiter: Optional[RateLimiter] = None):
+        self._fred = None
+        self._session = session
+        self._limiter = limiter
+
+    @property
+    def session(self) -> Any:
+        return self._session or get_yahoo_session()
+
+    @property
+    def limiter(self) -> RateLimiter:
+        return self._limiter or get_rate_limiter()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def get_statement(self, ticker_symbol: str, statement: str, period: str = "annual") -> pd.DataFrame:
+        import yfinance as yf
+        attr = self.STATEMENT_ATTRS[(period, statement)]
+        return self.limiter.call("get_statement", lambda: getattr(yf.Ticker(ticker_symbol, session=self.session), attr))
+
+    def get_info(self, ticker_symbol: str) -> dict:
+        import yfinance as yf
+        return self.limiter.call("get_info", lambda: yf.Ticker(ticker_symbol, session=self.session).info)
+
+    def download(self, tickers: List[str], start: datetime, end: datetime, interval: str = "1d", **kwargs) -> pd.DataFrame:
+        import yfinance as yf
+
+        def fetch() -> pd.DataFrame:
+            prices = yf.download(list(tickers), start=start, end=end, interval=interval, progress=False, session=self.session, **kwargs)
+            # 요청이 제한되면 yfinance는 예외 대신 빈 결과를 반환하므로 재시도 대상이 되도록 예외로 바꿈
+            if prices is None or prices.empty:
+                raise RetryableError(f"{', '.join(tickers)} 가격 데이터를 받지 못했습니다.")
+            return prices
+
+        return self.limiter.call("download", fetch)
+
+    def get_fred_series(self, series_id: str, start: datetime, end: datetime) -> pd.Series:
+        if self._fred is None:
+            from fredapi import Fred
+            self._fred = Fred(api_key=os.getenv("FRED_API_KEY"))
+        return self._fred.get_series(series_id, observation_start=start, observation_end=end)
+
+class _FixtureProvider(MarketDataProvider):
+    """호출 인자로 만든 키로 디스크에 응답을 저장/조회하는 provider 공통 부분"""
+
+    CLOCK_FILE = "clock.json"
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _fixture_path(self, method: str, *args) -> str:
+        key = json.dumps([method, *args], default=str, ensure_ascii=False)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, f"{method}-{digest}.pkl")
+
+    def _clock_path(self) -> str:
+        return os.path.join(self.path, self.CLOCK_FILE)
+
+    @abstractmethod
+    def _call(self, method: str, args: Tuple, fetcher: Callable[[MarketDataProvider], Any]) -> Any:
+        """호출 인자(method, args)에 해당하는 응답 반환 (기록: fetcher로 조회 후 저장 / 재생: 저장된 응답 조회)"""
+
+    def get_statement(self, ticker_symbol: str, statement: str, period: str = "annual") -> pd.DataFrame:
+        return self._call("get_statement", (ticker_symbol, statement, period),
+                          lambda inner: inner.get_statement(ticker_symbol, statement, period))
+
+    def get_info(self, ticker_symbol: str) -> dict:
+        return self._call("get_info", (ticker_symbol,), lambda inner: inner.get_info(ticker_symbol))
+
+    def download(self, tickers: List[str], start: datetime, end: datetime, interval: str = "1d", **kwargs) -> pd.DataFrame:
+        return self._call("download", (sorted(tickers), start, end, interval, sorted(kwargs.items())),
+                          lambda inner: inner.download(tickers, start, end, interval, **kwargs))
+
+    def get_fred_series(self, series_id: str, start: datetime, end: datetime) -> pd.Series:
+        return self._call("get_fred_series", (series_id, start, end),
+                          lambda inner: inner.get_fred_series(series_id, start, end))
+
+class RecordingProvider(_FixtureProvider):
+    """다른 provider의 응답을 디스크에 기록하는 provider
+
+    기록 중에는 기준 시각을 첫 호출 시점으로 고정하고 함께 저장하여,
+    ReplayProvider가 같은 기준 시각과 같은 호출 인자로 재생할 수 있도록 한다.
+    """
+
+    def __init__(self, inner: MarketDataProvider, path: str):
+        super().__init__(path)
+        self.inner = inner
+        self._now: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            if self._now is None:
+                self._now = self.inner.now()
+                with open(self._clock_path(), "w", encoding="utf-8") as f:
+                    json.dump({"now": self._now.isoformat()}, f)
+            return self._now
+
+    def _call(self, method: str, args: Tuple, fetcher: Callable[[MarketDataProvider], Any]) -> Any:
+        # 실패한 호출도 기록하여 재생 시 같은 예외(기본값 대체 경로)가 재현되도록 함
+        try:
+            fixture = {"result": fetcher(self.inner)}
+        except Exception as e:
+            fixture = {"error": RuntimeError(f"{type(e).__name__}: {str(e)}")}
+
+        with open(self._fixture_path(method, *args), "wb") as f:
+            pickle.dump(fixture, f)
+
+        if "error" in fixture:
+            raise fixture["error"]
+        return fixture["result"]
+
+class ReplayProvider(_FixtureProvider):
+    """RecordingProvider로 기록한 응답을 재생하는 provider (네트워크 조회 없음)
+
+    latency, jitter(초)를 지정하면 호출마다 지연을 주입하여
+    캐시/동시성 전략을 네트워크 없이 비교할 수 있다.
+    """
+
+    def __init__(self, path: str, latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None):
+        super().__init__(path)
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        with open(self._clock_path(), encoding="utf-8") as f:
+            self._now = datetime.fromisoformat(json.load(f)["now"])
+
+    def now(self) -> datetime:
+        return self._now
+
+    def _call(self, method: str, args: Tuple, fetcher: Callable[[MarketDataProvider], Any]) -> Any:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        fixture_path = self._fixture_path(method, *args)
+        if not os.path.exists(fixture_path):
+            raise KeyError(f"기록된 응답이 없습니다: {method}{args}")
+        with open(fixture_path, "rb") as f:
+            fixture = pickle.load(f)
+
+        if "error" in fixture:
+            raise fixture["error"]
+        return fixture["result"]
+
+class CountingProvider(MarketDataProvider):
+    """다른 provider를 감싸 메서드별 외부 데이터 요청 수를 세는 provider"""
+
+    def __init__(self, inner: MarketDataProvider):
+        self.inner = inner
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, method: str) -> None:
+        with self._lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+
+    def total(self) -> int:
+        """전체 요청 수"""
+        with self._lock:
+            return sum(self.counts.values())
+
+    def snapshot(self) -> Dict[str, int]:
+        """메서드별 요청 수 복사본"""
+        with self._lock:
+            return dict(self.counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+    def now(self) -> datetime:
+        return self.inner.now()
+
+    def get_statement(self, ticker_symbol: str, statement: str, period: str = "annual") -> pd.DataFrame:
+        self._count("get_statement")
+        return self.inner.get_statement(ticker_symbol, statement, period)
+
+    def get_info(self, ticker_symbol: str) -> dict:
+        self._count("get_info")
+        return self.inner.get_info(ticker_symbol)
+
+    def download(self, tickers: List[str], start: datetime, end: datetime, interval: str = "1d", **kwargs) -> pd.DataFrame:
+        self._count("download")
+        return self.inner.download(tickers, start, end, interval, **kwargs)
+
+    def get_fred_series(self, series_id: str, start: datetime, end: datetime) -> pd.Series:
+        self._count("get_fred_series")
+        return self.inner.get_fred_series(series_id, start, end)
+
+class OfflineDataError(KeyError):
+    """오프라인 모드에서 저장소에 없는 데이터를 요청한 경우"""
+
+    def __str__(self) -> str:
+        # KeyError 기본 표현의 따옴표 없이 메시지만 출력
+        return str(self.args[0]) if self.args else ""
+
+class OfflineProvider(MarketDataProvider):
+    """오프라인 실행용 provider (외부 조회 요청이 오면 네트워크에 접근하지 않고 예외 발생)
+
+    저장소에 없는 데이터를 조용히 네트워크에서 가져오지 않도록, 오프라인 배치 실행 시 기본 provider로 사용한다.
+    """
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def _offline(self, request: str):
+        raise OfflineDataError(f"오프라인 모드: 저장소에 없는 {request} 데이터는 조회할 수 없습니다. 먼저 온라인으로 실행하여 저장소에 적재하세요.")
+
+    def get_statement(self, ticker_symbol: str, statement: str, period: str = "annual") -> pd.DataFrame:
+        self._offline(f"{ticker_symbol} {period} {statement}")
+
+    def get_info(self, ticker_symbol: str) -> dict:
+        self._offline(f"{ticker_symbol} info")
+
+    def download(self, tickers: List[str], start: datetime, end: datetime, interval: str = "1d", **kwargs) -> pd.DataFrame:
+        self._offline(f"{', '.join(tickers)} 가격")
+
+    def get_fred_series(self, series_id: str, start: datetime, end: datetime) -> pd.Series:
+        self._offline(f"FRED {series_id}")
+
+# 프로세스 기본 provider
+_default_provider: MarketDataProvider = YFinanceProvider()
+
+def get_default_provider() -> MarketDataProvider:
+    """collector에 provider를 지정하지 않았을 때 사용하는 기본 provider"""
+    return _default_provider
+
+def set_default_provider(provider: MarketDataProvider) -> None:
+    """기본 provider 변경 (예: 오프라인 성능 테스트에서 ReplayProvider 사용)"""
+    global _default_provider
+    _default_provider = provider
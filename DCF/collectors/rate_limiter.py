@@ -0,0 +1,185 @@
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+# 재시도 대상 HTTP 라이브러리 예외 (모듈, 속성). 이미 불러온 라이브러리의 예외만 사용하므로 import 비용이 없음
+_HTTP_ERRORS = (
+    ("requests.exceptions", "RequestException"),
+    ("curl_cffi.requests.exceptions", "RequestException"),
+    ("curl_cffi.requests.errors", "RequestsError"),
+    ("yfinance.exceptions", "YFRateLimitError"),
+)
+
+class RetryableError(Exception):
+    """재시도할 수 있는 일시적 실패 (예: 요청 제한으로 빈 응답을 받은 경우)"""
+
+def network_errors() -> Tuple[Type[BaseException], ...]:
+    """재시도 대상 예외 (연결/시간 초과, HTTP 요청 오류, Yahoo 요청 제한, RetryableError)
+
+    ImportError, KeyError 같은 코드/데이터 오류는 다시 시도해도 같은 결과이므로 포함하지 않는다.
+    """
+    errors = [ConnectionError, TimeoutError, RetryableError]
+    for module_name, attr in _HTTP_ERRORS:
+        error = getattr(sys.modules.get(module_name), attr, None)
+        if error is not None:
+            errors.append(error)
+    return tuple(errors)
+
+def call_with_retry(
+        func: Callable[[], Any],
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        retry_on: Optional[Tuple[Type[BaseException], ...]] = None,
+        before_attempt: Optional[Callable[[], None]] = None,
+        on_retry: Optional[Callable[[int, Exception], None]] = None
+        ) -> Any:
+    """func를 실행하고 재시도 대상 예외면 지수 백오프에 무작위 지연(full jitter)을 더해 최대 retries번 재시도
+
+    args:
+        retry_on: 재시도할 예외 (없으면 network_errors(), 그 밖의 예외는 바로 발생)
+        before_attempt: 시도마다 먼저 호출 (예: 속도 제한 토큰 획득)
+        on_retry: 재시도 전에 (시도 번호(0부터), 예외)로 호출 (집계, 로그)
+    """
+    attempt = 0
+    while True:
+        if before_attempt is not None:
+            before_attempt()
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= retries or not isinstance(e, retry_on or network_errors()):
+                raise
+            if on_retry is not None:
+                on_retry(attempt, e)
+            time.sleep(random.uniform(0, min(max_backoff, backoff * 2 ** attempt)))
+            attempt += 1
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷
+
+    토큰이 없으면 다음 토큰이 채워질 시각을 예약하고 잠금 밖에서 기다리므로,
+    여러 스레드가 동시에 요청해도 도착 순서대로 rate에 맞춰 통과한다.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 하나를 가져옴 (필요하면 대기)
+
+        returns:
+            float: 대기한 시간(초)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class RateLimiter:
+    """프로세스 전체의 외부 요청 속도 제한과 재시도
+
+    - 요청마다 토큰 버킷에서 토큰을 가져온 뒤 실행 (재시도도 토큰을 다시 가져옴)
+    - 네트워크 오류(retry_on, 기본값 network_errors())로 실패하면 지수 백오프에 무작위 지연(full jitter)을 더해 최대 retries번 재시도
+    - 요청 종류별 호출 수, 재시도 수, 실패 수, 대기열 대기 시간(합계, 최대)을 집계
+    """
+
+    def __init__(
+            self,
+            rate: float = 5.0,
+            burst: int = 10,
+            retries: int = 3,
+            backoff: float = 1.0,
+            max_backoff: float = 30.0,
+            retry_on: Optional[Tuple[Type[BaseException], ...]] = None
+            ):
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def call(self, name: str, func: Callable[[], Any]) -> Any:
+        """속도 제한을 지키며 func 실행 (name은 집계용 요청 종류)"""
+        def acquire() -> None:
+            wait = self.bucket.acquire()
+            self._record(name, calls=1, queue_wait_sec=wait, max_queue_wait_sec=wait)
+
+        try:
+            return call_with_retry(
+                func, self.retries, self.backoff, self.max_backoff, self.retry_on,
+                before_attempt=acquire,
+                on_retry=lambda attempt, error: self._record(name, retries=1),
+            )
+        except Exception:
+            self._record(name, failures=1)
+            raise
+
+    def _record(self, name: str, **values: float) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                name, {"calls": 0, "retries": 0, "failures": 0, "queue_wait_sec": 0.0, "max_queue_wait_sec": 0.0}
+            )
+            for key, value in values.items():
+                if key.startswith("max_"):
+                    metrics[key] = max(metrics[key], value)
+                else:
+                    metrics[key] += value
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """요청 종류별 호출(calls), 재시도(retries), 실패(failures) 수와 대기 시간 조회"""
+        with self._lock:
+            return {name: dict(metrics) for name, metrics in self._metrics.items()}
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+# Yahoo 요청 공유 인스턴스 (환경변수 DCF_YAHOO_RATE, DCF_YAHOO_BURST, DCF_YAHOO_RETRIES로 조정)
+_yahoo_limiter = RateLimiter(
+    rate=float(os.getenv("DCF_YAHOO_RATE", "5")),
+    burst=int(os.getenv("DCF_YAHOO_BURST", "10")),
+    retries=int(os.getenv("DCF_YAHOO_RETRIES", "3")),
+)
+_yahoo_session: Optional[Any] = None
+_session_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Yahoo 요청이 함께 사용하는 RateLimiter"""
+    return _yahoo_limiter
+
+def set_rate_limiter(limiter: RateLimiter) -> None:
+    """Yahoo 요청 RateLimiter 변경 (예: 대량 배치에서 속도를 낮출 때)"""
+    global _yahoo_limiter
+    _yahoo_limiter = limiter
+
+def get_yahoo_session() -> Any:
+    """Yahoo 요청이 함께 사용하는 HTTP 세션 (연결 재사용)
+
+    curl_cffi가 설치되어 있으면(curl_cffi 세션만 받는 최신 yfinance) curl_cffi 세션을,
+    없으면 잠금 파일의 yfinance 0.2.x가 받는 requests 세션을 만든다.
+    """
+    global _yahoo_session
+    with _session_lock:
+        if _yahoo_session is None:
+            try:
+                from curl_cffi import requests as curl_requests
+                _yahoo_session = curl_requests.Session(impersonate="chrome")
+            except ImportError:
+                import requests
+                _yahoo_session = requests.Session()
+        return _yahoo_session
@@ -0,0 +1,74 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from ..utils.metrics import record_cache
+
+class _Call:
+    """진행 중인 조회 한 건 (결과를 기다리는 요청들이 공유)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """같은 키의 동시 요청을 진행 중인 한 번의 조회로 합치는 클래스
+
+    먼저 들어온 요청만 실제로 조회하고, 조회가 끝나기 전에 들어온 같은 키의 요청은
+    그 결과(또는 예외)를 함께 받는다. 조회가 끝나면 키를 지우므로 결과를 캐시하지는 않는다
+    (캐시는 TickerDataContext, StatementStore, 시장 스냅샷이 담당).
+
+    키는 (데이터셋, ...) 형태의 튜플이며, 통계는 데이터셋별로 집계한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed: Dict[Hashable, int] = {}
+        self.coalesced: Dict[Hashable, int] = {}
+
+    def do(self, key: Tuple, fetcher: Callable[[], Any]) -> Any:
+        """key에 대한 조회가 진행 중이면 그 결과를 기다리고, 없으면 fetcher로 조회"""
+        dataset = key[0]
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed[dataset] = self.executed.get(dataset, 0) + 1
+            else:
+                self.coalesced[dataset] = self.coalesced.get(dataset, 0) + 1
+
+        if not leader:
+            record_cache("single_flight", "coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetcher()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, Dict[Hashable, int]]:
+        """데이터셋별 실제 조회(executed) 횟수와 합쳐진 요청(coalesced) 수 조회"""
+        with self._lock:
+            return {"executed": dict(self.executed), "coalesced": dict(self.coalesced)}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.executed.clear()
+            self.coalesced.clear()
+
+# 프로세스 공유 인스턴스 (DCF collector들이 함께 사용)
+_single_flight = SingleFlight()
+
+def get_single_flight() -> SingleFlight:
+    """collector들이 공유하는 SingleFlight 인스턴스"""
+    return _single_flight
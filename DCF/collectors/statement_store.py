@@ -0,0 +1,159 @@
+import argparse
+import os
+import pickle
+import sqlite3
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+from .providers import MarketDataProvider, OfflineDataError
+from ..utils.metrics import record_cache
+
+# 기본 저장 위치 (환경변수 DCF_STATEMENT_STORE로 변경 가능)
+DEFAULT_STORE_PATH = os.getenv(
+    "DCF_STATEMENT_STORE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "statement_store.sqlite"),
+)
+
+# 데이터셋별 유효기간. 연간 재무제표는 1년에 몇 번만 바뀌므로 길게, info(주가, 주식수)는 짧게 유지
+DEFAULT_TTLS = {
+    "income_stmt": timedelta(days=30),
+    "balance_sheet": timedelta(days=30),
+    "cash_flow": timedelta(days=30),
+    "info": timedelta(days=1),
+    "market_snapshot": timedelta(days=1),
+    "betas": timedelta(days=7),
+}
+
+# 종목 공통 데이터(시장 파라미터 스냅샷, 베타 등)를 저장할 때 사용하는 키
+MARKET_KEY = "^MARKET"
+
+class StatementStore:
+    """재무제표를 (ticker, period, statement) 단위로 로컬 SQLite에 저장하는 영구 저장소
+
+    - 데이터셋별 TTL이 지나면 다시 조회
+    - offline=True 이면 네트워크 조회 없이 저장소에 있는 데이터만 반환 (TTL 무시)
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, ttls: Optional[Dict[str, timedelta]] = None, offline: bool = False):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.offline = offline
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS statements (
+                    ticker TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    statement TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (ticker, period, statement)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # 여러 스레드/프로세스에서 접근할 수 있도록 호출마다 연결
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, ticker: str, period: str, statement: str) -> Optional[Any]:
+        """저장된 데이터 조회 (없거나 TTL이 지난 경우 None, 오프라인 모드에서는 TTL 무시)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at, payload FROM statements WHERE ticker = ? AND period = ? AND statement = ?",
+                (ticker, period, statement),
+            ).fetchone()
+        if row is None:
+            return None
+
+        fetched_at, payload = row
+        ttl = self.ttls.get(statement)
+        if not self.offline and ttl is not None and time.time() - fetched_at > ttl.total_seconds():
+            return None
+        return pickle.loads(payload)
+
+    def put(self, ticker: str, period: str, statement: str, data: Any) -> None:
+        """데이터 저장 (같은 키가 있으면 덮어씀)"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO statements (ticker, period, statement, fetched_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (ticker, period, statement, time.time(), pickle.dumps(data)),
+            )
+
+    def get_market(self, name: str) -> Optional[Any]:
+        """종목 공통 데이터 조회 (name: market_snapshot, betas)"""
+        return self.get(MARKET_KEY, "market", name)
+
+    def put_market(self, name: str, data: Any) -> None:
+        """종목 공통 데이터 저장 (오프라인 실행에서 네트워크 없이 재사용)"""
+        self.put(MARKET_KEY, "market", name, data)
+
+    def get_or_fetch(self, ticker: str, period: str, statement: str, fetcher: Callable[[], Any]) -> Any:
+        """저장소에 유효한 데이터가 있으면 반환하고, 없으면 fetcher로 조회 후 저장"""
+        data = self.get(ticker, period, statement)
+        if data is not None:
+            record_cache("store", "hit")
+            return data
+
+        record_cache("store", "miss")
+        if self.offline:
+            raise OfflineDataError(f"오프라인 모드: 저장소에 {ticker} {period} {statement} 데이터가 없습니다.")
+
+        data = fetcher()
+        self.put(ticker, period, statement, data)
+        return data
+
+    def warm_up(self, tickers: Iterable[str], periods: Iterable[str] = ("annual",), force: bool = False, provider: Optional[MarketDataProvider] = None) -> Dict[str, int]:
+        """티커 목록의 재무제표와 info를 미리 저장소에 적재
+
+        returns:
+            Dict[str, int]: 조회(fetched), 건너뜀(skipped), 실패(failed) 건수
+        """
+        from .ticker_data_context import TickerDataContext
+
+        counts = {"fetched": 0, "skipped": 0, "failed": 0}
+        for ticker in tickers:
+            context = TickerDataContext(ticker, provider=provider)
+            datasets = [(period, statement) for period in periods for statement in ("income_stmt", "balance_sheet", "cash_flow")]
+            datasets.append(("snapshot", "info"))
+            for period, statement in datasets:
+                if not force and self.get(ticker, period, statement) is not None:
+                    counts["skipped"] += 1
+                    continue
+                try:
+                    if statement == "info":
+                        data = context.get_info()
+                    else:
+                        data = context.get_statement(statement, period)
+                    self.put(ticker, period, statement, data)
+                    counts["fetched"] += 1
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"{ticker} {period} {statement} 적재 중 오류 발생: {str(e)}")
+        return counts
+
+def main(argv: Optional[list] = None) -> None:
+    """재무제표 저장소 일괄 적재 (warm-up) 커맨드
+
+    예) python -m DCF.collectors.statement_store warm --period annual quarterly
+    """
+    from ..utils.universe import DEFAULT_KOSPI_LIST, load_kospi_tickers
+
+    parser = argparse.ArgumentParser(description="DCF 재무제표 저장소 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    warm = subparsers.add_parser("warm", help="재무제표를 저장소에 미리 적재")
+    warm.add_argument("--tickers", nargs="*", help="적재할 티커 목록 (없으면 kospi_list 전체)")
+    warm.add_argument("--kospi-list", default=DEFAULT_KOSPI_LIST, help="종목 리스트 CSV 경로")
+    warm.add_argument("--period", nargs="+", default=["annual"], choices=["annual", "quarterly"])
+    warm.add_argument("--store", default=DEFAULT_STORE_PATH, help="저장소 경로")
+    warm.add_argument("--force", action="store_true", help="TTL과 무관하게 다시 조회")
+    args = parser.parse_args(argv)
+
+    tickers = args.tickers or load_kospi_tickers(args.kospi_list)
+    store = StatementStore(args.store)
+    counts = store.warm_up(tickers, periods=args.period, force=args.force)
+    print(f"적재 완료: {counts}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional
+from .providers import MarketDataProvider, get_default_provider
+from .single_flight import get_single_flight
+from .statement_store import StatementStore
+from ..utils.metrics import record_cache, stage_timer
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+class TickerDataContext:
+    """티커 단위로 재무제표와 info 데이터를 한 번만 조회하여 모든 계산기가 공유하도록 하는 클래스
+
+    ValuationCalculator가 하나의 context를 만들어 FCFE, WACC, 성장률 계산기와
+    collector들에 주입하면, 같은 재무제표를 여러 번 내려받거나 파싱하지 않는다.
+    store가 주어지면 재무제표와 info를 영구 저장소에서 먼저 찾는다.
+    """
+
+    def __init__(
+            self,
+            ticker_symbol: str,
+            store: Optional[StatementStore] = None,
+            provider: Optional[MarketDataProvider] = None
+            ):
+        self.ticker_symbol = ticker_symbol
+        self.provider = provider or get_default_provider()
+        self.store = store
+        self._cache: Dict[Hashable, Any] = {}
+        self.hits: Dict[Hashable, int] = {}
+        self.misses: Dict[Hashable, int] = {}
+
+    def get_statement(self, statement: str, period: str = "annual") -> pd.DataFrame:
+        """재무제표 한 종류를 조회 (최초 1회만 provider 호출)
+
+        args:
+            statement (str): 재무제표 종류 (income_stmt, balance_sheet, cash_flow)
+            period (str): 주기 (annual, quarterly, ttm은 quarterly로 조회)
+
+        returns:
+            pd.DataFrame: 재무제표 데이터
+        """
+        period = "annual" if period == "annual" else "quarterly"
+        return self.get_or_load(
+            ("statement", period, statement),
+            lambda: self._fetch(period, statement, lambda: self.provider.get_statement(self.ticker_symbol, statement, period)),
+        )
+
+    def get_info(self) -> dict:
+        """yfinance info 원본 딕셔너리 조회 (최초 1회만 provider 호출)"""
+        return self.get_or_load(("info",), lambda: self._fetch("snapshot", "info", lambda: self.provider.get_info(self.ticker_symbol)))
+
+    def _fetch(self, period: str, statement: str, fetcher: Callable[[], Any]) -> Any:
+        """저장소가 있으면 저장소를 거쳐, 없으면 바로 provider에서 조회
+
+        다른 context(다른 스레드의 밸류에이션 요청)가 같은 데이터를 조회 중이면
+        새로 조회하지 않고 그 결과를 함께 사용한다.
+        """
+        if self.store is not None:
+            store_fetcher = fetcher
+            fetcher = lambda: self.store.get_or_fetch(self.ticker_symbol, period, statement, store_fetcher)
+        with stage_timer("fetch"):
+            return get_single_flight().do((statement, self.ticker_symbol, period, self.provider, self.store), fetcher)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """key에 해당하는 값이 캐시에 있으면 반환하고, 없으면 loader로 불러와 저장"""
+        if key in self._cache:
+            self.hits[key] = self.hits.get(key, 0) + 1
+            record_cache("context", "hit")
+            return self._cache[key]
+
+        self.misses[key] = self.misses.get(key, 0) + 1
+        record_cache("context", "miss")
+        value = loader()
+        self._cache[key] = value
+        return value
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """캐시 무효화 (key가 없으면 전체 무효화)"""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Dict[Hashable, int]]:
+        """key별 캐시 hit/miss 횟수 조회
+
+        miss 횟수가 곧 실제 조회(fetch) 횟수이므로, 한 번의 밸류에이션에서
+        재무제표별 miss가 1인지 확인하는 데 사용한다.
+        """
+        return {"hits": dict(self.hits), "misses": dict(self.misses)}
@@ -0,0 +1,351 @@
+"""코스피 전체 종목 DCF 일괄 밸류에이션 실행기
+
+종목별 결과를 체크포인트 파일(JSONL)에 바로 기록하므로, 중간에 중단되어도
+다시 실행하면 끝난 종목은 건너뛰고 남은 종목만 계산한다.
+
+예) python -m DCF.runners.universe_runner --workers 8 --max-in-flight 32
+    python -m DCF.runners.universe_runner --monte-carlo 10000 --seed 0  (주당가치 백분위수 함께 저장)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..calculators.monte_carlo import DEFAULT_PERCENTILES
+from ..calculators.valuation import ValuationCalculator
+from ..collectors.market_data_collector import MarketParameterSnapshot, get_market_snapshot, set_market_snapshot
+from ..collectors.providers import OfflineDataError, OfflineProvider, set_default_provider
+from ..collectors.statement_store import DEFAULT_STORE_PATH, StatementStore
+from ..utils.beta_matrix import BetaTable
+from ..utils.metrics import get_metrics, record_failure
+from ..utils.universe import DEFAULT_KOSPI_LIST, load_kospi_tickers
+
+DEFAULT_OUTPUT_DIR = os.path.join("output", "dcf_universe")
+RESULT_KEYS = ['per_share', 'cost_of_equity', 'growth_rate', 'ratio_capex_ocf', 'ratio_repayment_issuance']
+# 몬테카를로 모드에서 주당가치 옆에 함께 기록하는 유효 표본 수와 백분위수 컬럼
+MONTE_CARLO_KEYS = ['n_valid'] + [f'per_share_p{percentile}' for percentile in DEFAULT_PERCENTILES]
+
+# 워커 프로세스별 상태 (initializer에서 설정)
+_worker_store: Optional[StatementStore] = None
+_worker_beta_table: Optional[BetaTable] = None
+_worker_period: str = "annual"
+_worker_quiet: bool = True
+_worker_offline: bool = False
+_worker_monte_carlo: int = 0
+_worker_seed: Optional[int] = None
+
+def _init_worker(
+        snapshot: MarketParameterSnapshot,
+        beta_table: Optional[BetaTable],
+        store_path: Optional[str],
+        offline: bool,
+        period: str,
+        quiet: bool,
+        monte_carlo: int = 0,
+        seed: Optional[int] = None
+        ) -> None:
+    """워커 초기화: 부모 프로세스에서 계산한 시장 스냅샷, 베타 테이블과 재무제표 저장소를 공유
+
+    오프라인이면 저장소에 없는 데이터를 네트워크에서 가져오지 않도록 기본 provider를 OfflineProvider로 바꾼다.
+    """
+    global _worker_store, _worker_beta_table, _worker_period, _worker_quiet, _worker_offline, _worker_monte_carlo, _worker_seed
+    set_market_snapshot(snapshot)
+    if offline:
+        set_default_provider(OfflineProvider())
+    _worker_offline = offline
+    _worker_beta_table = beta_table
+    _worker_store = StatementStore(store_path, offline=offline) if store_path else None
+    _worker_period = period
+    _worker_quiet = quiet
+    _worker_monte_carlo = monte_carlo
+    _worker_seed = seed
+
+def value_ticker(ticker: str) -> Dict:
+    """한 종목의 주당가치 계산 결과를 체크포인트 레코드로 반환 (예외는 레코드에 기록)"""
+    record = {'ticker': ticker, 'status': 'ok', 'error': None, **{key: None for key in RESULT_KEYS},
+              'windows': {'results': {}, 'best_window': None}}
+    if _worker_monte_carlo:
+        record.update({key: None for key in MONTE_CARLO_KEYS})
+    # 워커의 계측값은 종목마다 부모에 넘기고 초기화 (부모에서 합산)
+    metrics = get_metrics()
+    metrics.reset()
+    start = time.perf_counter()
+    try:
+        # 오프라인에서는 저장된 베타가 없는 종목을 기본 베타로 계산하지 않고 오류로 기록
+        if _worker_offline and (_worker_beta_table is None or ticker not in _worker_beta_table.betas.index):
+            raise OfflineDataError(f"오프라인 모드: 저장소에 {ticker} 베타 데이터가 없습니다.")
+        # 계산 과정의 print 출력은 워커에서 버림
+        stdout = io.StringIO() if _worker_quiet else None
+        with contextlib.redirect_stdout(stdout) if stdout else contextlib.nullcontext():
+            calculator = ValuationCalculator(ticker, statement_store=_worker_store, beta_table=_worker_beta_table)
+            best_result = calculator.calculate_per_share(_worker_period)
+            if best_result is not None and _worker_monte_carlo:
+                record.update(_monte_carlo_columns(ticker, calculator))
+        # 평균 기간별 결과는 이력 저장용으로만 부모에 전달 (체크포인트에는 기록하지 않음)
+        record['windows'] = {'results': calculator.window_results, 'best_window': calculator.best_window}
+
+        if best_result is None:
+            record['status'] = 'no_result'
+        else:
+            record.update({key: float(best_result[key]) for key in RESULT_KEYS})
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {str(e)}"
+        record_failure("valuation", ticker)
+    record['elapsed'] = time.perf_counter() - start
+    record['metrics'] = metrics.snapshot()
+    return record
+
+def _monte_carlo_columns(ticker: str, calculator: ValuationCalculator) -> Dict:
+    """최적 평균 기간 기준 몬테카를로 주당가치 분포 컬럼 (실패하면 빈 dict이며 주당가치 결과는 유지)"""
+    try:
+        distribution = calculator.calculate_per_share_distribution(
+            _worker_period, years=calculator.best_window, n_draws=_worker_monte_carlo, seed=_worker_seed)
+    except Exception as e:
+        print(f"몬테카를로 계산 중 오류 발생: {str(e)}")
+        record_failure("monte_carlo", ticker)
+        return {}
+    if distribution is None:
+        return {}
+    return {
+        'n_valid': distribution['n_valid'],
+        **{f'per_share_p{percentile}': value for percentile, value in distribution['percentiles'].items()},
+    }
+
+class UniverseRunner:
+    """여러 종목의 ValuationCalculator.calculate_per_share를 프로세스 풀로 실행하는 클래스"""
+
+    def __init__(
+            self,
+            tickers: Iterable[str],
+            output_dir: str = DEFAULT_OUTPUT_DIR,
+            max_workers: int = os.cpu_count() or 1,
+            max_in_flight: Optional[int] = None,
+            period: str = "annual",
+            store_path: Optional[str] = DEFAULT_STORE_PATH,
+            offline: bool = False,
+            retry_errors: bool = False,
+            quiet: bool = True,
+            history_dir: Optional[str] = None,
+            monte_carlo: int = 0,
+            seed: Optional[int] = None
+            ):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight or max_workers * 4
+        self.period = period
+        self.store_path = store_path
+        self.offline = offline
+        self.retry_errors = retry_errors
+        self.quiet = quiet
+        # 지정하면 이번 실행에서 계산한 종목의 평균 기간별 결과를 이력 저장소에 추가
+        self.history_dir = history_dir
+        # 0보다 크면 종목마다 이 표본 수로 몬테카를로 주당가치 백분위수도 계산 (seed로 재현 가능)
+        self.monte_carlo = monte_carlo
+        self.seed = seed
+        self.checkpoint_path = os.path.join(output_dir, "checkpoint.jsonl")
+        self.summary_path = os.path.join(output_dir, "summary.json")
+        # 단계별 지연시간, 캐시, 기본값 대체, 실패 계측 (Prometheus text와 JSON)
+        self.metrics_paths = [os.path.join(output_dir, "metrics.prom"), os.path.join(output_dir, "metrics.json")]
+        os.makedirs(output_dir, exist_ok=True)
+
+    def load_checkpoint(self) -> Dict[str, Dict]:
+        """체크포인트 파일에서 종목별 마지막 레코드 조회"""
+        records = {}
+        if not os.path.exists(self.checkpoint_path):
+            return records
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 중단 시점에 잘린 마지막 줄은 무시
+                    continue
+                records[record['ticker']] = record
+        return records
+
+    def pending_tickers(self) -> List[str]:
+        """아직 계산하지 않은 종목 (retry_errors=True면 오류 종목 포함)"""
+        done = self.load_checkpoint()
+        return [
+            ticker for ticker in self.tickers
+            if ticker not in done or (self.retry_errors and done[ticker]['status'] == 'error')
+        ]
+
+    def run(self) -> Dict:
+        """남은 종목을 계산하고 결과 파일과 요약 정보를 저장"""
+        pending = self.pending_tickers()
+        print(f"전체 {len(self.tickers)}개 중 {len(pending)}개 종목 계산 시작 (workers={self.max_workers}, in-flight={self.max_in_flight})")
+
+        # 계측값은 이번 실행분만 기록
+        get_metrics().reset()
+        # 시장 파라미터와 베타는 부모에서 한 번만 준비하여 모든 워커가 공유
+        store = StatementStore(self.store_path, offline=self.offline) if self.store_path else None  # 워커 시작 전 테이블 생성
+        snapshot, beta_table = self._prepare_market_inputs(store, pending)
+
+        run_records = []
+        windows = {}
+        run_at = datetime.now()
+        start = time.perf_counter()
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint, ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(snapshot, beta_table, self.store_path, self.offline, self.period, self.quiet,
+                          self.monte_carlo, self.seed)) as executor:
+            queue = iter(pending)
+            in_flight = set()
+            while True:
+                # 동시에 처리 중인 요청 수를 max_in_flight로 제한
+                for ticker in queue:
+                    in_flight.add(executor.submit(value_ticker, ticker))
+                    if len(in_flight) >= self.max_in_flight:
+                        break
+                if not in_flight:
+                    break
+
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record = future.result()
+                    windows[record['ticker']] = record.pop('windows')
+                    get_metrics().merge(record.pop('metrics'))
+                    checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    checkpoint.flush()
+                    run_records.append(record)
+                    print(f"[{len(run_records)}/{len(pending)}] {record['ticker']}: {record['status']}")
+
+        wall_time = time.perf_counter() - start
+        output_path = self.write_results()
+        summary = self._summarize(run_records, wall_time, output_path)
+        if self.history_dir:
+            summary['history_run_id'] = self._append_history(windows, run_at)
+        summary['metrics_paths'] = [get_metrics().write(path) for path in self.metrics_paths]
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+    def _prepare_market_inputs(self, store: Optional[StatementStore], tickers: List[str]) -> Tuple[MarketParameterSnapshot, Optional[BetaTable]]:
+        """시장 파라미터 스냅샷과 베타 테이블 준비
+
+        온라인이면 새로 계산하여 저장소에 저장하고(베타는 기존 값과 합침),
+        오프라인이면 저장소에 저장된 값을 사용하며 없으면 네트워크 조회 대신 예외를 발생시킨다.
+        """
+        if self.offline:
+            if store is None:
+                raise ValueError("오프라인 모드에는 재무제표 저장소(store_path)가 필요합니다.")
+            snapshot = store.get_market("market_snapshot")
+            betas = store.get_market("betas")
+            missing = [name for name, value in (("시장 파라미터 스냅샷", snapshot), ("베타", betas)) if value is None]
+            if missing:
+                raise OfflineDataError(f"오프라인 모드: 저장소에 {', '.join(missing)} 데이터가 없습니다. 먼저 온라인으로 실행하세요.")
+            return snapshot, BetaTable(betas)
+
+        snapshot = get_market_snapshot()
+        beta_table = self._build_beta_table(tickers)
+        if store is not None:
+            store.put_market("market_snapshot", snapshot)
+            if beta_table is not None:
+                stored_betas = store.get_market("betas")
+                betas = beta_table.betas if stored_betas is None else beta_table.betas.combine_first(stored_betas)
+                store.put_market("betas", betas)
+        return snapshot, beta_table
+
+    def _build_beta_table(self, tickers: List[str]) -> Optional[BetaTable]:
+        """남은 종목 전체의 베타를 한 번의 다중 티커 조회로 계산 (실패하면 None)"""
+        if not tickers:
+            return None
+        try:
+            return BetaTable.from_download(tickers)
+        except Exception as e:
+            print(f"베타 테이블 계산 중 오류 발생: {str(e)}")
+            return None
+
+    def _append_history(self, windows: Dict[str, Dict], run_at: datetime) -> Optional[str]:
+        """이번 실행 결과를 이력 저장소에 추가 (pyarrow가 없거나 실패하면 None)"""
+        try:
+            from ..utils.valuation_history import ValuationHistory, history_rows
+            rows = [
+                row
+                for ticker, window in windows.items()
+                for row in history_rows(ticker, window['results'], window['best_window'])
+            ]
+            return ValuationHistory(self.history_dir).append(rows, run_at=run_at)
+        except Exception as e:
+            print(f"밸류에이션 이력 저장 중 오류 발생: {str(e)}")
+            return None
+
+    def write_results(self) -> str:
+        """체크포인트 전체를 컬럼형 파일(parquet, pyarrow가 없으면 csv)로 저장"""
+        results_df = pd.DataFrame(list(self.load_checkpoint().values()))
+        try:
+            output_path = os.path.join(self.output_dir, "valuation.parquet")
+            results_df.to_parquet(output_path, index=False)
+        except ImportError:
+            # parquet 엔진(pyarrow)이 없으면 csv로 저장하되 원인을 알림
+            print("pyarrow가 설치되지 않아 결과를 csv로 저장합니다. parquet 저장과 밸류에이션 이력에는 pyarrow가 필요합니다. (poetry install -E history)")
+            output_path = os.path.join(self.output_dir, "valuation.csv")
+            results_df.to_csv(output_path, index=False)
+        return output_path
+
+    def _summarize(self, records: List[Dict], wall_time: float, output_path: str) -> Dict:
+        """처리량/지연시간 요약"""
+        latencies = np.array([record['elapsed'] for record in records], dtype=float)
+        summary = {
+            'tickers': len(records),
+            'status_counts': dict(Counter(record['status'] for record in records)),
+            'wall_time_sec': wall_time,
+            'throughput_per_sec': len(records) / wall_time if wall_time > 0 else None,
+            'output_path': output_path,
+        }
+        if len(latencies):
+            summary['latency_sec'] = {
+                'mean': float(latencies.mean()),
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'max': float(latencies.max()),
+            }
+        return summary
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="코스피 전체 종목 DCF 일괄 밸류에이션")
+    parser.add_argument("--tickers", nargs="*", help="계산할 티커 목록 (없으면 kospi_list 전체)")
+    parser.add_argument("--kospi-list", default=DEFAULT_KOSPI_LIST)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-in-flight", type=int, default=None, help="동시에 제출할 최대 종목 수 (기본: workers * 4)")
+    parser.add_argument("--period", default="annual", choices=["annual", "quarterly", "ttm"])
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="재무제표 저장소 경로 (빈 문자열이면 사용 안 함)")
+    parser.add_argument("--offline", action="store_true", help="재무제표 저장소에 있는 데이터(시장 파라미터, 베타 포함)만 사용하고 네트워크 조회를 하지 않음")
+    parser.add_argument("--retry-errors", action="store_true", help="체크포인트에서 오류난 종목 다시 계산")
+    parser.add_argument("--verbose", action="store_true", help="종목별 계산 출력 표시")
+    parser.add_argument("--history-dir", default=None, help="밸류에이션 이력 저장소 경로 (지정 시 평균 기간별 결과 추가)")
+    parser.add_argument("--monte-carlo", type=int, default=0, metavar="N", help="종목마다 N개 표본으로 몬테카를로 주당가치 백분위수 계산 (0이면 사용 안 함)")
+    parser.add_argument("--seed", type=int, default=None, help="몬테카를로 난수 시드")
+    args = parser.parse_args(argv)
+
+    runner = UniverseRunner(
+        tickers=args.tickers or load_kospi_tickers(args.kospi_list),
+        output_dir=args.output_dir,
+        max_workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        period=args.period,
+        store_path=args.store or None,
+        offline=args.offline,
+        retry_errors=args.retry_errors,
+        quiet=not args.verbose,
+        history_dir=args.history_dir,
+        monte_carlo=args.monte_carlo,
+        seed=args.seed,
+    )
+    summary = runner.run()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import numpy as np
+from datetime import timedelta
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+from ..collectors.providers import MarketDataProvider, get_default_provider
+
+def download_weekly_prices(tickers: Iterable[str], period: int = 730, provider: Optional[MarketDataProvider] = None) -> pd.DataFrame:
+    """여러 티커의 주간 수정주가를 한 번의 요청으로 조회 (열: 티커)"""
+    import pandas as pd
+    provider = provider or get_default_provider()
+    tickers = list(tickers)
+    now = provider.now()
+    prices = provider.download(tickers,
+                               start=(now - timedelta(days=period)),
+                               end=now,
+                               interval='1wk',
+                               auto_adjust=False)['Adj Close']
+    if isinstance(prices, pd.Series):
+        prices = prices.to_frame(tickers[0])
+    return prices
+
+def calculate_beta_matrix(stock_returns: pd.DataFrame, market_returns: pd.Series) -> pd.Series:
+    """정렬된 수익률 행렬에서 모든 종목의 베타를 한 번에 계산
+
+    종목마다 상장일, 거래정지 기간이 달라 결측치가 있으므로,
+    종목별로 시장 수익률과 함께 관측된 구간만 사용하여 공분산/분산을 계산한다.
+    """
+    import pandas as pd
+    market_returns = market_returns.reindex(stock_returns.index)
+    returns = stock_returns.to_numpy(dtype=float)
+    market = market_returns.to_numpy(dtype=float)[:, None]
+
+    mask = ~np.isnan(returns) & ~np.isnan(market)
+    n = mask.sum(axis=0)
+    returns = np.where(mask, returns, 0.0)
+    market = np.where(mask, market, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns_mean = returns.sum(axis=0) / n
+        market_mean = market.sum(axis=0) / n
+        returns_dev = np.where(mask, returns - returns_mean, 0.0)
+        market_dev = np.where(mask, market - market_mean, 0.0)
+        covariance = (returns_dev * market_dev).sum(axis=0) / (n - 1)
+        market_variance = (market_dev ** 2).sum(axis=0) / (n - 1)
+        beta = covariance / market_variance
+
+    beta[n < 2] = np.nan
+    return pd.Series(beta, index=stock_returns.columns, name="beta")
+
+class BetaTable:
+    """유니버스 전체 종목의 베타 테이블
+
+    종목 주가는 한 번의 다중 티커 요청으로, 시장 지수는 한 번만 내려받아 계산한다.
+    """
+
+    def __init__(self, betas: pd.Series):
+        self.betas = betas
+
+    @classmethod
+    def from_download(
+            cls,
+            tickers: Iterable[str],
+            market_index: str = '^KS11',
+            period: int = 730,
+            provider: Optional[MarketDataProvider] = None
+            ) -> "BetaTable":
+        """주간 수익률로 전체 종목 베타 계산"""
+        prices = download_weekly_prices(tickers, period, provider)
+        market_prices = download_weekly_prices([market_index], period, provider)[market_index]
+
+        stock_returns = prices.pct_change(fill_method=None).iloc[1:]
+        market_returns = market_prices.pct_change(fill_method=None).iloc[1:]
+        return cls(calculate_beta_matrix(stock_returns, market_returns))
+
+    def get(self, ticker: str) -> Optional[float]:
+        """티커의 베타 조회 (없거나 0~3 범위를 벗어나면 None)"""
+        beta = self.betas.get(ticker)
+        if beta is None or np.isnan(beta) or not (0 <= beta <= 3):
+            return None
+        return float(beta)
+
+    def __len__(self) -> int:
+        return len(self.betas)
@@ -1,41 +1,34 @@
 from typing import Optional, Dict
-import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
+from .beta_matrix import BetaTable
+from ..collectors.providers import MarketDataProvider, get_default_provider
+from ..collectors.single_flight import get_single_flight
+from .metrics import record_fallback
 
-def calculate_beta(ticker: str, market_index: str = '^KS11', period: int = 730) -> float:
-    """베타 계산"""
+def calculate_beta(ticker: str, market_index: str = '^KS11', period: int = 730, provider: Optional[MarketDataProvider] = None) -> float:
+    """베타 계산 (여러 종목을 계산할 때는 BetaTable.from_download 사용)
+    같은 종목의 베타를 동시에 요청하면 주가는 한 번만 내려받는다.
+    """
     try:
-        stock_data = yf.download(ticker, 
-                               start=(datetime.now() - timedelta(days=period)),
-                               end=datetime.now(),
-                               interval='1wk')
-        
-        market_data = yf.download(market_index,
-                                start=(datetime.now() - timedelta(days=period)),
-                                end=datetime.now(),
-                                interval='1wk')
-        
-        stock_returns = stock_data['Adj Close'].pct_change().dropna()
-        market_returns = market_data['Adj Close'].pct_change().dropna()
-        
-        covariance = np.cov(stock_returns, market_returns)[0][1]
-        market_variance = np.var(market_returns)
-        
-        beta = covariance / market_variance
-        
-        if not (0 <= beta <= 3):
+        beta_table = get_single_flight().do(
+            ("beta", ticker, market_index, period, provider),
+            lambda: BetaTable.from_download([ticker], market_index, period, provider),
+        )
+        beta = beta_table.get(ticker)
+        if beta is None:
+            record_fallback("beta", ticker)
             return 1.0
-            
         return beta
-        
+
     except Exception:
+        record_fallback("beta", ticker)
         return 1.0
 
-def get_yfinance_beta(ticker: str) -> Optional[float]:
-    """yfinance에서 베타값 조회"""
+def get_yfinance_beta(ticker: str, info: Optional[dict] = None) -> Optional[float]:
+    """yfinance에서 베타값 조회 (이미 조회한 info가 있으면 재사용)"""
     try:
-        beta = yf.Ticker(ticker).info.get('beta')
+        if info is None:
+            info = get_default_provider().get_info(ticker)
+        beta = info.get('beta')
         if beta is not None and 0 <= beta <= 3:
             return beta
         return None
@@ -49,14 +42,17 @@ def calculate_effective_tax_rate(metrics: Dict[str, float]) -> float:
         income_tax = metrics['tax_provision']
         
         if pretax_income == 0:
+            record_fallback("effective_tax_rate")
             return 0.22
         
         effective_tax_rate = income_tax / pretax_income
         
         if not (0 <= effective_tax_rate <= 1):
+            record_fallback("effective_tax_rate")
             return 0.22
             
         return effective_tax_rate
         
     except Exception:
+        record_fallback("effective_tax_rate")
         return 0.22
\ No newline at end of file
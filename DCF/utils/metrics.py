@@ -0,0 +1,180 @@
+"""DCF 파이프라인 계측 (단계별 지연시간 히스토그램과 이벤트 카운터)
+
+- dcf_stage_seconds{stage}: fetch, wacc, fcfe, growth, present_value, terminal_value, per_share 단계 소요 시간
+- dcf_cache_total{cache, result}: context/저장소 캐시 hit/miss, single-flight로 합쳐진 요청 수
+- dcf_fallback_total{parameter, ticker}: 데이터 대신 기본값을 사용한 횟수 (예: 무위험수익률 0.035, 실효세율 0.22)
+- dcf_failures_total{stage, ticker}: 단계별 계산 실패(예외) 횟수
+
+결과는 Prometheus text 형식(node_exporter textfile collector용) 또는 JSON으로 내보낸다.
+배치 실행처럼 여러 프로세스에서 계산하는 경우 워커의 snapshot()을 부모에서 merge()로 합친다.
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# 단계별 지연시간 히스토그램 구간 상한(초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class MetricsRegistry:
+    """카운터와 히스토그램을 (이름, 라벨) 단위로 집계하는 스레드 안전 레지스트리"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        # 히스토그램 값: [구간별 관측 수(마지막은 +Inf), 합계, 관측 수]
+        self._histograms: Dict[str, Dict[Labels, List[Any]]] = {}
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+    def inc(self, name: str, value: float = 1.0, /, **labels: Any) -> None:
+        """카운터 증가 (값이 None인 라벨은 생략)"""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, /, **labels: Any) -> None:
+        """히스토그램에 관측값 추가"""
+        key = self._labels(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.setdefault(name, {}).setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name: str, /, **labels: Any) -> Iterator[None]:
+        """블록 실행 시간을 히스토그램에 기록 (예외가 발생해도 기록)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 값 복사본 (JSON으로 직렬화 가능한 형태)"""
+        with self._lock:
+            return {
+                'buckets': list(self.buckets),
+                'counters': [
+                    {'name': name, 'labels': dict(key), 'value': value}
+                    for name, series in sorted(self._counters.items())
+                    for key, value in sorted(series.items())
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(key), 'bucket_counts': list(counts), 'sum': total, 'count': count}
+                    for name, series in sorted(self._histograms.items())
+                    for key, (counts, total, count) in sorted(series.items())
+                ],
+            }
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """다른 레지스트리(워커 프로세스 등)의 snapshot()을 더함"""
+        if snapshot['histograms'] and tuple(snapshot['buckets']) != self.buckets:
+            raise ValueError("히스토그램 구간이 다른 snapshot은 합칠 수 없습니다.")
+        with self._lock:
+            for counter in snapshot['counters']:
+                series = self._counters.setdefault(counter['name'], {})
+                key = self._labels(counter['labels'])
+                series[key] = series.get(key, 0.0) + counter['value']
+            for item in snapshot['histograms']:
+                histogram = self._histograms.setdefault(item['name'], {}).setdefault(
+                    self._labels(item['labels']), [[0] * (len(self.buckets) + 1), 0.0, 0]
+                )
+                histogram[0] = [a + b for a, b in zip(histogram[0], item['bucket_counts'])]
+                histogram[1] += item['sum']
+                histogram[2] += item['count']
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition 형식"""
+        snapshot = self.snapshot()
+        lines = []
+        for metric_type, items in (("counter", snapshot['counters']), ("histogram", snapshot['histograms'])):
+            for name in sorted({item['name'] for item in items}):
+                lines.append(f"# TYPE {name} {metric_type}")
+                for item in items:
+                    if item['name'] != name:
+                        continue
+                    if metric_type == "counter":
+                        lines.append(f"{name}{_format_labels(item['labels'])} {item['value']:g}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip([*self.buckets, "+Inf"], item['bucket_counts']):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels({**item['labels'], 'le': bound})} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(item['labels'])} {item['sum']:.6f}")
+                    lines.append(f"{name}_count{_format_labels(item['labels'])} {item['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> str:
+        """파일로 저장 (.prom이면 Prometheus text, 그 외는 JSON)
+
+        수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 이름을 바꾼다.
+        """
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(path + ".tmp", path)
+        return path
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    escaped = {
+        key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for key, value in labels.items()
+    }
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped.items()) + "}"
+
+# 프로세스 공유 레지스트리
+_registry = MetricsRegistry()
+
+def get_metrics() -> MetricsRegistry:
+    """DCF 계산기와 collector들이 함께 사용하는 레지스트리"""
+    return _registry
+
+def stage_timer(stage: str):
+    """단계 소요 시간 기록 컨텍스트 (dcf_stage_seconds)"""
+    return _registry.timer("dcf_stage_seconds", stage=stage)
+
+def timed_stage(stage: str) -> Callable:
+    """메서드 실행 시간을 단계 소요 시간으로 기록하는 데코레이터"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_cache(cache: str, result: str) -> None:
+    """캐시 조회 결과 기록 (result: hit, miss, coalesced)"""
+    _registry.inc("dcf_cache_total", cache=cache, result=result)
+
+def record_fallback(parameter: str, ticker: Optional[str] = None) -> None:
+    """데이터 대신 기본값을 사용한 경우 기록 (시장 전체 값이면 ticker 생략)"""
+    _registry.inc("dcf_fallback_total", parameter=parameter, ticker=ticker)
+
+def record_failure(stage: str, ticker: Optional[str] = None) -> None:
+    """단계 계산 실패 기록"""
+    _registry.inc("dcf_failures_total", stage=stage, ticker=ticker)
@@ -0,0 +1,370 @@
+"""코스피 섹터별 PER 멀티플 사전 계산 테이블
+
+야간 배치(build)가 kospi_list 전 종목의 시가총액, TTM 순이익(최근 4분기 합), trailing PER을 계산하여
+종목별 행과 섹터/산업별 PER 중앙값, 백분위수를 SQLite에 저장한다.
+조회용 SectorMultiplesTable은 테이블을 한 번 메모리에 올린 뒤 딕셔너리와 정렬된 배열로 찾으므로
+리포트 생성(peer PER)이나 DCF 점검 시 네트워크 조회 없이 마이크로초 단위로 응답한다.
+
+kospi_list에는 업종 정보가 없으므로 섹터/산업은 yfinance info의 sector, industry를 사용한다.
+PER 분포는 TTM 순이익이 양수인 종목만으로 계산한다 (적자 기업의 음수 PER은 제외).
+
+예) python -m DCF.utils.sector_multiples build --workers 8
+"""
+import argparse
+import bisect
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from ..collectors.financial_metrics import FinancialMetrics
+from ..collectors.providers import MarketDataProvider, get_default_provider
+from ..collectors.statement_store import DEFAULT_STORE_PATH, StatementStore
+from ..collectors.ticker_data_context import TickerDataContext
+
+# 기본 저장 위치 (환경변수 DCF_SECTOR_MULTIPLES로 변경 가능)
+DEFAULT_MULTIPLES_PATH = os.getenv(
+    "DCF_SECTOR_MULTIPLES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sector_multiples.sqlite"),
+)
+GROUP_LEVELS = ("sector", "industry")
+PERCENTILES = (10, 25, 50, 75, 90)
+# 지배주주 순이익을 우선 사용하고, 없으면 당기순이익 사용
+NET_INCOME_ROWS = ("Net Income Common Stockholders", "Net Income")
+
+def compute_ticker_multiples(
+        ticker: str,
+        name: Optional[str] = None,
+        provider: Optional[MarketDataProvider] = None,
+        store: Optional[StatementStore] = None
+        ) -> Dict:
+    """종목의 시가총액, TTM 순이익, trailing PER 계산
+
+    returns:
+        Dict: ticker, name, sector, industry, market_cap, ttm_earnings, trailing_per
+              (TTM 순이익이 0 이하이거나 분기가 누락된 경우 trailing_per는 None)
+    """
+    context = TickerDataContext(ticker, store=store, provider=provider)
+    info = context.get_info()
+    income_stmt = context.get_statement("income_stmt", "quarterly")
+
+    row = next((label for label in NET_INCOME_ROWS if label in income_stmt.index), None)
+    if row is None:
+        raise KeyError("Net Income 데이터를 찾을 수 없습니다.")
+    metrics = FinancialMetrics.from_series({'net_income': income_stmt.loc[row]}).to_ttm(('net_income',))
+    ttm_earnings = metrics.latest('net_income') if len(metrics) else float('nan')
+    ttm_earnings = None if np.isnan(ttm_earnings) else ttm_earnings
+
+    market_cap = info.get('marketCap')
+    trailing_per = None
+    if market_cap and ttm_earnings and ttm_earnings > 0:
+        trailing_per = market_cap / ttm_earnings
+
+    return {
+        'ticker': ticker,
+        'name': name or info.get('shortName') or ticker,
+        'sector': info.get('sector'),
+        'industry': info.get('industry'),
+        'market_cap': market_cap,
+        'ttm_earnings': ttm_earnings,
+        'trailing_per': trailing_per,
+    }
+
+def summarize_groups(rows: Iterable[Dict]) -> List[Dict]:
+    """종목별 행을 섹터/산업별로 묶어 PER 백분위수와 합산 PER(시가총액 합 / 순이익 합) 계산"""
+    groups: Dict[tuple, List[Dict]] = {}
+    for row in rows:
+        if row['trailing_per'] is None:
+            continue
+        for level in GROUP_LEVELS:
+            if row[level]:
+                groups.setdefault((level, row[level]), []).append(row)
+
+    summaries = []
+    for (level, name), members in sorted(groups.items()):
+        pers = np.array([member['trailing_per'] for member in members])
+        quantiles = np.percentile(pers, PERCENTILES)
+        summary = {'level': level, 'name': name, 'count': len(members)}
+        summary.update({f'per_p{p}': float(q) for p, q in zip(PERCENTILES, quantiles)})
+        summary['per_aggregate'] = sum(m['market_cap'] for m in members) / sum(m['ttm_earnings'] for m in members)
+        summary['market_cap_median'] = float(np.median([m['market_cap'] for m in members]))
+        summaries.append(summary)
+    return summaries
+
+class SectorMultiplesStore:
+    """종목별 멀티플과 섹터/산업별 요약을 저장하는 SQLite 테이블
+
+    파일과 테이블은 처음 저장할 때(build) 만들고, 조회만 할 때는 파일이 없어도 만들지 않는다.
+    """
+
+    TICKER_COLUMNS = ['ticker', 'name', 'sector', 'industry', 'market_cap', 'ttm_earnings', 'trailing_per', 'as_of']
+    GROUP_COLUMNS = ['level', 'name', 'count', *[f'per_p{p}' for p in PERCENTILES], 'per_aggregate', 'market_cap_median', 'as_of']
+
+    def __init__(self, path: str = DEFAULT_MULTIPLES_PATH):
+        self.path = path
+        self._created = False
+
+    def exists(self) -> bool:
+        """저장소 파일이 있는지 여부 (build 전에는 False)"""
+        return os.path.exists(self.path)
+
+    def _create_tables(self) -> None:
+        """저장 전에 파일과 테이블 생성 (처음 한 번만)"""
+        if self._created:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS ticker_multiples (
+                    ticker TEXT PRIMARY KEY,
+                    name TEXT,
+                    sector TEXT,
+                    industry TEXT,
+                    market_cap REAL,
+                    ttm_earnings REAL,
+                    trailing_per REAL,
+                    as_of TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_ticker_multiples_sector ON ticker_multiples (sector);
+                CREATE INDEX IF NOT EXISTS idx_ticker_multiples_industry ON ticker_multiples (industry);
+                CREATE INDEX IF NOT EXISTS idx_ticker_multiples_name ON ticker_multiples (name);
+                CREATE TABLE IF NOT EXISTS group_multiples (
+                    level TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    {', '.join(f'per_p{p} REAL' for p in PERCENTILES)},
+                    per_aggregate REAL,
+                    market_cap_median REAL,
+                    as_of TEXT NOT NULL,
+                    PRIMARY KEY (level, name)
+                );
+                """
+            )
+        self._created = True
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def upsert_tickers(self, rows: Iterable[Dict], as_of: str) -> None:
+        """종목별 행 저장 (같은 종목은 덮어씀, 이번에 조회하지 못한 종목의 이전 값은 유지)"""
+        self._create_tables()
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO ticker_multiples ({', '.join(self.TICKER_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.TICKER_COLUMNS))})",
+                [tuple({**row, 'as_of': as_of}[column] for column in self.TICKER_COLUMNS) for row in rows],
+            )
+
+    def rebuild_groups(self, as_of: str) -> int:
+        """저장된 전체 종목으로 섹터/산업별 요약을 다시 계산 (요약 테이블 전체 교체)
+
+        returns:
+            int: 요약 행 수
+        """
+        self._create_tables()
+        summaries = summarize_groups(self.tickers())
+        with self._connect() as conn:
+            conn.execute("DELETE FROM group_multiples")
+            conn.executemany(
+                f"INSERT INTO group_multiples ({', '.join(self.GROUP_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.GROUP_COLUMNS))})",
+                [tuple({**summary, 'as_of': as_of}[column] for column in self.GROUP_COLUMNS) for summary in summaries],
+            )
+        return len(summaries)
+
+    def tickers(self) -> List[Dict]:
+        return self._select("ticker_multiples", self.TICKER_COLUMNS)
+
+    def groups(self) -> List[Dict]:
+        return self._select("group_multiples", self.GROUP_COLUMNS)
+
+    def _select(self, table: str, columns: List[str]) -> List[Dict]:
+        # 아직 build하지 않았으면 빈 결과 (조회 때문에 빈 파일이 생기지 않도록 연결하지 않음)
+        if not self.exists():
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+def build_sector_multiples(
+        tickers: Iterable[str],
+        names: Optional[Dict[str, str]] = None,
+        path: str = DEFAULT_MULTIPLES_PATH,
+        provider: Optional[MarketDataProvider] = None,
+        store: Optional[StatementStore] = None,
+        workers: int = 8
+        ) -> Dict[str, int]:
+    """종목별 멀티플을 계산하여 저장하고 섹터/산업별 요약을 다시 계산 (야간 배치)
+
+    조회는 네트워크 대기가 대부분이므로 스레드 풀로 동시에 수행한다.
+
+    returns:
+        Dict[str, int]: 계산(computed), 실패(failed), 요약 그룹(groups) 수
+    """
+    provider = provider or get_default_provider()
+    names = names or {}
+    as_of = provider.now().strftime("%Y-%m-%d")
+
+    def compute(ticker: str) -> Optional[Dict]:
+        try:
+            return compute_ticker_multiples(ticker, names.get(ticker), provider=provider, store=store)
+        except Exception as e:
+            print(f"{ticker} 멀티플 계산 중 오류 발생: {str(e)}")
+            return None
+
+    tickers = list(tickers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = [row for row in executor.map(compute, tickers) if row is not None]
+
+    multiples_store = SectorMultiplesStore(path)
+    multiples_store.upsert_tickers(rows, as_of)
+    groups = multiples_store.rebuild_groups(as_of)
+    return {'computed': len(rows), 'failed': len(tickers) - len(rows), 'groups': groups}
+
+class SectorMultiplesTable:
+    """메모리에 올린 섹터 멀티플 조회 테이블 (조회 시 SQLite, 네트워크 접근 없음)
+
+    종목은 티커 또는 kospi_list 종목명으로 찾을 수 있다.
+    """
+
+    def __init__(self, path: str = DEFAULT_MULTIPLES_PATH):
+        self.path = path
+        self.reload()
+
+    def reload(self) -> None:
+        """저장소에서 다시 읽기 (야간 배치 이후 갱신용)"""
+        multiples_store = SectorMultiplesStore(self.path)
+        self._tickers = {row['ticker']: row for row in multiples_store.tickers()}
+        self._names = {row['name']: row['ticker'] for row in self._tickers.values()}
+        self._groups = {(row['level'], row['name']): row for row in multiples_store.groups()}
+        # 그룹별 구성 종목(시가총액 큰 순)과 정렬된 PER 배열 (peer 조회, 백분위 계산용)
+        self._members: Dict[tuple, List[Dict]] = {}
+        for row in self._tickers.values():
+            if row['trailing_per'] is None:
+                continue
+            for level in GROUP_LEVELS:
+                if row[level]:
+                    self._members.setdefault((level, row[level]), []).append(row)
+        for members in self._members.values():
+            members.sort(key=lambda member: member['market_cap'], reverse=True)
+        self._sorted_pers = {key: sorted(m['trailing_per'] for m in members) for key, members in self._members.items()}
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+    def ticker(self, ticker_or_name: str) -> Optional[Dict]:
+        """종목별 멀티플 (티커 또는 종목명, 없으면 None)"""
+        ticker = self._names.get(ticker_or_name, ticker_or_name)
+        return self._tickers.get(ticker)
+
+    def group(self, name: str, level: str = "sector") -> Optional[Dict]:
+        """섹터(level='sector') 또는 산업(level='industry')의 PER 요약"""
+        return self._groups.get((level, name))
+
+    def group_of(self, ticker_or_name: str, level: str = "industry", min_count: int = 3) -> Optional[Dict]:
+        """종목이 속한 그룹의 PER 요약
+
+        산업 구성 종목이 min_count개 미만이면 섹터 요약을 사용한다.
+        """
+        row = self.ticker(ticker_or_name)
+        if row is None:
+            return None
+        for candidate in (level, "sector"):
+            group = self._groups.get((candidate, row[candidate]))
+            if group is not None and group['count'] >= min_count:
+                return group
+        return None
+
+    def peer_pers(self, ticker_or_name: str, limit: int = 10, level: str = "industry", min_count: int = 3) -> Dict[str, float]:
+        """같은 그룹에서 시가총액이 큰 종목 순으로 종목명별 trailing PER (자기 자신 제외)"""
+        row = self.ticker(ticker_or_name)
+        group = self.group_of(ticker_or_name, level, min_count)
+        if group is None:
+            return {}
+        members = self._members.get((group['level'], group['name']), [])
+        peers = [member for member in members if member['ticker'] != row['ticker']][:limit]
+        return {peer['name']: peer['trailing_per'] for peer in peers}
+
+    def percentile_of(self, per: float, name: str, level: str = "sector") -> Optional[float]:
+        """그룹 PER 분포에서 per의 백분위 (0~100)"""
+        pers = self._sorted_pers.get((level, name))
+        if not pers:
+            return None
+        return 100.0 * bisect.bisect_left(pers, per) / len(pers)
+
+    def compare_per(self, ticker_or_name: str, per: float, level: str = "industry", min_count: int = 3) -> Optional[Dict]:
+        """PER을 종목이 속한 그룹의 분포와 비교
+
+        returns:
+            Dict: 그룹 정보, 입력 PER의 그룹 내 백분위, 10~90 백분위 범위 안에 있는지 여부
+        """
+        group = self.group_of(ticker_or_name, level, min_count)
+        if group is None:
+            return None
+        return {
+            'level': group['level'],
+            'group': group['name'],
+            'per': per,
+            'percentile': self.percentile_of(per, group['name'], group['level']),
+            'per_p10': group['per_p10'],
+            'per_median': group['per_p50'],
+            'per_p90': group['per_p90'],
+            'within_range': group['per_p10'] <= per <= group['per_p90'],
+            'as_of': group['as_of'],
+        }
+
+# 경로별로 한 번만 읽어 프로세스 안에서 공유
+_tables: Dict[str, SectorMultiplesTable] = {}
+_tables_lock = threading.Lock()
+
+def get_sector_multiples(path: str = DEFAULT_MULTIPLES_PATH) -> Optional[SectorMultiplesTable]:
+    """프로세스 공유 섹터 멀티플 조회 테이블 (아직 build하지 않아 파일이 없으면 None)"""
+    with _tables_lock:
+        if path not in _tables:
+            if not os.path.exists(path):
+                return None
+            _tables[path] = SectorMultiplesTable(path)
+        return _tables[path]
+
+def main(argv: Optional[list] = None) -> None:
+    """섹터 멀티플 테이블 관리 커맨드
+
+    예) python -m DCF.utils.sector_multiples build --store DCF/data/statement_store.sqlite
+        python -m DCF.utils.sector_multiples show --level sector
+    """
+    from .universe import DEFAULT_KOSPI_LIST, load_kospi_names
+
+    parser = argparse.ArgumentParser(description="코스피 섹터 멀티플 테이블")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="전 종목 멀티플 계산 및 섹터 요약 갱신")
+    build.add_argument("--tickers", nargs="*", help="계산할 티커 목록 (없으면 kospi_list 전체)")
+    build.add_argument("--kospi-list", default=DEFAULT_KOSPI_LIST, help="종목 리스트 CSV 경로")
+    build.add_argument("--db", default=DEFAULT_MULTIPLES_PATH, help="멀티플 테이블 경로")
+    build.add_argument("--store", default=None, help="재무제표 저장소 경로 (지정 시 저장소를 거쳐 조회, --offline만 지정하면 기본 저장소)")
+    build.add_argument("--offline", action="store_true", help="재무제표 저장소에 있는 데이터만 사용")
+    build.add_argument("--workers", type=int, default=8)
+    show = subparsers.add_parser("show", help="섹터/산업별 PER 요약 출력")
+    show.add_argument("--db", default=DEFAULT_MULTIPLES_PATH, help="멀티플 테이블 경로")
+    show.add_argument("--level", default="sector", choices=GROUP_LEVELS)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        names = load_kospi_names(args.kospi_list)
+        tickers = args.tickers or list(names)
+        store = StatementStore(args.store or DEFAULT_STORE_PATH, offline=args.offline) if args.store or args.offline else None
+        counts = build_sector_multiples(tickers, names, args.db, store=store, workers=args.workers)
+        print(f"멀티플 테이블 갱신 완료: {counts}")
+    else:
+        multiples_store = SectorMultiplesStore(args.db)
+        if not multiples_store.exists():
+            print(f"멀티플 테이블이 없습니다: {args.db} (먼저 build를 실행하세요)")
+            return
+        for group in multiples_store.groups():
+            if group['level'] == args.level:
+                print(f"{group['name']}: {group['count']}개 종목, PER 중앙값 {group['per_p50']:.2f} "
+                      f"(p25 {group['per_p25']:.2f}, p75 {group['per_p75']:.2f}), 기준일 {group['as_of']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+import pandas as pd
+from typing import Dict, List
+
+# 코스피 종목 리스트 (종목코드, 종목명)
+DEFAULT_KOSPI_LIST = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "report_agent", "data", "kospi_list.csv",
+)
+
+def load_kospi_tickers(path: str = DEFAULT_KOSPI_LIST, suffix: str = ".KS") -> List[str]:
+    """kospi_list.csv의 종목코드를 yfinance 티커 형식(005930.KS)으로 변환하여 반환"""
+    kospi_df = pd.read_csv(path, dtype={"종목코드": str}, encoding="utf-8-sig")
+    return [f"{code.zfill(6)}{suffix}" for code in kospi_df["종목코드"].dropna()]
+
+def load_kospi_names(path: str = DEFAULT_KOSPI_LIST, suffix: str = ".KS") -> Dict[str, str]:
+    """kospi_list.csv의 티커(005930.KS)별 종목명"""
+    kospi_df = pd.read_csv(path, dtype={"종목코드": str}, encoding="utf-8-sig").dropna(subset=["종목코드"])
+    return {f"{code.zfill(6)}{suffix}": name for code, name in zip(kospi_df["종목코드"], kospi_df["종목명"])}
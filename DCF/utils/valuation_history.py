@@ -0,0 +1,219 @@
+"""DCF 밸류에이션 결과 이력 저장소
+
+실행(run)마다 결과를 날짜 파티션(date=YYYY-MM-DD) 아래 새 parquet 파일로 추가하고(append-only),
+manifest.jsonl에 실행 목록을 기록한다. 조회 시에는 manifest로 필요한 파일만 골라 읽으므로
+"지난 실행 대비 변동" 같은 질의는 전체 파티션을 읽지 않는다.
+
+행 단위: (실행, 종목, 평균 기간) / is_best는 calculate_per_share가 선택한 기간 여부
+pyarrow는 필수 의존성이 아니므로 이력 저장소를 처음 사용할 때 불러온다.
+"""
+from __future__ import annotations
+import json
+import os
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+DEFAULT_HISTORY_DIR = os.getenv("DCF_VALUATION_HISTORY", os.path.join("output", "dcf_history"))
+VALUE_COLUMNS = ['per_share', 'cost_of_equity', 'growth_rate', 'ratio_capex_ocf', 'ratio_repayment_issuance']
+
+@lru_cache(maxsize=None)
+def _arrow():
+    """pyarrow 모듈 (pa, pc, ds, pq) 조회 (설치되지 않았으면 설치 방법을 알리는 ImportError)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("밸류에이션 이력 저장소에는 pyarrow가 필요합니다. (poetry install -E history)") from e
+    return pa, pc, ds, pq
+
+@lru_cache(maxsize=None)
+def get_schema() -> pa.Schema:
+    """이력 parquet 파일 스키마"""
+    pa = _arrow()[0]
+    return pa.schema([
+        ('run_id', pa.string()),
+        ('run_at', pa.timestamp('us')),
+        ('ticker', pa.string()),
+        ('window', pa.int8()),
+        ('is_best', pa.bool_()),
+        *[(column, pa.float64()) for column in VALUE_COLUMNS],
+    ])
+
+def history_rows(ticker: str, window_results: Dict[int, Optional[Dict[str, float]]], best_window: Optional[int] = None) -> List[Dict]:
+    """ValuationCalculator.window_results를 이력 행으로 변환 (결과가 없는 기간은 값이 None인 행)"""
+    rows = []
+    for window, result in sorted(window_results.items()):
+        row = {'ticker': ticker, 'window': window, 'is_best': window == best_window}
+        row.update({column: None if result is None else float(result[column]) for column in VALUE_COLUMNS})
+        rows.append(row)
+    return rows
+
+class ValuationHistory:
+    """날짜 파티션 parquet 파일과 manifest로 구성된 append-only 밸류에이션 이력"""
+
+    MANIFEST_FILE = "manifest.jsonl"
+
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, self.MANIFEST_FILE)
+        # pyarrow가 없으면 파일을 쓰기 전에 바로 알림
+        _arrow()
+        os.makedirs(root, exist_ok=True)
+
+    def runs(self) -> List[Dict]:
+        """실행 목록 (오래된 순)"""
+        runs = []
+        if not os.path.exists(self.manifest_path):
+            return runs
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 기록 중 중단되어 잘린 마지막 줄은 무시
+                    continue
+        return runs
+
+    def append(self, rows: Iterable[Dict], run_at: Optional[datetime] = None, run_id: Optional[str] = None) -> Optional[str]:
+        """한 실행의 결과를 새 파일로 추가 (행이 없으면 None)
+
+        returns:
+            str: 실행 ID
+        """
+        rows = list(rows)
+        if not rows:
+            return None
+
+        run_at = run_at or datetime.now()
+        run_id = run_id or f"{run_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        pa, _, _, pq = _arrow()
+        table = pa.Table.from_pylist(
+            [{'run_id': run_id, 'run_at': run_at, **row} for row in rows],
+            schema=get_schema(),
+        )
+        # 종목 순으로 정렬해 두면 row group 통계로 종목 필터 시 읽을 범위가 줄어듦
+        table = table.sort_by([('ticker', 'ascending'), ('window', 'ascending')])
+
+        relative_path = os.path.join(f"date={run_at:%Y-%m-%d}", f"run-{run_id}.parquet")
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 완성된 파일만 보이도록 임시 파일에 쓴 뒤 이름 변경, manifest에는 그 다음에 기록
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+        entry = {
+            'run_id': run_id,
+            'run_at': run_at.isoformat(),
+            'date': f"{run_at:%Y-%m-%d}",
+            'path': relative_path,
+            'rows': table.num_rows,
+            'tickers': len(set(table.column('ticker').to_pylist())),
+        }
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return run_id
+
+    def _dataset(self, runs: List[Dict]) -> ds.Dataset:
+        paths = [os.path.join(self.root, run['path']) for run in runs]
+        return _arrow()[2].dataset(paths, schema=get_schema(), format="parquet")
+
+    def to_arrow(
+            self,
+            tickers: Optional[Iterable[str]] = None,
+            run_ids: Optional[Iterable[str]] = None,
+            start: Optional[str] = None,
+            end: Optional[str] = None,
+            best_only: bool = False,
+            columns: Optional[List[str]] = None
+            ) -> pa.Table:
+        """이력을 Arrow 테이블로 조회 (pandas 변환 없이 대시보드 등에 그대로 전달)
+
+        args:
+            tickers: 종목 필터
+            run_ids: 실행 ID 필터
+            start, end (str): 날짜 파티션 범위 (YYYY-MM-DD, 양 끝 포함)
+            best_only (bool): 선택된 평균 기간 행만 조회
+            columns: 조회할 열
+        """
+        runs = self.runs()
+        if run_ids is not None:
+            run_ids = set(run_ids)
+            runs = [run for run in runs if run['run_id'] in run_ids]
+        # 날짜 범위는 manifest로 먼저 걸러 해당 파티션 파일만 읽음
+        if start is not None:
+            runs = [run for run in runs if run['date'] >= start]
+        if end is not None:
+            runs = [run for run in runs if run['date'] <= end]
+        schema = get_schema()
+        if not runs:
+            return schema.empty_table().select(columns or schema.names)
+
+        pc = _arrow()[1]
+        condition = None
+        if tickers is not None:
+            condition = pc.field('ticker').isin(list(tickers))
+        if best_only:
+            best = pc.field('is_best') == True  # noqa: E712
+            condition = best if condition is None else condition & best
+        return self._dataset(runs).to_table(columns=columns, filter=condition)
+
+    def ticker_history(self, ticker: str, window: Optional[int] = None) -> pd.DataFrame:
+        """종목의 실행별 결과 시계열 (window를 지정하지 않으면 선택된 기간의 값)"""
+        pc = _arrow()[1]
+        table = self.to_arrow(tickers=[ticker], best_only=window is None)
+        if window is not None:
+            table = table.filter(pc.field('window') == window)
+        return table.sort_by('run_at').to_pandas()
+
+    def moved_since_last_run(self, column: str = 'per_share', threshold: float = 0.0) -> pd.DataFrame:
+        """가장 최근 실행과 그 이전 값의 차이 (선택된 기간 기준)
+
+        이전 값은 최근 실행 직전 실행부터 거슬러 올라가며 해당 종목이 처음 나오는 실행의 값이며,
+        최근 실행의 모든 종목을 찾으면 더 오래된 파일은 읽지 않는다.
+
+        args:
+            column (str): 비교할 값
+            threshold (float): 변동률(절대값) 기준, 이 값보다 크게 변한 종목만 반환
+        returns:
+            pd.DataFrame: ticker, previous, current, change, pct_change, previous_run_id (변동률 절대값 큰 순)
+        """
+        runs = self.runs()
+        columns = ['run_id', 'ticker', column]
+        empty = pd.DataFrame(columns=['ticker', 'previous', 'current', 'change', 'pct_change', 'previous_run_id'])
+        if len(runs) < 2:
+            return empty
+
+        latest = self.to_arrow(run_ids=[runs[-1]['run_id']], best_only=True, columns=columns).to_pandas()
+        latest = latest.set_index('ticker')[column]
+
+        remaining = set(latest.index)
+        previous_frames = []
+        for run in reversed(runs[:-1]):
+            if not remaining:
+                break
+            frame = self.to_arrow(tickers=remaining, run_ids=[run['run_id']], best_only=True, columns=columns).to_pandas()
+            previous_frames.append(frame)
+            remaining -= set(frame['ticker'])
+        if not previous_frames:
+            return empty
+
+        previous = pd.concat(previous_frames).set_index('ticker')
+        moved = pd.DataFrame({
+            'previous': previous[column],
+            'current': latest.reindex(previous.index),
+            'previous_run_id': previous['run_id'],
+        })
+        moved['change'] = moved['current'] - moved['previous']
+        moved['pct_change'] = moved['change'] / moved['previous'].abs()
+        moved = moved[moved['pct_change'].abs() > threshold]
+        moved = moved.reindex(moved['pct_change'].abs().sort_values(ascending=False).index)
+        return moved.reset_index()[['ticker', 'previous', 'current', 'change', 'pct_change', 'previous_run_id']]
@@ -0,0 +1,70 @@
+"""스칼라 DCF 계산과 벡터화 배치 엔진 비교 벤치마크
+
+코스피 전체 종목 수만큼의 입력을 만들어 ValuationCalculator의 스칼라 메서드 반복과
+DCF.calculators.batch_valuation 의 한 번의 벡터 연산을 비교한다.
+
+예) python -m benchmarks.bench_batch_valuation --repeat 5
+"""
+import argparse
+import time
+import numpy as np
+from DCF.calculators.batch_valuation import calculate_per_share_batch
+from DCF.calculators.valuation import ValuationCalculator
+from DCF.utils.universe import DEFAULT_KOSPI_LIST, load_kospi_tickers
+
+def make_inputs(n: int, seed: int = 0) -> dict:
+    """실제 분포와 비슷한 범위의 합성 입력 생성"""
+    rng = np.random.default_rng(seed)
+    inputs = {
+        'fcfe': rng.uniform(1e9, 1e13, n),
+        'cost_of_equity': rng.uniform(0.05, 0.15, n),
+        'net_income_growth_rate': rng.uniform(-0.05, 0.2, n),
+        'retention_ratio': rng.uniform(0.3, 1.0, n),
+        'shares_outstanding': rng.uniform(1e6, 6e9, n),
+    }
+    # 성장률과 자본비용이 같거나 매우 가까운 경우(할인 후 성장 배율이 1 근처)도 포함
+    m = min(n, 10)
+    inputs['net_income_growth_rate'][:m] = inputs['cost_of_equity'][:m] + np.linspace(-1e-6, 1e-6, m)
+    inputs['net_income_growth_rate'][:min(m, 2)] = inputs['cost_of_equity'][:min(m, 2)]
+    return inputs
+
+def run_scalar(calculator: ValuationCalculator, inputs: dict) -> np.ndarray:
+    per_share = []
+    for fcfe, coe, growth, retention, shares in zip(*inputs.values()):
+        _10year_pv, after_10year_fcfe = calculator.calculate_10year_present_value(fcfe, coe, growth, retention)
+        terminal_value_pv, _ = calculator.calculate_terminal_value(coe, retention, after_10year_fcfe)
+        per_share.append((_10year_pv + terminal_value_pv) / shares)
+    return np.array(per_share)
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="스칼라 vs 벡터화 DCF 벤치마크")
+    parser.add_argument("--kospi-list", default=DEFAULT_KOSPI_LIST)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    n = len(load_kospi_tickers(args.kospi_list))
+    inputs = make_inputs(n)
+    # 현재가치 계산 메서드는 네트워크 조회가 필요 없으므로 초기화 없이 인스턴스 생성
+    calculator = ValuationCalculator.__new__(ValuationCalculator)
+
+    scalar_times, batch_times = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        scalar_result = run_scalar(calculator, inputs)
+        scalar_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch_result = calculate_per_share_batch(**inputs)['per_share']
+        batch_times.append(time.perf_counter() - start)
+
+    # 배치 엔진은 스칼라 계산과 같은 순서로 계산하므로 거듭제곱 반올림 차이 외에는 결과가 같아야 함
+    np.testing.assert_allclose(batch_result, scalar_result, rtol=1e-12, atol=0)
+
+    scalar_best, batch_best = min(scalar_times), min(batch_times)
+    print(f"종목 수: {n}")
+    print(f"스칼라 계산: {scalar_best * 1000:.3f} ms")
+    print(f"벡터화 계산: {batch_best * 1000:.3f} ms")
+    print(f"속도 향상: {scalar_best / batch_best:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""DCF 밸류에이션 경로 벤치마크
+
+고정된 종목들에 대해 ValuationCalculator.calculate_per_share, WACCCalculator.calculate_wacc,
+FCFECalculator.calculate_fcfe를 기록된 데이터(ReplayProvider)로 실행하고
+실행시간(wall), CPU 시간, 최대 메모리, 밸류에이션당 외부 데이터 요청 수를 JSON으로 저장한다.
+
+1) 데이터 기록 (네트워크 필요)
+    python -m benchmarks.bench_dcf_pipeline --record
+2) 벤치마크 실행 (네트워크 불필요)
+    python -m benchmarks.bench_dcf_pipeline --latency 0.05 --output benchmarks/results/current.json
+3) 이전 결과와 비교 (요청 수 증가 또는 실행시간 증가 시 종료 코드 1)
+    python -m benchmarks.bench_dcf_pipeline --baseline benchmarks/results/previous.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from DCF.calculators.fcfe_calculator import FCFECalculator
+from DCF.calculators.valuation import ValuationCalculator
+from DCF.calculators.wacc_calculator import WACCCalculator
+from DCF.collectors.market_data_collector import set_market_snapshot
+from DCF.collectors.providers import (
+    CountingProvider,
+    MarketDataProvider,
+    RecordingProvider,
+    ReplayProvider,
+    YFinanceProvider,
+    set_default_provider,
+)
+from DCF.collectors.ticker_data_context import TickerDataContext
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURE_DIR = os.path.join(BENCHMARK_DIR, "fixtures", "dcf_pipeline")
+DEFAULT_OUTPUT_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+# report_agent에서 지원하는 11개 기업
+DEFAULT_TICKERS = [
+    "000660.KS", "003490.KS", "003670.KS", "005380.KS", "005930.KS", "017670.KS",
+    "034020.KS", "035420.KS", "035720.KS", "251270.KS", "373220.KS",
+]
+
+def _targets(provider: MarketDataProvider) -> Dict[str, Callable[[str], object]]:
+    """벤치마크 대상 (호출마다 새 계산기를 만들어 캐시가 비어 있는 상태에서 측정)"""
+    return {
+        "calculate_per_share": lambda ticker: ValuationCalculator(ticker, provider=provider).calculate_per_share(),
+        "calculate_wacc": lambda ticker: WACCCalculator(ticker, TickerDataContext(ticker, provider=provider)).calculate_wacc(),
+        "calculate_fcfe": lambda ticker: FCFECalculator(ticker, TickerDataContext(ticker, provider=provider)).calculate_fcfe(),
+    }
+
+def measure(func: Callable[[], object], counter: CountingProvider) -> Dict:
+    """한 번 실행의 wall/CPU 시간, 최대 메모리, 외부 요청 수 측정"""
+    counter.reset()
+    tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "wall_sec": wall,
+        "cpu_sec": cpu,
+        "peak_memory_bytes": peak,
+        "requests": counter.snapshot(),
+        "total_requests": counter.total(),
+    }
+
+def run_benchmark(provider: MarketDataProvider, tickers: List[str], repeat: int = 1, warm_market: bool = False) -> Dict:
+    """대상별, 종목별로 측정한 결과와 대상별 평균 요약"""
+    counter = CountingProvider(provider)
+    # calculate_beta 등 provider를 직접 받지 않는 경로도 같은 provider를 사용하도록 기본값 지정
+    set_default_provider(counter)
+
+    results = []
+    for target, func in _targets(counter).items():
+        for ticker in tickers:
+            for _ in range(repeat):
+                if not warm_market:
+                    # 시장 스냅샷도 밸류에이션마다 새로 계산하여 요청 수에 포함
+                    set_market_snapshot(None)
+                results.append({"target": target, "ticker": ticker, **measure(lambda: func(ticker), counter)})
+
+    summary = {}
+    for target in _targets(counter):
+        rows = [row for row in results if row["target"] == target]
+        summary[target] = {
+            key: sum(row[key] for row in rows) / len(rows)
+            for key in ("wall_sec", "cpu_sec", "peak_memory_bytes", "total_requests")
+        }
+    return {"results": results, "summary": summary}
+
+def compare(current: Dict, baseline: Dict, time_tolerance: float = 0.2) -> List[str]:
+    """기준 결과 대비 요청 수 증가, 실행시간 증가(허용 범위 초과) 항목"""
+    regressions = []
+    for target, stats in current["summary"].items():
+        base = baseline["summary"].get(target)
+        if base is None:
+            continue
+        if stats["total_requests"] > base["total_requests"]:
+            regressions.append(f"{target}: 요청 수 {base['total_requests']:.1f} -> {stats['total_requests']:.1f}")
+        if stats["wall_sec"] > base["wall_sec"] * (1 + time_tolerance):
+            regressions.append(f"{target}: 실행시간 {base['wall_sec']:.4f}s -> {stats['wall_sec']:.4f}s")
+    return regressions
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="DCF 밸류에이션 경로 벤치마크")
+    parser.add_argument("--tickers", nargs="*", default=DEFAULT_TICKERS)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="기록 데이터 경로")
+    parser.add_argument("--record", action="store_true", help="실제 데이터를 조회하여 기록")
+    parser.add_argument("--latency", type=float, default=0.0, help="재생 시 요청당 주입할 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="재생 시 요청당 추가 지연의 최대값(초)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--warm-market", action="store_true", help="시장 스냅샷을 밸류에이션 간에 공유")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--time-tolerance", type=float, default=0.2, help="실행시간 증가 허용 비율")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        provider = RecordingProvider(YFinanceProvider(), args.fixtures)
+    else:
+        provider = ReplayProvider(args.fixtures, latency=args.latency, jitter=args.jitter, seed=0)
+
+    report = run_benchmark(provider, args.tickers, args.repeat, args.warm_market)
+    report["meta"] = {
+        "created_at": datetime.now().isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "mode": "record" if args.record else "replay",
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "tickers": args.tickers,
+    }
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"dcf_pipeline-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for target, stats in report["summary"].items():
+        print(f"{target}: wall {stats['wall_sec'] * 1000:.1f} ms, cpu {stats['cpu_sec'] * 1000:.1f} ms, "
+              f"peak {stats['peak_memory_bytes'] / 1024:.0f} KiB, requests {stats['total_requests']:.1f}")
+    print(f"결과 저장: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.time_tolerance)
+        for regression in regressions:
+            print(f"[regression] {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
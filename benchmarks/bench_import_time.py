@@ -0,0 +1,135 @@
+"""모듈 cold import 시간 벤치마크
+
+모듈마다 새 파이썬 프로세스에서 import 시간을 측정하고, 무거운 의존성(pandas, yfinance, langchain 등)이
+import 시점에 불러와지지 않았는지 확인한다. 다음 경우 종료 코드 1로 실패한다.
+- import 시간이 모듈별 허용 시간(--budget-scale로 조정)을 넘는 경우
+- --baseline 결과보다 허용 비율 이상 느려진 경우
+- 지연 import 대상 모듈이 import 시점에 불러와진 경우
+
+예) python -m benchmarks.bench_import_time --repeat 5 --output benchmarks/results/import_time.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_AGENT_ROOT = os.path.join(REPO_ROOT, "report_agent")
+
+# 모듈별 (sys.path 기준 경로, 허용 시간(초), import 시점에 불러오면 안 되는 모듈)
+TARGETS = {
+    "DCF.calculators.valuation": (REPO_ROOT, 0.5, ["pandas", "yfinance", "fredapi", "curl_cffi"]),
+    "DCF.collectors.statement_store": (REPO_ROOT, 0.2, ["pandas", "yfinance", "fredapi"]),
+    "tools.analyze.report_agent.tools.find_per": (REPORT_AGENT_ROOT, 0.2, ["yfinance", "curl_cffi", "langchain", "langchain_core", "yahooquery", "deep_translator"]),
+    "tools.analyze.report_agent.tools.report_agent": (
+        REPORT_AGENT_ROOT, 1.5,
+        ["yfinance", "langchain", "langchain_core", "langchain_openai", "langchain_community", "yahooquery", "deep_translator"],
+    ),
+}
+
+# 자식 프로세스에서 실행할 코드: import 시간과 불러온 금지 모듈을 JSON으로 출력
+_CHILD = """
+import json, sys, time
+module, forbidden = sys.argv[1], json.loads(sys.argv[2])
+start = time.perf_counter()
+try:
+    __import__(module)
+except ModuleNotFoundError as e:
+    print(json.dumps({"missing": e.name}))
+    sys.exit(0)
+elapsed = time.perf_counter() - start
+loaded = [name for name in forbidden if name in sys.modules]
+print(json.dumps({"elapsed": elapsed, "loaded": loaded}))
+"""
+
+def measure(module: str, root: str, forbidden: List[str]) -> Dict:
+    """새 프로세스에서 module을 import한 시간과 불러온 금지 모듈 조회"""
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD, module, json.dumps(forbidden)],
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": root, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(targets: Dict = TARGETS, repeat: int = 5) -> Dict[str, Dict]:
+    """모듈별 import 시간(중앙값, 최소값)과 금지 모듈 로드 여부
+
+    설치되지 않은 외부 의존성 때문에 import할 수 없는 모듈은 skipped로 기록한다.
+    """
+    results = {}
+    for module, (root, budget, forbidden) in targets.items():
+        runs = [measure(module, root, forbidden) for _ in range(repeat)]
+        if "missing" in runs[0]:
+            results[module] = {"status": "skipped", "missing": runs[0]["missing"], "budget_sec": budget}
+            continue
+        times = [run["elapsed"] for run in runs]
+        results[module] = {
+            "status": "ok",
+            "median_sec": statistics.median(times),
+            "min_sec": min(times),
+            "budget_sec": budget,
+            "eagerly_loaded": runs[0]["loaded"],
+        }
+    return results
+
+def check(results: Dict[str, Dict], baseline: Optional[Dict] = None, budget_scale: float = 1.0, tolerance: float = 0.25) -> List[str]:
+    """허용 시간 초과, 기준 대비 회귀, 금지 모듈 로드 항목"""
+    failures = []
+    for module, result in results.items():
+        if result["status"] != "ok":
+            continue
+        if result["eagerly_loaded"]:
+            failures.append(f"{module}: import 시점에 {', '.join(result['eagerly_loaded'])} 로드")
+        if result["median_sec"] > result["budget_sec"] * budget_scale:
+            failures.append(f"{module}: {result['median_sec']:.3f}s > 허용 {result['budget_sec'] * budget_scale:.3f}s")
+        base = (baseline or {}).get("results", {}).get(module)
+        if base and base.get("status") == "ok" and result["median_sec"] > base["median_sec"] * (1 + tolerance):
+            failures.append(f"{module}: {base['median_sec']:.3f}s -> {result['median_sec']:.3f}s")
+    return failures
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="모듈 cold import 시간 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="허용 시간 배율 (느린 CI 환경용)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="기준 대비 허용 증가 비율")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(repeat=args.repeat)
+    for module, result in results.items():
+        if result["status"] == "ok":
+            print(f"{module}: {result['median_sec'] * 1000:.1f} ms (min {result['min_sec'] * 1000:.1f} ms, "
+                  f"허용 {result['budget_sec'] * args.budget_scale * 1000:.0f} ms)")
+        else:
+            print(f"{module}: 건너뜀 ({result['missing']} 미설치)")
+
+    if args.output:
+        report = {
+            "meta": {"created_at": datetime.now().isoformat(), "python": platform.python_version(), "repeat": args.repeat},
+            "results": results,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    failures = check(results, baseline, args.budget_scale, args.tolerance)
+    for failure in failures:
+        print(f"[regression] {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
-from langchain_core.prompts import ChatPromptTemplate
-
 class currentQuarterReview:
     """직전 분기 실적 리뷰를 작성"""
 
@@ -26,10 +24,13 @@ class currentQuarterReview:
         직전 분기 총 매출 실적에 대한 컨센서스 : {consensus_of_total_business}
 
         """
+        from langchain_core.prompts import ChatPromptTemplate
         prompt = ChatPromptTemplate.from_template(template=template)
 
         chain = prompt | self.llm 
         
-        review = chain.invoke({"result_of_business_segment":result_of_business_segment, "result_of_total_business":result_of_total_business, "consensus_of_total_business":consensus_of_total_business})
+        from tools.analyze.report_agent.tools.llm_cache import llm_cache_scope
+        with llm_cache_scope("current_qt_review"):
+            review = chain.invoke({"result_of_business_segment":result_of_business_segment, "result_of_total_business":result_of_total_business, "consensus_of_total_business":consensus_of_total_business})
         return review
 
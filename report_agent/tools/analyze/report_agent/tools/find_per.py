@@ -1,41 +1,48 @@
-import yfinance as yf
-import numpy as np
-from langchain_core.prompts import PromptTemplate
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from functools import lru_cache
 from tools.analyze.report_agent.tools.report_agent_utils import get_ticker
+from tools.analyze.report_agent.tools.yahoo_client import yahoo_call, yahoo_ticker
 
-response_schemas = [
-    ResponseSchema(name="answer", description="사용자의 질문에 대한 답변, 파이썬 리스트 형식이어야 함."),
-    ]
-
-output_parser = StructuredOutputParser.from_response_schemas(response_schemas)
-# 출력 형식 지시사항을 파싱합니다.
-format_instructions = output_parser.get_format_instructions()
-prompt = PromptTemplate(
-    # 사용자의 질문에 최대한 답변하도록 템플릿을 설정합니다.
-    template="answer the users question as best as possible.\n{format_instructions}\n{question}",
-    # 입력 변수로 'question'을 사용합니다.
-    input_variables=["question"],
-    # 부분 변수로 'format_instructions'을 사용합니다.
-    partial_variables={"format_instructions": format_instructions},
-)
+# langchain, yfinance는 import 시간이 길어 파서/프롬프트는 처음 사용할 때 만들어 재사용
 
-def find_peer(company: str, llm) -> list[str]:
-    prompt = PromptTemplate(
-    # 사용자의 질문에 최대한 답변하도록 템플릿을 설정합니다.
-    template="answer the users question as best as possible.\n{format_instructions}\n{question}",
-    # 입력 변수로 'question'을 사용합니다.
-    input_variables=["question"],
-    # 부분 변수로 'format_instructions'을 사용합니다.
-    partial_variables={"format_instructions": format_instructions},
+@lru_cache(maxsize=None)
+def get_output_parser():
+    """경쟁사 리스트 응답 파서"""
+    from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+
+    response_schemas = [
+        ResponseSchema(name="answer", description="사용자의 질문에 대한 답변, 파이썬 리스트 형식이어야 함."),
+        ]
+    return StructuredOutputParser.from_response_schemas(response_schemas)
+
+@lru_cache(maxsize=None)
+def get_prompt():
+    """경쟁사 검색 프롬프트"""
+    from langchain_core.prompts import PromptTemplate
+
+    # 출력 형식 지시사항을 파싱합니다.
+    format_instructions = get_output_parser().get_format_instructions()
+    return PromptTemplate(
+        # 사용자의 질문에 최대한 답변하도록 템플릿을 설정합니다.
+        template="answer the users question as best as possible.\n{format_instructions}\n{question}",
+        # 입력 변수로 'question'을 사용합니다.
+        input_variables=["question"],
+        # 부분 변수로 'format_instructions'을 사용합니다.
+        partial_variables={"format_instructions": format_instructions},
     )
-    chain = prompt | llm | output_parser  # 프롬프트, 모델, 출력 파서를 연결
-    peer_list = chain.invoke({"question": f"{company}와 사업구조가 비슷하고, 같은 산업 혹은 섹터에 속한 경쟁사는?"
-                              "(코스피, 뉴욕거래소 등 상장된 회사만 찾으세요. 반드시 회사명만 출력해주세요.)"})
+
+def find_peer(company: str, llm) -> list[str]:
+    from tools.analyze.report_agent.tools.llm_cache import llm_cache_scope
+
+    chain = get_prompt() | llm | get_output_parser()  # 프롬프트, 모델, 출력 파서를 연결
+    with llm_cache_scope("find_peer"):
+        peer_list = chain.invoke({"question": f"{company}와 사업구조가 비슷하고, 같은 산업 혹은 섹터에 속한 경쟁사는?"
+                                  "(코스피, 뉴욕거래소 등 상장된 회사만 찾으세요. 반드시 회사명만 출력해주세요.)"})
     return peer_list
 
-def find_peer_PERs_tool(company: str, state, llm) -> None:
-    """기업과 동종 업계의 Peer Group PER 평균을 찾습니다."""
+def find_live_peer_PERs(company: str, llm) -> dict:
+    """LLM으로 경쟁사를 찾고 경쟁사별 PER(TTM)을 실시간으로 조회합니다."""
+    import numpy as np
+
     peer_list = find_peer(company, llm)['answer']
 
     # print(f"필터링 전 경쟁사 리스트: {peer_list}")
@@ -49,29 +56,31 @@ def find_peer_PERs_tool(company: str, state, llm) -> None:
         if ticker is None:
             continue
         elif ".KS" in ticker:
-            ticker = yf.Ticker(ticker)
+            ticker = yahoo_ticker(ticker)
             earning_ttm = 0
             try:
+                quarterly_income_stmt = yahoo_call("quarterly_income_stmt", lambda: ticker.quarterly_income_stmt)
                 for i in range(4):
-                    earning_ttm += ticker.quarterly_income_stmt.loc['Net Income Common Stockholders'][i]
+                    earning_ttm += quarterly_income_stmt.loc['Net Income Common Stockholders'][i]
             except:
                 print(f"{peer}의 Net Income Common Stockholders 문제 발생")
                 continue
-            trailingPERttm = ticker.info.get("marketCap")/earning_ttm
+            trailingPERttm = yahoo_call("info", lambda: ticker.info).get("marketCap")/earning_ttm
             # print(f"경쟁사 PER: {trailingPERttm}")
             if trailingPERttm <0 :
                 continue
             peer_pers[peer] = trailingPERttm
         else:
-            ticker = yf.Ticker(ticker)
+            ticker = yahoo_ticker(ticker)
             earning_ttm = 0
             try:
+                quarterly_income_stmt = yahoo_call("quarterly_income_stmt", lambda: ticker.quarterly_income_stmt)
                 for i in range(4):
-                    earning_ttm += ticker.quarterly_income_stmt.loc['Net Income Common Stockholders'][i]
+                    earning_ttm += quarterly_income_stmt.loc['Net Income Common Stockholders'][i]
             except:
                 print(f"{peer}의 Net Income Common Stockholders 문제 발생")
                 continue
-            trailingPERttm = ticker.info.get("marketCap")/earning_ttm*0.7 # 외국 주식의 경우 PER을 30% 할인
+            trailingPERttm = yahoo_call("info", lambda: ticker.info).get("marketCap")/earning_ttm*0.7 # 외국 주식의 경우 PER을 30% 할인
             # print(f"경쟁사 PER: {trailingPERttm}")
             if trailingPERttm <0 :
                 continue
@@ -79,6 +88,18 @@ def find_peer_PERs_tool(company: str, state, llm) -> None:
                 continue
             peer_pers[peer] = trailingPERttm
 
+    return peer_pers
+
+def find_peer_PERs_tool(company: str, state, llm, sector_table=None) -> None:
+    """기업과 동종 업계의 Peer Group PER 평균을 찾습니다.
+
+    sector_table(DCF.utils.sector_multiples.SectorMultiplesTable)이 주어지고 회사가 테이블에 있으면
+    LLM 검색과 경쟁사별 실시간 조회 없이 사전 계산된 같은 산업(섹터) 종목의 PER을 사용합니다.
+    """
+    peer_pers = sector_table.peer_pers(company) if sector_table is not None else {}
+    if not peer_pers:
+        peer_pers = find_live_peer_PERs(company, llm)
+
     valid_peer_pers = {}
     # print(f"현재 PER: {state.PER}")
 
@@ -103,10 +124,10 @@ def find_peer_PERs_tool(company: str, state, llm) -> None:
 
 def find_PER_tool(ticker: str) -> float:
     """기업의 현재 PER(TTM)를 찾습니다."""
-
-    ticker = yf.Ticker(ticker + ".KS")
+    ticker = yahoo_ticker(ticker + ".KS")
     earning_ttm = 0
+    quarterly_income_stmt = yahoo_call("quarterly_income_stmt", lambda: ticker.quarterly_income_stmt)
     for i in range(4):
-        earning_ttm += ticker.quarterly_income_stmt.loc['Net Income Common Stockholders'][i]
-    trailingPERttm = ticker.info["marketCap"]/earning_ttm
+        earning_ttm += quarterly_income_stmt.loc['Net Income Common Stockholders'][i]
+    trailingPERttm = yahoo_call("info", lambda: ticker.info)["marketCap"]/earning_ttm
     return trailingPERttm
@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.runnables.config import run_in_executor
+
+# 기본 저장 위치와 유효기간, 최대 항목 수 (환경변수로 변경 가능)
+DEFAULT_CACHE_PATH = os.getenv(
+    "REPORT_AGENT_LLM_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_cache.sqlite"),
+)
+DEFAULT_TTL_SEC = float(os.getenv("REPORT_AGENT_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("REPORT_AGENT_LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# 현재 실행 중인 체인 이름 (체인별 hit rate 집계용)
+_current_chain: contextvars.ContextVar[str] = contextvars.ContextVar("llm_cache_chain", default="unknown")
+# 현재 요청(리포트)의 체인별 집계 (llm_cache_stats 블록 안에서만 설정)
+_request_stats: contextvars.ContextVar[Optional[Dict[str, Dict[str, float]]]] = contextvars.ContextVar("llm_cache_request_stats", default=None)
+
+@contextmanager
+def llm_cache_scope(chain_name: str) -> Iterator[None]:
+    """블록 안의 LLM 호출을 chain_name 체인으로 집계"""
+    token = _current_chain.set(chain_name)
+    try:
+        yield
+    finally:
+        _current_chain.reset(token)
+
+@contextmanager
+def llm_cache_stats(stats: Optional[Dict[str, Dict[str, float]]] = None) -> Iterator[Dict[str, Dict[str, float]]]:
+    """블록 안의 캐시 조회만 stats에 체인별로 집계 (동시에 실행되는 요청끼리 통계가 섞이지 않음)
+
+    다른 스레드에서 실행하는 작업은 contextvars.copy_context()로 넘겨야 함께 집계된다.
+    """
+    stats = {} if stats is None else stats
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+def summarize_stats(stats: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """체인별 집계에 hit rate 추가"""
+    return {
+        chain: {**values, "hit_rate": values["hits"] / values["lookups"] if values["lookups"] else 0.0}
+        for chain, values in stats.items()
+    }
+
+def _task_caller() -> Tuple[str, int]:
+    """현재 asyncio task 식별자 (task 밖이면 스레드 식별자)"""
+    task = asyncio.current_task()
+    return ("task", id(task)) if task is not None else ("thread", threading.get_ident())
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _loads(text: str) -> Any:
+    """저장된 응답 역직렬화 (langchain_core 기본 객체만 허용, allowed_objects가 없는 이전 버전도 지원)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            return loads(text, allowed_objects="core")
+        except TypeError:
+            return loads(text)
+
+class PersistentLLMCache(BaseCache):
+    """LLM 응답을 SQLite에 저장하는 langchain 캐시
+
+    키는 (모델 설정 문자열 해시, 렌더링된 프롬프트 해시)이며, 모델 설정 문자열에는 모델명과 temperature 등이 포함된다.
+    - ttl_sec이 지난 응답은 사용하지 않고 삭제
+    - 항목 수가 max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+    - 응답을 처음 받을 때 걸린 시간을 함께 저장하여, hit마다 절약한 시간을 체인별로 집계
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_sec: Optional[float] = DEFAULT_TTL_SEC, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # miss 시각 (응답 저장 시 LLM 호출 시간 계산용)
+        self._pending: Dict[Tuple[str, str, Tuple[str, int]], float] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    llm_hash TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    latency_sec REAL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (llm_hash, prompt_hash)
+                );
+                CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed_at ON llm_cache (accessed_at);
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # 사업부별 체인이 여러 스레드에서 실행되므로 호출마다 연결
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, prompt: str, llm_string: str, caller: Optional[Tuple[str, int]] = None) -> Optional[RETURN_VAL_TYPE]:
+        key = (_hash(llm_string), _hash(prompt))
+        caller = caller or ("thread", threading.get_ident())
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, latency_sec, created_at FROM llm_cache WHERE llm_hash = ? AND prompt_hash = ?", key
+            ).fetchone()
+            if row is not None and self.ttl_sec is not None and now - row[2] > self.ttl_sec:
+                conn.execute("DELETE FROM llm_cache WHERE llm_hash = ? AND prompt_hash = ?", key)
+                row = None
+            if row is not None:
+                conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE llm_hash = ? AND prompt_hash = ?", (now, *key))
+
+        if row is None:
+            with self._lock:
+                # 같은 프롬프트를 동시에 호출해도 시작 시각이 섞이지 않도록 호출자별로 기록
+                self._pending[(*key, caller)] = time.perf_counter()
+            self._record(hit=False)
+            return None
+        try:
+            generations = _loads(row[0])
+        except Exception:
+            # langchain 버전이 바뀌어 읽을 수 없는 응답은 miss로 처리
+            self._record(hit=False)
+            return None
+        self._record(hit=True, saved_latency_sec=row[1] or 0.0)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE, caller: Optional[Tuple[str, int]] = None) -> None:
+        key = (_hash(llm_string), _hash(prompt))
+        caller = caller or ("thread", threading.get_ident())
+        with self._lock:
+            started = self._pending.pop((*key, caller), None)
+        latency_sec = time.perf_counter() - started if started is not None else None
+        model = re.search(r"['\"]?model(?:_name)?['\"]?\s*[:,]\s*['\"]([^'\"]+)['\"]", llm_string)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (llm_hash, prompt_hash, model, response, latency_sec, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, model.group(1) if model else None, dumps(list(return_val)), latency_sec, now, now),
+            )
+            self._evict(conn)
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # 스레드 풀의 어느 스레드에서 실행되든 같은 task의 update와 짝이 맞도록 task 기준으로 기록
+        return await run_in_executor(None, self.lookup, prompt, llm_string, _task_caller())
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        await run_in_executor(None, self.update, prompt, llm_string, return_val, _task_caller())
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """항목 수가 max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE rowid IN (SELECT rowid FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def _record(self, hit: bool, saved_latency_sec: float = 0.0) -> None:
+        chain = _current_chain.get()
+        request_stats = _request_stats.get()
+        with self._lock:
+            # 프로세스 누적 집계와 현재 요청(llm_cache_stats 블록) 집계
+            for target in (self._stats, request_stats):
+                if target is None:
+                    continue
+                stats = target.setdefault(chain, {"lookups": 0, "hits": 0, "saved_latency_sec": 0.0})
+                stats["lookups"] += 1
+                stats["hits"] += int(hit)
+                stats["saved_latency_sec"] += saved_latency_sec
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """프로세스 누적 체인별 조회 수, hit 수, hit rate, 절약한 시간(초) (요청별 집계는 llm_cache_stats)"""
+        with self._lock:
+            return summarize_stats(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+def install_llm_cache(llm, cache: Optional[PersistentLLMCache] = None) -> PersistentLLMCache:
+    """llm에 영구 캐시 설치 (이 llm으로 만든 모든 체인이 캐시를 사용)"""
+    cache = cache or PersistentLLMCache()
+    llm.cache = cache
+    return cache
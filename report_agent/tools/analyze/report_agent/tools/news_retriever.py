@@ -0,0 +1,218 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from DCF.collectors.rate_limiter import call_with_retry, network_errors
+
+# 뉴스 캐시 저장 위치, 보관 기간(일) (환경변수로 변경 가능)
+DEFAULT_NEWS_CACHE_PATH = os.getenv(
+    "REPORT_AGENT_NEWS_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "news_cache.sqlite"),
+)
+NEWS_CACHE_KEEP_DAYS = int(os.getenv("REPORT_AGENT_NEWS_CACHE_KEEP_DAYS", "7"))
+# 설정하면 DuckDuckGo 대신 로컬 뉴스 파일(JSONL)을 사용 (오프라인 실행, 벤치마크용)
+NEWS_FILE = os.getenv("REPORT_AGENT_NEWS_FILE")
+
+Article = Dict[str, str]
+
+class DuckDuckGoNewsBackend:
+    """DuckDuckGo 뉴스 검색"""
+
+    def __init__(self, max_results: int = 1):
+        self.max_results = max_results
+        self._wrapper = None
+        self._lock = threading.Lock()
+
+    def search(self, company_name: str, segment: str) -> List[Article]:
+        with self._lock:
+            if self._wrapper is None:
+                # langchain_community는 import 시간이 길어 처음 검색할 때 불러옴
+                from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+                self._wrapper = DuckDuckGoSearchAPIWrapper()
+        return self._wrapper.results(f"{company_name} {segment} 사업부 매출", self.max_results, source="news")
+
+    @property
+    def retry_on(self) -> tuple:
+        """재시도할 예외 (네트워크 오류와 DuckDuckGo 검색 오류, 요청 제한)"""
+        try:
+            from duckduckgo_search.exceptions import DuckDuckGoSearchException
+        except ImportError:
+            return network_errors()
+        return (*network_errors(), DuckDuckGoSearchException)
+
+class LocalFileNewsBackend:
+    """로컬 JSONL 파일의 뉴스를 반환하는 검색 대체 구현
+
+    한 줄에 {"company": 회사명, "segment": 사업부, "title": ..., "snippet": ..., "link": ..., "date": ..., "source": ...} 형식이며,
+    NewsCache.export로 실제 검색 결과를 파일로 저장해 같은 입력으로 파이프라인을 다시 실행할 수 있다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._articles: Dict[tuple, List[Article]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                article = json.loads(line)
+                key = (article.pop("company"), article.pop("segment"))
+                self._articles.setdefault(key, []).append(article)
+
+    def search(self, company_name: str, segment: str) -> List[Article]:
+        return [dict(article) for article in self._articles.get((company_name, segment), [])]
+
+class NewsCache:
+    """(회사, 사업부, 날짜) 단위 뉴스 검색 결과 SQLite 캐시"""
+
+    def __init__(self, path: str = DEFAULT_NEWS_CACHE_PATH, keep_days: int = NEWS_CACHE_KEEP_DAYS):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS news_cache (
+                    company TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    articles TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (company, segment, day)
+                )
+                """
+            )
+            # 보관 기간이 지난 검색 결과 삭제
+            conn.execute("DELETE FROM news_cache WHERE day < ?", ((date.today() - timedelta(days=keep_days)).isoformat(),))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, company_name: str, segment: str, day: str) -> Optional[List[Article]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT articles FROM news_cache WHERE company = ? AND segment = ? AND day = ?", (company_name, segment, day)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, company_name: str, segment: str, day: str, articles: List[Article]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO news_cache (company, segment, day, articles, created_at) VALUES (?, ?, ?, ?, ?)",
+                (company_name, segment, day, json.dumps(articles, ensure_ascii=False), time.time()),
+            )
+
+    def export(self, path: str, day: Optional[str] = None) -> int:
+        """캐시된 뉴스를 LocalFileNewsBackend 형식의 JSONL로 저장 (day를 지정하지 않으면 회사, 사업부별 최신 결과)
+
+        returns:
+            int: 저장한 기사 수
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT company, segment, articles FROM news_cache WHERE day = ?" if day else
+                "SELECT company, segment, articles FROM news_cache AS a "
+                "WHERE day = (SELECT MAX(day) FROM news_cache AS b WHERE a.company = b.company AND a.segment = b.segment)",
+                (day,) if day else (),
+            ).fetchall()
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for company_name, segment, articles in rows:
+                for article in json.loads(articles):
+                    f.write(json.dumps({"company": company_name, "segment": segment, **article}, ensure_ascii=False) + "\n")
+                    count += 1
+        return count
+
+def _article_key(article: Article) -> str:
+    """같은 기사 판별 키 (링크가 없으면 제목)"""
+    return (article.get("link") or article.get("title") or article.get("snippet") or "").strip().lower()
+
+def format_news(articles: List[Article]) -> str:
+    """프롬프트에 넣을 뉴스 문자열 (DuckDuckGoSearchResults 출력과 같은 형식)"""
+    return ", ".join(", ".join(f"{key}: {value}" for key, value in article.items()) for article in articles)
+
+class NewsRetriever:
+    """사업부 뉴스 검색 (날짜별 캐시, 사업부 간 중복 기사 제거, 검색 백엔드 교체 가능)
+
+    - 같은 날 같은 회사, 사업부를 다시 검색하면 캐시된 결과를 사용 (검색에 실패한 결과는 캐시하지 않음)
+    - 네트워크 오류로 검색에 실패하면 지수 백오프에 무작위 지연을 더해 최대 max_retries번까지 시도
+      (재시도할 예외는 백엔드의 retry_on, 없으면 네트워크 오류)
+    """
+
+    def __init__(self, backend=None, cache: Optional[NewsCache] = None, max_retries: int = 3, backoff: float = 1.0):
+        self.backend = backend or DuckDuckGoNewsBackend()
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, int] = {"cache_hits": 0, "searches": 0, "failures": 0, "duplicates": 0}
+
+    def search(self, company_name: str, segment: str) -> List[Article]:
+        """한 사업부의 뉴스 검색 (모두 실패하면 빈 리스트)"""
+        day = date.today().isoformat()
+        if self.cache is not None:
+            articles = self.cache.get(company_name, segment, day)
+            if articles is not None:
+                self._record("cache_hits")
+                return articles
+
+        try:
+            articles = call_with_retry(
+                lambda: self.backend.search(company_name, segment),
+                retries=max(0, self.max_retries - 1),
+                backoff=self.backoff,
+                retry_on=getattr(self.backend, "retry_on", None),
+                before_attempt=lambda: self._record("searches"),
+                on_retry=lambda attempt, error: print(f"{segment} 사업부 뉴스 검색 {attempt + 1}번째 실패: {str(error)}"),
+            )
+        except Exception as e:
+            print(f"{segment} 사업부 뉴스 검색 실패: {str(e)}")
+            self._record("failures")
+            return []
+
+        if self.cache is not None:
+            self.cache.put(company_name, segment, day, articles)
+        return articles
+
+    def search_segments(self, company_name: str, segments: List[str], max_workers: int = 4) -> Dict[str, List[Article]]:
+        """여러 사업부의 뉴스를 동시에 검색하고 사업부 간 중복 기사를 제거
+
+        같은 기사는 처음 나온 사업부에만 남기며, 중복을 빼면 뉴스가 없어지는 사업부는 검색 결과를 그대로 둔다.
+        """
+        if not segments:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(segments)))) as executor:
+            results = list(executor.map(lambda segment: self.search(company_name, segment), segments))
+
+        seen = set()
+        news = {}
+        for segment, articles in zip(segments, results):
+            unique, keys = [], set()
+            for article in articles:
+                key = _article_key(article)
+                if key and (key in seen or key in keys):
+                    continue
+                keys.add(key)
+                unique.append(article)
+            unique = unique or articles
+            self._record("duplicates", len(articles) - len(unique))
+            news[segment] = unique
+            seen.update(_article_key(article) for article in unique)
+        return news
+
+    def _record(self, key: str, value: int = 1) -> None:
+        with self._lock:
+            self.metrics[key] += value
+
+    def get_metrics(self) -> Dict[str, int]:
+        """캐시 hit, 실제 검색, 검색 실패, 제거한 중복 기사 수"""
+        with self._lock:
+            return dict(self.metrics)
+
+def get_news_retriever() -> NewsRetriever:
+    """기본 뉴스 검색기 (REPORT_AGENT_NEWS_FILE이 있으면 로컬 파일, 없으면 날짜별 캐시를 사용하는 DuckDuckGo)"""
+    if NEWS_FILE:
+        return NewsRetriever(LocalFileNewsBackend(NEWS_FILE))
+    return NewsRetriever(DuckDuckGoNewsBackend(), NewsCache())
@@ -1,18 +1,34 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from tools.analyze.report_agent.tools.report_agent_utils import get_ticker, extract_segment, yoy_calculator, consensusCalculator, combine_report
-from tools.analyze.report_agent.tools.yoy_prediction import yoyPrediction
+from tools.analyze.report_agent.tools.yoy_prediction import yoyPrediction, yoyBatchPrediction
 from tools.analyze.report_agent.tools.predict_next_qt import predictNextQuarter
 from tools.analyze.report_agent.tools.current_qt_review import currentQuarterReview
 from tools.analyze.report_agent.tools.find_per import find_peer_PERs_tool, find_PER_tool
 from tools.analyze.report_agent.tools.segment_yoy_prediction import segmentYoYpredictionResult
 from tools.analyze.report_agent.tools.valuation import Valuation
-from langchain_community.tools import DuckDuckGoSearchResults
-from langchain_core.tools import ToolException
+from tools.analyze.report_agent.tools.news_retriever import NewsRetriever, format_news, get_news_retriever
 import pandas as pd
+import contextlib
+import contextvars
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from tools.analyze.report_agent.tools.llm_cache import PersistentLLMCache
+
+# 사업부별 뉴스 검색, YOY 예측 동시 실행 수 기본값
+MAX_SEGMENT_CONCURRENCY = int(os.getenv("REPORT_AGENT_MAX_CONCURRENCY", "4"))
+# get_reports에서 동시에 작성할 리포트 수 기본값
+MAX_REPORT_CONCURRENCY = int(os.getenv("REPORT_AGENT_MAX_REPORTS", "4"))
+
+# 분기별 요약손익계산서가 준비된 기업 (consensus_result.csv의 종목명)
+SUPPORTED_COMPANIES = (
+    "SK하이닉스", "대한항공", "포스코퓨처엠", "현대차", "삼성전자", "SK텔레콤",
+    "두산에너빌리티", "NAVER", "카카오", "넷마블", "LG에너지솔루션",
+)
 
 # 상태 정보 정의
 
@@ -25,46 +41,90 @@ class State(BaseModel):
     average_peer_PER: float = Field(description="경쟁사 PER 평균", default=0)
     result: Dict[str, str] = Field(description="결과", default_factory=dict)
 
+class ReportRun:
+    """리포트 요청 하나의 작업 상태
+
+    get_report 호출마다 새로 만들어 동시에 실행되는 리포트끼리 상태를 공유하지 않도록 한다.
+    """
+
+    def __init__(self):
+        self.state = State()
+        self.income_stmt_cum: Optional[pd.DataFrame] = None
+        self.segments: List[str] = []
+        # 이 요청의 체인별 LLM 캐시 조회 집계
+        self.llm_cache_stats: Dict[str, Dict[str, float]] = {}
+
 class ReportAgentManager:
-    def __init__(self, llm: Optional[ChatOpenAI] = None):
+    def __init__(
+            self,
+            llm: Optional["ChatOpenAI"] = None,
+            sector_table=None,
+            max_concurrency: int = MAX_SEGMENT_CONCURRENCY,
+            llm_cache: Optional["PersistentLLMCache"] = None,
+            batch_yoy_prediction: bool = True,
+            news_retriever: Optional[NewsRetriever] = None
+            ):
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.llm = llm or ChatOpenAI(model="gpt-4o", temperature=0)
+        if llm is None:
+            # langchain_openai는 import 시간이 길어 기본 LLM이 필요할 때만 불러옴
+            from langchain_openai import ChatOpenAI
+            llm = ChatOpenAI(model="gpt-4o", temperature=0)
+        self.llm = llm
+        # LLM 응답 영구 캐시 (있으면 llm에 한 번 설치하여 모든 체인이 함께 사용)
+        self.llm_cache = llm_cache
+        if llm_cache is not None:
+            from tools.analyze.report_agent.tools.llm_cache import install_llm_cache
+            install_llm_cache(self.llm, llm_cache)
+        # 사전 계산된 섹터 멀티플 테이블 (DCF.utils.sector_multiples.SectorMultiplesTable, 있으면 peer PER 조회에 사용)
+        self.sector_table = sector_table
+        # 사업부별 뉴스 검색, YOY 예측을 동시에 실행할 최대 사업부 수
+        self.max_concurrency = max_concurrency
+        # 전체 사업부 YOY를 한 번의 LLM 호출로 예측 (검증에 실패한 사업부만 사업부별로 다시 예측)
+        self.batch_yoy_prediction = batch_yoy_prediction
+        # 사업부 뉴스 검색기 (기본값은 날짜별 캐시를 사용하는 DuckDuckGo, REPORT_AGENT_NEWS_FILE이 있으면 로컬 파일)
+        self.news_retriever = news_retriever or get_news_retriever()
         self.consensus_df = pd.read_csv("./data/consensus_result.csv")
-        self.state = State()
         # 프로젝트 루트 디렉토리 설정
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.output_dir = os.path.join(self.project_root, 'output', 'predicted_quarterly_financial_data')
         os.makedirs(self.output_dir, exist_ok=True)
 
     def get_report(self, query: str, filter: Optional[Dict[str, Any]] = None) -> str:
+        # 요청별 상태 (매니저에는 요청 간 공유되는 읽기 전용 값만 둠)
+        run = ReportRun()
+        # LLM 캐시 조회는 요청별로 집계 (동시에 작성하는 리포트끼리 통계가 섞이지 않도록)
+        with self._llm_cache_stats(run):
+            return self._get_report(run, query, filter)
+
+    def _get_report(self, run: ReportRun, query: str, filter: Optional[Dict[str, Any]] = None) -> str:
         try:
             print(f"\n=== 리포트 에이전트 프로세스 시작 ===")
             print(f"입력 쿼리: {query}")
             print(f"필터 조건: {filter}")
 
             # 1. ticker 추출
-            self.state.company_name = filter["companyName"]
-            ticker = self.consensus_df.loc[self.consensus_df['종목명'] == self.state.company_name, '종목코드'].values[0]
+            run.state.company_name = filter["companyName"]
+            ticker = self.consensus_df.loc[self.consensus_df['종목명'] == run.state.company_name, '종목코드'].values[0]
             if ticker is None:
-                error_msg = f"티커를 찾을 수 없습니다: {self.state.company_name}"
+                error_msg = f"티커를 찾을 수 없습니다: {run.state.company_name}"
                 self.logger.error(error_msg)
                 return error_msg
-            self.state.ticker = ticker
+            run.state.ticker = ticker
 
-            print(f"회사명: {self.state.company_name}")
-            print(f"티커: {self.state.ticker}")
+            print(f"회사명: {run.state.company_name}")
+            print(f"티커: {run.state.ticker}")
             print("===1. 회사명 및 티커 추출 완료===")
 
             # 2. 분기별 요약손익계산서(+사업부별매출) 가져오기
             try:
-                file_path = f"./tools/analyze/report_agent/tools/data/quarterly_financial_data/{self.state.ticker}_quarterly_financial_data.xlsx"
+                file_path = f"./tools/analyze/report_agent/tools/data/quarterly_financial_data/{run.state.ticker}_quarterly_financial_data.xlsx"
                 if not os.path.exists(file_path):
                     error_msg = f"분기별 요약손익계산서 파일을 찾을 수 없습니다: {file_path}"
                     self.logger.error(error_msg)
                     return error_msg
                 
-                self.income_stmt_cum = pd.read_excel(file_path, header=0)
-                self.segments = extract_segment(self.income_stmt_cum)
+                run.income_stmt_cum = pd.read_excel(file_path, header=0)
+                run.segments = extract_segment(run.income_stmt_cum)
                 print("===2. 분기별 요약손익계산서 및 사업부별 매출액 추출 완료===")
             except Exception as e:
                 error_msg = f"분기별 요약손익계산서 처리 중 오류 발생: {str(e)}"
@@ -72,104 +132,170 @@ class ReportAgentManager:
                 return error_msg
 
             # 3. 직전분기 매출액 컨센서스 가져오기
-            current_quarter_sales_consensus = self.consensus_df.loc[self.consensus_df['종목코드'] == self.state.ticker, '직전분기_매출액_컨센서스'].values[0] * (10 ** 8) #(10^8 =억원)
+            current_quarter_sales_consensus = self.consensus_df.loc[self.consensus_df['종목코드'] == run.state.ticker, '직전분기_매출액_컨센서스'].values[0] * (10 ** 8) #(10^8 =억원)
             print("===3. 직전분기 매출액 컨센서스 추출 완료===")
 
             # 4. 직전분기 누적 매출액 컨센서스 및 yoy 컨센서스 계산
-            consensus_calculator = consensusCalculator(self.income_stmt_cum, current_quarter_sales_consensus, self.state)
+            consensus_calculator = consensusCalculator(run.income_stmt_cum, current_quarter_sales_consensus, run.state)
             yoy_consensus, current_quarter_sales_cum_consensus = consensus_calculator.calculate()
-            if '영업수익' not in self.state.segment:
-                self.state.segment['영업수익'] = {}
-            self.state.segment['영업수익'].update({"yoy_consensus":yoy_consensus})
-            self.state.segment['영업수익'].update({"sales_consensus":current_quarter_sales_cum_consensus})
+            if '영업수익' not in run.state.segment:
+                run.state.segment['영업수익'] = {}
+            run.state.segment['영업수익'].update({"yoy_consensus":yoy_consensus})
+            run.state.segment['영업수익'].update({"sales_consensus":current_quarter_sales_cum_consensus})
             print("===4. 직전분기 누적 매출액 컨센서스 및 yoy 컨센서스 계산 완료===")
 
             # 5. 사업부별 YOY 계산
-            yoy_series = yoy_calculator(self.income_stmt_cum)
-            for segment, yoy in zip(self.income_stmt_cum.iloc[:, 0], yoy_series):
-                if segment in self.segments:
-                    self.state.segment[segment] = {"yoy": yoy}
+            yoy_series = yoy_calculator(run.income_stmt_cum)
+            for segment, yoy in zip(run.income_stmt_cum.iloc[:, 0], yoy_series):
+                if segment in run.segments:
+                    run.state.segment[segment] = {"yoy": yoy}
                 if segment == '영업수익':
-                    self.state.segment['영업수익'].update({"yoy": yoy})
+                    run.state.segment['영업수익'].update({"yoy": yoy})
             print("===5. 사업부별 YOY 계산 완료===")
 
             # 6. 사업부별 매출액(영업수익) 추출
-            present_quarter = self.income_stmt_cum.iloc[:,1+4]
-            for segment, sales in zip(self.income_stmt_cum['계정'], present_quarter):
-                if segment in self.segments:
-                    self.state.segment[segment].update({"sales":sales})
+            present_quarter = run.income_stmt_cum.iloc[:,1+4]
+            for segment, sales in zip(run.income_stmt_cum['계정'], present_quarter):
+                if segment in run.segments:
+                    run.state.segment[segment].update({"sales":sales})
                 if segment == '영업수익':
-                    self.state.segment['영업수익'].update({"sales":sales})
+                    run.state.segment['영업수익'].update({"sales":sales})
             print("===6. 사업부별 매출액(영업수익) 추출 완료===")
 
             # 7. 직전분기 실적 리뷰 작성
-            current_quarter_review = currentQuarterReview(self.state, self.segments, self.llm)
+            current_quarter_review = currentQuarterReview(run.state, run.segments, self.llm)
             review = current_quarter_review.review()
-            self.state.result.update({"sales_review":review.content})
+            run.state.result.update({"sales_review":review.content})
             print("===7. 직전분기 실적 리뷰 작성 완료===")
 
-            # 8. 사업부별 뉴스 검색
-            duckduckgo_search_tool = DuckDuckGoSearchResults(max_results=1,backend="news")
-            for segment in self.segments:
-                max_retries = 3
-                retry_count = 0
-                while retry_count < max_retries:
-                    try:
-                        news_result = duckduckgo_search_tool.invoke(
-                            {
-                                "query": f"{self.state.company_name} {segment} 사업부 매출"
-                            }
-                        )
-                        self.state.segment[segment].update({"news_result":news_result})
-                        break  # 성공시 루프 종료
-                    except Exception as e:
-                        retry_count += 1
-                        self.logger.warning(f"{segment} 사업부 뉴스 검색 {retry_count}번째 실패: {str(e)}")
-                        if retry_count == max_retries:
-                            self.state.segment[segment].update({"news_result": []})
-                        else:
-                            time.sleep(1)
+            # 8~9. 사업부별 뉴스 검색 및 YOY 예측
+            self._process_segments(run)
             print("===8. 사업부별 뉴스 검색 완료===")
-
-            # 9. 사업부별 YOY 예측
-            for segment in self.segments:
-                yoy_prediction = yoyPrediction(self.state.company_name, segment, self.state.segment[segment]['news_result'], self.state.segment[segment]['yoy'], self.llm)
-                result = yoy_prediction.predict()
-                # 예측값 및 예측 이유업데이트
-                self.state.segment[segment].update({"yoy_prediction":result.yoy})
-                self.state.segment[segment].update({"yoy_prediction_reason":result.reason})
             print("===9. 사업부별 YOY 예측 완료===")
 
             # 10. 다음분기 사업부별 매출액 yoy 예측 결과와 근거 작성
-            segment_yoy_prediction_result = segmentYoYpredictionResult(self.state, self.segments, self.llm)
+            segment_yoy_prediction_result = segmentYoYpredictionResult(run.state, run.segments, self.llm)
             result = segment_yoy_prediction_result.predict()
-            self.state.result.update({"segment_yoy_prediction_result":result})
+            run.state.result.update({"segment_yoy_prediction_result":result})
             print("===10. 다음분기 사업부별 매출액 yoy 예측 결과와 근거 작성 완료===")
 
             # 11. 다음 분기 매출액, 영업이익, 순이익 예측
-            predict_next_qt = predictNextQuarter(self.income_stmt_cum, self.state, self.segments)
+            predict_next_qt = predictNextQuarter(run.income_stmt_cum, run.state, run.segments)
             result_df = predict_next_qt.fill_next_quarter_df()
-            result_df.to_excel(f"./output/predicted_quarterly_financial_data/{self.state.ticker}_predicted_quarter_financial_data.xlsx", index=False)
-            self.income_stmt_cum = result_df
+            result_df.to_excel(f"./output/predicted_quarterly_financial_data/{run.state.ticker}_predicted_quarter_financial_data.xlsx", index=False)
+            run.income_stmt_cum = result_df
             print("===11. 다음 분기 매출액, 영업이익, 순이익 예측 완료===")
 
             # 12. 목표 PER 산정을 위한 peer PER 및 현재 PER 확인
-            self.state.PER = find_PER_tool(self.state.ticker)
-            self.state.peer_list, self.state.average_peer_PER = find_peer_PERs_tool(self.state.company_name, self.state, self.llm)
+            run.state.PER = find_PER_tool(run.state.ticker)
+            run.state.peer_list, run.state.average_peer_PER = find_peer_PERs_tool(run.state.company_name, run.state, self.llm, self.sector_table)
             print("===12. 목표 PER 산정을 위한 peer PER 및 현재 PER 확인 완료===")
 
             # 13. 밸류에이션(목표 주가 산정)
-            valuation = Valuation(self.state, self.income_stmt_cum, self.state.ticker, self.llm)
+            valuation = Valuation(run.state, run.income_stmt_cum, run.state.ticker, self.llm)
             result = valuation.estimate()
-            self.state.result.update({"valuation_result":result.content})
+            run.state.result.update({"valuation_result":result.content})
             print("===13. 밸류에이션(목표 주가 산정) 완료===")
 
             # 14. 리포트 최종 출력
-            report = combine_report(self.state)
+            report = combine_report(run.state)
             print("===14. 리포트 최종 출력 완료===")
+            self._log_llm_cache_stats(run)
             return report
 
         except Exception as e:
             error_msg = f"리포트 에이전트 오류 발생: {str(e)}\n상세 오류: {type(e).__name__}"
             self.logger.error(error_msg)
+            from langchain_core.tools import ToolException
             raise ToolException(error_msg)
+
+    def get_reports(
+            self,
+            company_names: Optional[List[str]] = None,
+            query: str = "목표 주가를 예측해줘",
+            max_workers: int = MAX_REPORT_CONCURRENCY
+            ) -> Dict[str, str]:
+        """여러 기업의 리포트를 동시에 작성 (기본값은 지원하는 11개 기업 전체)
+
+        returns:
+            Dict[str, str]: 기업명별 리포트 (실패한 기업은 오류 메시지)
+        """
+        company_names = list(company_names or SUPPORTED_COMPANIES)
+        if not company_names:
+            return {}
+
+        def get_report(company_name: str) -> str:
+            try:
+                return self.get_report(f"{company_name} {query}", {"companyName": company_name})
+            except Exception as e:
+                print(f"{company_name} 리포트 작성 실패: {str(e)}")
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(company_names)))) as executor:
+            return dict(zip(company_names, executor.map(get_report, company_names)))
+
+    def _llm_cache_stats(self, run: ReportRun):
+        """run.llm_cache_stats에 LLM 캐시 조회를 집계하는 블록 (캐시가 없으면 빈 블록)"""
+        if self.llm_cache is None:
+            return contextlib.nullcontext()
+        from tools.analyze.report_agent.tools.llm_cache import llm_cache_stats
+        return llm_cache_stats(run.llm_cache_stats)
+
+    def _log_llm_cache_stats(self, run: ReportRun) -> None:
+        """이 리포트의 체인별 LLM 캐시 hit rate와 절약한 시간 기록"""
+        if self.llm_cache is None:
+            return
+        from tools.analyze.report_agent.tools.llm_cache import summarize_stats
+        for chain, stats in summarize_stats(run.llm_cache_stats).items():
+            self.logger.info(
+                f"{run.state.company_name} LLM 캐시 [{chain}] 조회 {stats['lookups']}회, hit {stats['hits']}회 "
+                f"({stats['hit_rate']:.0%}), 절약 시간 {stats['saved_latency_sec']:.1f}초"
+            )
+
+    def _process_segments(self, run: ReportRun) -> None:
+        """사업부별 뉴스 검색과 YOY 예측을 실행하여 state에 반영
+
+        뉴스는 news_retriever로 사업부별로 동시에 검색한다(날짜별 캐시, 사업부 간 중복 기사 제거).
+        batch_yoy_prediction이면 전체 사업부를 한 번에 예측하고 검증에 실패한 사업부만 사업부별로 동시에 다시 예측한다.
+        한 사업부의 검색이나 예측이 실패해도 다른 사업부는 계속 진행한다.
+        """
+        segments = list(run.segments)
+        if not segments:
+            return
+        articles = self.news_retriever.search_segments(run.state.company_name, segments, self.max_concurrency)
+        news_results = [format_news(articles[segment]) for segment in segments]
+        batch_results = {}
+        if self.batch_yoy_prediction:
+            batch_results = yoyBatchPrediction(
+                run.state.company_name,
+                {segment: {"yoy": run.state.segment[segment]['yoy'], "news": news} for segment, news in zip(segments, news_results)},
+                self.llm,
+            ).predict()
+            fallback_segments = [segment for segment in segments if segment not in batch_results]
+            if fallback_segments:
+                print(f"사업부별로 다시 예측: {fallback_segments}")
+
+        def predict(segment: str, news_result: str) -> Dict[str, Any]:
+            if segment not in batch_results:
+                return self._predict_segment(run, segment, news_result)
+            result = batch_results[segment]
+            return {"news_result": news_result, "yoy_prediction": result.yoy, "yoy_prediction_reason": result.reason}
+
+        # 요청별 LLM 캐시 집계가 이어지도록 현재 context를 복사하여 스레드에서 실행
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(segments)))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, predict, segment, news_result)
+                       for segment, news_result in zip(segments, news_results)]
+            results = [future.result() for future in futures]
+        for segment, result in zip(segments, results):
+            run.state.segment[segment].update(result)
+
+    def _predict_segment(self, run: ReportRun, segment: str, news_result: str) -> Dict[str, Any]:
+        """한 사업부의 YOY 예측 (예측에 실패하면 직전 분기 yoy 유지)"""
+        yoy = run.state.segment[segment]['yoy']
+        try:
+            yoy_prediction = yoyPrediction(run.state.company_name, segment, news_result, yoy, self.llm)
+            result = yoy_prediction.predict()
+            return {"news_result": news_result, "yoy_prediction": result.yoy, "yoy_prediction_reason": result.reason}
+        except Exception as e:
+            self.logger.warning(f"{segment} 사업부 YOY 예측 실패: {str(e)}")
+            return {"news_result": news_result, "yoy_prediction": yoy, "yoy_prediction_reason": "예측에 실패하여 직전 분기 yoy를 유지합니다."}
@@ -1,8 +1,10 @@
-from yahooquery import search
-from deep_translator import GoogleTranslator
-from typing import List
-import pandas as pd
+from __future__ import annotations
+from typing import TYPE_CHECKING, List
 from datetime import datetime
+from tools.analyze.report_agent.tools.yahoo_client import yahoo_call
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # 한글 문자 범위를 이용해 한글 포함 여부 확인
 def _contains_korean(text):
@@ -13,6 +15,10 @@ def _contains_korean(text):
 
 def get_ticker(company_name):
     try:            
+        # yahooquery, deep_translator는 import 시간이 길어 처음 검색할 때 불러옴
+        from yahooquery import search
+        from deep_translator import GoogleTranslator
+
         # 한글 포함 여부 확인
         is_korean = _contains_korean(company_name)
 
@@ -21,9 +27,9 @@ def get_ticker(company_name):
             translated = GoogleTranslator(source='auto', target='en').translate(company_name)
             
             # 번역된 이름으로 검색
-            results = search(translated)
+            results = yahoo_call("search", lambda: search(translated))
         else:
-            results = search(company_name)
+            results = yahoo_call("search", lambda: search(company_name))
             
         # 거래소 우선순위 정의
         priority_exchanges = ['KSC', 'NYQ', 'NMS', 'JPX', 'HKG']
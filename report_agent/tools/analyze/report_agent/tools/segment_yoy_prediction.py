@@ -1,5 +1,3 @@
-from langchain_core.prompts import ChatPromptTemplate
-
 class segmentYoYpredictionResult:
     def __init__(self, state, segments, llm):
         self.state = state
@@ -22,7 +20,10 @@ class segmentYoYpredictionResult:
 
         사업부별 매출 예측 결과와 근거 : {segment_yoy_prediction_result}
         """
+        from langchain_core.prompts import ChatPromptTemplate
         prompt = ChatPromptTemplate.from_template(template=template)
+        from tools.analyze.report_agent.tools.llm_cache import llm_cache_scope
         chain = prompt | self.llm
-        segment_yoy_prediction_result = chain.invoke({"segment_yoy_prediction_result": segment_yoy_prediction_result}).content
+        with llm_cache_scope("segment_yoy_prediction"):
+            segment_yoy_prediction_result = chain.invoke({"segment_yoy_prediction_result": segment_yoy_prediction_result}).content
         return segment_yoy_prediction_result
\ No newline at end of file
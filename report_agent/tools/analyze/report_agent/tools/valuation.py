@@ -1,5 +1,4 @@
-import yfinance as yf
-from langchain_core.prompts import ChatPromptTemplate
+from tools.analyze.report_agent.tools.yahoo_client import yahoo_call, yahoo_ticker
 
 class Valuation:
     def __init__(self, state, income_stmt_cum, ticker, llm):
@@ -10,11 +9,15 @@ class Valuation:
 
     def estimate(self):
         """목표 주가 산정"""
-        ticker = yf.Ticker(self.ticker+".KS")
+        from langchain_core.prompts import ChatPromptTemplate
+        from tools.analyze.report_agent.tools.llm_cache import llm_cache_scope
+
+        ticker = yahoo_ticker(self.ticker+".KS")
         estEarnings = self.income_stmt_cum.loc[self.income_stmt_cum['계정'] == '순이익','next_quarter'].values[0]
-        shares = ticker.info.get("sharesOutstanding")
+        info = yahoo_call("info", lambda: ticker.info)
+        shares = info.get("sharesOutstanding")
         estEPS = estEarnings/shares
-        price_consensus = ticker.analyst_price_targets
+        price_consensus = yahoo_call("analyst_price_targets", lambda: ticker.analyst_price_targets)
 
         template = """
         당신은 증권사 소속 애널리스트입니다.
@@ -46,15 +49,16 @@ class Valuation:
 
         prompt = ChatPromptTemplate.from_template(template=template)
         chain = prompt | self.llm
-        valuation_result = chain.invoke({"company_name": self.state.company_name, 
-                    "current_quarter_review_result": self.state.result['sales_review'], 
-                    "segment_yoy_prediction_result": self.state.result['segment_yoy_prediction_result'], 
-                    "PER": self.state.PER, 
-                    "average_peer_PER": self.state.average_peer_PER,
-                    "peer_list": self.state.peer_list,
-                    "EPS": estEPS,
-                    "avg_price_consensus": price_consensus['mean'],
-                    "low_price_consensus": price_consensus['low'],
-                    "high_price_consensus": price_consensus['high'],
-                    "current_price": ticker.info.get("regularMarketPrice")})
+        with llm_cache_scope("valuation"):
+            valuation_result = chain.invoke({"company_name": self.state.company_name, 
+                        "current_quarter_review_result": self.state.result['sales_review'], 
+                        "segment_yoy_prediction_result": self.state.result['segment_yoy_prediction_result'], 
+                        "PER": self.state.PER, 
+                        "average_peer_PER": self.state.average_peer_PER,
+                        "peer_list": self.state.peer_list,
+                        "EPS": estEPS,
+                        "avg_price_consensus": price_consensus['mean'],
+                        "low_price_consensus": price_consensus['low'],
+                        "high_price_consensus": price_consensus['high'],
+                        "current_price": info.get("regularMarketPrice")})
         return valuation_result
\ No newline at end of file
@@ -0,0 +1,14 @@
+from typing import Any, Callable
+from DCF.collectors.rate_limiter import get_rate_limiter, get_yahoo_session
+
+# Yahoo 요청은 DCF와 같은 프로세스 공유 RateLimiter(속도 제한, 재시도)와 HTTP 세션을 사용
+# (환경변수 DCF_YAHOO_RATE, DCF_YAHOO_BURST, DCF_YAHOO_RETRIES로 조정)
+
+def yahoo_ticker(symbol: str):
+    """공유 세션을 사용하는 yf.Ticker"""
+    import yfinance as yf
+    return yf.Ticker(symbol, session=get_yahoo_session())
+
+def yahoo_call(name: str, func: Callable[[], Any]) -> Any:
+    """Yahoo 요청(yf.Ticker 속성 조회 등)을 공유 속도 제한을 거쳐 실행"""
+    return get_rate_limiter().call(name, func)
@@ -1,6 +1,4 @@
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_openai import ChatOpenAI
+from typing import Dict, List
 from pydantic import BaseModel, Field
 
 class yoyPredictionOutput(BaseModel):
@@ -9,6 +7,10 @@ class yoyPredictionOutput(BaseModel):
     yoy: float = Field(description="사업부 yoy 예측값")
     reason: str = Field(description="사업부 yoy 예측값의 근거")
 
+class yoyBatchPredictionOutput(BaseModel):
+    """전체 사업부 yoy 예측 아웃풋"""
+    predictions: List[yoyPredictionOutput] = Field(description="사업부별 yoy 예측 결과 (입력된 모든 사업부를 포함)")
+
 class yoyPrediction:
     def __init__(self, company_name, segment, news, yoy, llm):
         self.company_name = company_name
@@ -18,6 +20,10 @@ class yoyPrediction:
         self.llm = llm
     
     def predict(self):
+        from langchain_core.output_parsers import PydanticOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+        from tools.analyze.report_agent.tools.llm_cache import llm_cache_scope
+
         parser = PydanticOutputParser(pydantic_object=yoyPredictionOutput)
 
         template = """
@@ -36,5 +42,66 @@ class yoyPrediction:
 
         chain = prompt | self.llm | parser
 
-        result = chain.invoke({"company_name": self.company_name, "news": self.news, "business_segment": self.segment, "yoy": self.yoy})
-        return result
\ No newline at end of file
+        with llm_cache_scope("yoy_prediction"):
+            result = chain.invoke({"company_name": self.company_name, "news": self.news, "business_segment": self.segment, "yoy": self.yoy})
+        return result
+
+class yoyBatchPrediction:
+    """전체 사업부의 yoy를 한 번의 LLM 호출로 예측
+
+    segments는 {사업부: {"yoy": 직전 분기 yoy, "news": 뉴스}} 형태이며,
+    응답에서 사업부별 결과를 각각 검증하여 검증에 실패하거나 누락된 사업부는 결과에서 제외한다.
+    (제외된 사업부는 호출하는 쪽에서 yoyPrediction으로 다시 예측)
+    """
+
+    def __init__(self, company_name, segments: Dict[str, dict], llm):
+        self.company_name = company_name
+        self.segments = segments
+        self.llm = llm
+
+    def predict(self) -> Dict[str, yoyPredictionOutput]:
+        from langchain_core.output_parsers import PydanticOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.utils.json import parse_json_markdown
+        from tools.analyze.report_agent.tools.llm_cache import llm_cache_scope
+
+        parser = PydanticOutputParser(pydantic_object=yoyBatchPredictionOutput)
+
+        template = """
+        당신은 증권사 소속 애널리스트입니다.
+        다음 내용을 참고하여 {company_name}의 각 사업부의 매출 혹은 비용이 yoy로 얼마나 변할지 사업부별로 예측하시오.
+        business_segment에는 아래 사업부명을 그대로 사용하고, 모든 사업부를 빠짐없이 예측하시오.
+
+        {segments}
+
+        응답 형식:
+        {format_instructions}
+        """
+
+        segments = "\n".join(
+            f"사업부 : {segment}\n직전 분기 yoy : {value['yoy']}\n{self.company_name}의 {segment} 사업부의 매출 혹은 비용에 큰 영향을 미치는 뉴스 : {value['news']}\n"
+            for segment, value in self.segments.items()
+        )
+        prompt = ChatPromptTemplate.from_template(template=template, partial_variables={"format_instructions": parser.get_format_instructions()})
+
+        chain = prompt | self.llm
+
+        try:
+            with llm_cache_scope("yoy_batch_prediction"):
+                response = chain.invoke({"company_name": self.company_name, "segments": segments})
+            predictions = parse_json_markdown(response.content)["predictions"]
+        except Exception as e:
+            print(f"전체 사업부 yoy 예측 실패: {str(e)}")
+            return {}
+
+        # 사업부별로 따로 검증하여 한 사업부의 오류가 다른 사업부 결과에 영향을 주지 않도록 함
+        results = {}
+        for prediction in predictions if isinstance(predictions, list) else []:
+            try:
+                result = yoyPredictionOutput(**prediction)
+            except Exception as e:
+                print(f"사업부 yoy 예측 결과 검증 실패: {str(e)}")
+                continue
+            if result.business_segment in self.segments:
+                results[result.business_segment] = result
+        return results